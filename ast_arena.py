@@ -0,0 +1,287 @@
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+# Field and list-item tags
+TAG_NONE, TAG_STR, TAG_NODE, TAG_LIST = range(4)
+
+# Type code 0 marks dicts without a "type" key, e.g. the entries of elif_blocks
+UNTYPED = 0
+
+
+class NodeArena:
+    """AST stored as flat arrays instead of nested dicts.
+
+    Nodes are numbered in pre-order, so the subtree of node i is exactly the
+    nodes i .. ends[i] - 1. Each node has a type code and a run of fields
+    (key code, tag, value); for lists the value is the start of a run of
+    tagged items and field_sizes holds its length. Strings are interned once.
+    """
+
+    def __init__(self):
+        self.type_names = [None]
+        self.type_codes = {}
+        self.key_names = []
+        self.key_codes = {}
+        self.strings = []
+        self.string_ids = {}
+
+        self.types = array("B")
+        self.ends = array("I")
+        self.first_field = array("I")
+        self.field_counts = array("B")
+
+        self.field_keys = array("B")
+        self.field_tags = array("B")
+        self.field_values = array("I")
+        self.field_sizes = array("I")
+
+        self.item_tags = array("B")
+        self.item_values = array("I")
+
+    @classmethod
+    def from_dict(cls, ast):
+        arena = cls()
+        arena.add(ast)
+        return arena
+
+    @classmethod
+    def from_statements(cls, statements):
+        # Builds a Program node from an iterable of statement dicts, converting
+        # each one as it arrives so the dict form of the whole program never exists
+        arena = cls()
+        root = arena.new_node("Program")
+        body = [arena.add(statement) for statement in statements]
+        arena.set_fields(root, [("body", TAG_LIST, body)])
+        arena.ends[root] = len(arena.types)
+        return arena
+
+    def __len__(self):
+        return len(self.types)
+
+    def intern(self, value):
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def code(self, codes, names, name):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def new_node(self, node_type):
+        index = len(self.types)
+        self.types.append(UNTYPED if node_type is None else self.code(self.type_codes, self.type_names, node_type))
+        self.ends.append(0)
+        self.first_field.append(0)
+        self.field_counts.append(0)
+        return index
+
+    def set_fields(self, index, fields):
+        # fields: (key, tag, value) with value a string, a node index or, for
+        # TAG_LIST, a list of node indices (ints) and strings
+        self.first_field[index] = len(self.field_keys)
+        self.field_counts[index] = len(fields)
+        for key, tag, value in fields:
+            self.field_keys.append(self.code(self.key_codes, self.key_names, key))
+            self.field_tags.append(tag)
+            if tag == TAG_LIST:
+                self.field_values.append(len(self.item_tags))
+                self.field_sizes.append(len(value))
+                for item in value:
+                    if isinstance(item, str):
+                        self.item_tags.append(TAG_STR)
+                        self.item_values.append(self.intern(item))
+                    else:
+                        self.item_tags.append(TAG_NODE)
+                        self.item_values.append(item)
+            else:
+                self.field_values.append(self.intern(value) if tag == TAG_STR else value or 0)
+                self.field_sizes.append(0)
+
+    def add(self, ast):
+        # Iterative pre-order conversion of a dict tree; returns the root index.
+        # Child dicts are numbered after their parent and write their index into
+        # the parent's placeholder slot; the parent's fields are stored once all
+        # of its children are done.
+        root = None
+        stack = [(ast, None, None)]
+        while stack:
+            value, slot, fields = stack.pop()
+            if fields is not None:
+                self.set_fields(slot, [(key, tag, field[0] if tag == TAG_NODE else field) for key, tag, field in fields])
+                self.ends[slot] = len(self.types)
+                continue
+            if not isinstance(value, dict):
+                raise TypeError(f"Cannot store {type(value).__name__} as an AST node")
+            index = self.new_node(value.get("type"))
+            if slot is None:
+                root = index
+            else:
+                slot[0][slot[1]] = index
+            fields = []
+            children = []
+            for key, field in value.items():
+                if key == "type":
+                    continue
+                if field is None:
+                    fields.append((key, TAG_NONE, 0))
+                elif isinstance(field, str):
+                    fields.append((key, TAG_STR, field))
+                elif isinstance(field, dict):
+                    placeholder = [None]
+                    fields.append((key, TAG_NODE, placeholder))
+                    children.append((field, (placeholder, 0)))
+                elif isinstance(field, list):
+                    items = list(field)
+                    fields.append((key, TAG_LIST, items))
+                    for offset, item in enumerate(field):
+                        if isinstance(item, dict):
+                            children.append((item, (items, offset)))
+                        elif not isinstance(item, str):
+                            raise TypeError(f"Cannot store {type(item).__name__} in an AST list")
+                else:
+                    raise TypeError(f"Cannot store {type(field).__name__} in an AST field")
+            stack.append((None, index, fields))
+            for child, child_slot in reversed(children):
+                stack.append((child, child_slot, None))
+        return root
+
+    def node(self, index=0):
+        return ArenaNode(self, index)
+
+    def root(self):
+        return ArenaNode(self, 0)
+
+    def type_of(self, index):
+        return self.type_names[self.types[index]]
+
+    def walk(self, index=0):
+        # Pre-order node indices of the subtree rooted at index
+        return range(index, self.ends[index])
+
+    def type_counts(self, index=0):
+        counts = Counter(self.types[index:self.ends[index]])
+        return {self.type_names[code]: count for code, count in counts.items() if code != UNTYPED}
+
+    def field(self, index, key):
+        key_code = self.key_codes.get(key)
+        first = self.first_field[index]
+        for slot in range(first, first + self.field_counts[index]):
+            if self.field_keys[slot] == key_code:
+                return self.decode(slot)
+        raise KeyError(key)
+
+    def decode(self, slot):
+        tag = self.field_tags[slot]
+        value = self.field_values[slot]
+        if tag == TAG_STR:
+            return self.strings[value]
+        if tag == TAG_NODE:
+            return ArenaNode(self, value)
+        if tag == TAG_LIST:
+            return [
+                self.strings[self.item_values[i]] if self.item_tags[i] == TAG_STR else ArenaNode(self, self.item_values[i])
+                for i in range(value, value + self.field_sizes[slot])
+            ]
+        return None
+
+    def keys(self, index):
+        first = self.first_field[index]
+        keys = [self.key_names[self.field_keys[slot]] for slot in range(first, first + self.field_counts[index])]
+        return keys if self.types[index] == UNTYPED else ["type"] + keys
+
+    def children(self, index):
+        # Indices of the direct child nodes, in field order
+        result = []
+        first = self.first_field[index]
+        for slot in range(first, first + self.field_counts[index]):
+            tag = self.field_tags[slot]
+            if tag == TAG_NODE:
+                result.append(self.field_values[slot])
+            elif tag == TAG_LIST:
+                start = self.field_values[slot]
+                for i in range(start, start + self.field_sizes[slot]):
+                    if self.item_tags[i] == TAG_NODE:
+                        result.append(self.item_values[i])
+        return result
+
+    def to_dict(self, index=0):
+        # Children always have larger indices than their parent, so one
+        # backwards sweep over the subtree rebuilds it bottom-up
+        built = {}
+        strings = self.strings
+        for i in range(self.ends[index] - 1, index - 1, -1):
+            node = {} if self.types[i] == UNTYPED else {"type": self.type_names[self.types[i]]}
+            first = self.first_field[i]
+            for slot in range(first, first + self.field_counts[i]):
+                tag = self.field_tags[slot]
+                value = self.field_values[slot]
+                if tag == TAG_STR:
+                    value = strings[value]
+                elif tag == TAG_NODE:
+                    value = built.pop(value)
+                elif tag == TAG_LIST:
+                    value = [
+                        strings[self.item_values[j]] if self.item_tags[j] == TAG_STR else built.pop(self.item_values[j])
+                        for j in range(value, value + self.field_sizes[slot])
+                    ]
+                else:
+                    value = None
+                node[self.key_names[self.field_keys[slot]]] = value
+            built[i] = node
+        return built[index]
+
+    def nbytes(self):
+        # Size of the node, field and item arrays, not counting the interned strings
+        parts = (self.types, self.ends, self.first_field, self.field_counts, self.field_keys, self.field_tags,
+                 self.field_values, self.field_sizes, self.item_tags, self.item_values)
+        return sum(part.itemsize * len(part) for part in parts)
+
+
+class ArenaNode(Mapping):
+    """Read-only dict-like view of one arena node."""
+
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def type(self):
+        return self.arena.type_of(self.index)
+
+    def __getitem__(self, key):
+        if key == "type":
+            node_type = self.arena.type_of(self.index)
+            if node_type is None:
+                raise KeyError(key)
+            return node_type
+        return self.arena.field(self.index, key)
+
+    def __iter__(self):
+        return iter(self.arena.keys(self.index))
+
+    def __len__(self):
+        return len(self.arena.keys(self.index))
+
+    def __eq__(self, other):
+        if isinstance(other, ArenaNode):
+            return self.arena is other.arena and self.index == other.index
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def children(self):
+        return [ArenaNode(self.arena, index) for index in self.arena.children(self.index)]
+
+    def to_dict(self):
+        return self.arena.to_dict(self.index)
+
+    def __repr__(self):
+        return f"ArenaNode({self.index}, {self.type!r})"
@@ -1,14 +1,13 @@
 import sys
 import os
-import subprocess
 import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTextEdit, QPushButton, QLabel, QComboBox, QListWidget, QListWidgetItem,
-    QStackedWidget, QMessageBox, QSizePolicy, QGroupBox, QSpacerItem
+    QStackedWidget, QMessageBox, QSizePolicy, QGroupBox, QSpacerItem, QLineEdit
 )
 from PyQt5.QtGui import QPixmap, QFont, QPalette, QColor, QLinearGradient, QBrush
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 import json
 
 BACKEND_DIR = os.path.join(os.path.dirname(__file__), 'backend')
@@ -16,6 +15,19 @@ HISTORY_DIR = os.path.join(BACKEND_DIR, 'history')
 SOURCE_FILE = os.path.join(BACKEND_DIR, 'source.py')
 AST_FILE = os.path.join(BACKEND_DIR, 'ast.json')
 TREE_FILE = os.path.join(BACKEND_DIR, 'ast_output.png')
+TOKENS_BIN_FILE = os.path.join(BACKEND_DIR, 'tokens.bin')
+OCCURRENCES_FILE = os.path.join(BACKEND_DIR, 'occurrences.bin')
+CACHE_DIR = os.path.join(BACKEND_DIR, 'cache')
+# The confirmation label is small: draw at most this many nodes and collapse the rest
+NODE_BUDGET = 400
+
+sys.path.insert(0, BACKEND_DIR)
+from pipeline import Pipeline
+from render_profiles import Renders
+from result_cache import ResultCache
+from ast_metrics import compute_metrics
+from ast_utils import get_entities_from_token_file
+from binary_format import OccurrenceFile, TokenFile
 
 STEPS = [
     ("Start", "Start"),
@@ -25,8 +37,22 @@ STEPS = [
 ]
 
 class ASTDesktopApp(QMainWindow):
+    # (Renders, thumbnail PNG bytes or None), sent from the render thread
+    thumbnail_ready = pyqtSignal(object, object)
+    # (Renders, full PNG bytes or None, render error or None), likewise
+    full_view_ready = pyqtSignal(object, object, object)
+
     def __init__(self):
         super().__init__()
+        self.thumbnail_ready.connect(self.show_thumbnail)
+        self.full_view_ready.connect(self.show_full_view)
+        self.pipeline = Pipeline(max_nodes=NODE_BUDGET)
+        self.result_cache = ResultCache(CACHE_DIR)
+        self.last_result = None
+        # Unbudgeted renders of last_result's AST, for the full view
+        self.full_renders = None
+        # The full view being rendered, so repeated clicks open one dialog
+        self.full_view_pending = None
         self.setWindowTitle("AST Visualizer - Desktop App (Flowchart UI)")
         self.setGeometry(100, 100, 1300, 800)
         self.setMinimumSize(1000, 700)
@@ -300,6 +326,20 @@ class ASTDesktopApp(QMainWindow):
         self.entity_text.setFont(QFont("Consolas", 12))
         self.entity_text.setStyleSheet("padding: 10px; background: #f8faff; border-radius: 6px;")
         group_layout.addWidget(self.entity_text)
+        lookup_layout = QHBoxLayout()
+        self.entity_lookup = QLineEdit()
+        self.entity_lookup.setPlaceholderText("Find a name, keyword or operator...")
+        self.entity_lookup.setFont(QFont("Consolas", 12))
+        self.entity_lookup.returnPressed.connect(self.lookup_entity)
+        lookup_layout.addWidget(self.entity_lookup)
+        lookup_btn = QPushButton("Find")
+        lookup_btn.clicked.connect(self.lookup_entity)
+        lookup_layout.addWidget(lookup_btn)
+        group_layout.addLayout(lookup_layout)
+        self.entity_lookup_result = QLabel("")
+        self.entity_lookup_result.setFont(QFont("Segoe UI", 11))
+        self.entity_lookup_result.setWordWrap(True)
+        group_layout.addWidget(self.entity_lookup_result)
         layout.addWidget(group)
         layout.addSpacerItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding))
         return widget
@@ -370,7 +410,37 @@ class ASTDesktopApp(QMainWindow):
         return widget
 
     def enlarge_ast_image(self, event):
-        if os.path.exists(TREE_FILE):
+        if self.last_result is not None and self.last_result.renders is not None:
+            # The full-resolution PNG is only rendered once it is asked for
+            # here, in the background; the dialog opens when it is done
+            renders = self.full_view_renders()
+            if renders is self.full_view_pending:
+                return
+            self.full_view_pending = renders
+            renders.request("png").add_done_callback(
+                lambda future: self.full_view_ready.emit(
+                    renders, None if future.exception() else future.result(), future.exception())
+            )
+        elif os.path.exists(TREE_FILE):
+            self.open_full_view(QPixmap(TREE_FILE))
+
+    def show_full_view(self, renders, image, error):
+        if renders is not self.full_view_pending:
+            return
+        self.full_view_pending = None
+        # Full views of an older run are dropped
+        if self.last_result is None or self.last_result.renders is None or \
+                self.last_result.renders.ast is not renders.ast:
+            return
+        if error is not None:
+            QMessageBox.warning(self, "Render Error", f"AST tree could not be rendered: {error}")
+            return
+        pixmap = QPixmap()
+        pixmap.loadFromData(image)
+        self.open_full_view(pixmap)
+
+    def open_full_view(self, pixmap):
+        if not pixmap.isNull():
             from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton
             dlg = QDialog(self)
             dlg.setWindowTitle("AST Tree - Full View")
@@ -378,7 +448,6 @@ class ASTDesktopApp(QMainWindow):
             vbox = QVBoxLayout(dlg)
             img_label = QLabel()
             img_label.setAlignment(Qt.AlignCenter)
-            pixmap = QPixmap(TREE_FILE)
             img_label.setPixmap(pixmap.scaled(850, 650, Qt.KeepAspectRatio, Qt.SmoothTransformation))
             vbox.addWidget(img_label)
             close_btn = QPushButton("Close")
@@ -386,6 +455,16 @@ class ASTDesktopApp(QMainWindow):
             vbox.addWidget(close_btn)
             dlg.exec_()
 
+    def full_view_renders(self):
+        # The confirmation thumbnail is drawn within NODE_BUDGET; the full
+        # view has no way to expand Collapsed nodes, so it draws every node
+        renders = self.last_result.renders
+        if renders.max_nodes is None and renders.max_depth is None:
+            return renders
+        if self.full_renders is None or self.full_renders.ast is not renders.ast:
+            self.full_renders = Renders(renders.ast)
+        return self.full_renders
+
     def refresh_history(self):
         self.history_combo.clear()
         self.user_action_list.clear()
@@ -446,12 +525,13 @@ class ASTDesktopApp(QMainWindow):
             self.history_combo.setCurrentIndex(0)
         try:
             start_time = time.time()
-            subprocess.run([sys.executable, 'lexer.py'], cwd=BACKEND_DIR, check=True)
-            subprocess.run([sys.executable, 'parser.py'], cwd=BACKEND_DIR, check=True)
-            subprocess.run([sys.executable, 'ast_visualizer.py'], cwd=BACKEND_DIR, check=True)
+            hits = self.result_cache.hits
+            self.last_result = self.result_cache.run(self.pipeline, code)
             end_time = time.time()
-            self.timing_label.setText(f"AST Generation Time: {end_time - start_time:.3f}s")
-        except subprocess.CalledProcessError as e:
+            self.last_result.save(BACKEND_DIR)
+            cached = " (cached)" if self.result_cache.hits > hits else ""
+            self.timing_label.setText(f"AST Generation Time: {end_time - start_time:.3f}s{cached}")
+        except Exception as e:
             msg_box = QMessageBox(self)
             msg_box.setIcon(QMessageBox.Critical)
             msg_box.setWindowTitle("Pipeline Error")
@@ -466,22 +546,61 @@ class ASTDesktopApp(QMainWindow):
         if not code.strip():
             self.entity_text.setPlainText("")
             return
-        tokens_file = os.path.join(BACKEND_DIR, 'tokens.json')
-        if os.path.exists(tokens_file):
-            with open(tokens_file, 'r', encoding='utf-8') as f:
-                tokens = json.load(f)
-            operators = set()
-            functions = set()
-            for i, token in enumerate(tokens):
-                if token[0] == "OPERATOR":
-                    operators.add(token[1])
-                if token[0] == "IDENTIFIER":
-                    if i + 1 < len(tokens) and tokens[i + 1][0] == "SEPARATOR" and tokens[i + 1][1] == "(":
-                        functions.add(token[1])
-            text = f"Operators: {sorted(list(operators))}\n\nFunctions: {sorted(list(functions))}"
-            self.entity_text.setPlainText(text)
+        if self.last_result is not None:
+            entities = self.last_result.entities
+        elif os.path.exists(TOKENS_BIN_FILE):
+            with TokenFile(TOKENS_BIN_FILE) as token_file:
+                entities = get_entities_from_token_file(token_file)
+        else:
+            self.entity_text.setPlainText("No tokens found.")
+            return
+        sections = [
+            ("Operators", entities["operator_usage"]),
+            ("Defined functions", entities["defined_functions"]),
+            ("Called functions", entities["called_functions"]),
+        ]
+        text = []
+        for title, usage in sections:
+            text.append(f"{title}:")
+            for name, entry in usage.items():
+                lines = ", ".join(map(str, entry["lines"]))
+                text.append(f"  {name:<12} x{entry['count']:<4} line(s) {lines}")
+            text.append("")
+        self.entity_text.setPlainText("\n".join(text))
+
+    def lookup_entity(self):
+        name = self.entity_lookup.text().strip()
+        if not name:
+            self.entity_lookup_result.setText("")
+            return
+        if self.last_result is not None and self.last_result.occurrences is not None:
+            occurrences = self.last_result.occurrences.occurrences(name)
+        elif os.path.exists(OCCURRENCES_FILE):
+            with OccurrenceFile(OCCURRENCES_FILE) as index:
+                occurrences = index.occurrences(name)
         else:
-            self.entity_text.setPlainText("No tokens.json found.")
+            self.entity_lookup_result.setText("No occurrence index found.")
+            return
+        if not occurrences:
+            self.entity_lookup_result.setText(f"'{name}' does not occur in the code.")
+            return
+        lines = sorted({line for _, line in occurrences})
+        self.entity_lookup_result.setText(
+            f"'{name}': {len(occurrences)} occurrence(s) on line(s) {', '.join(map(str, lines))}"
+        )
+
+    def metrics_text(self, metrics):
+        lines = [
+            f"Number of AST Nodes: {metrics.node_count}",
+            f"Max depth: {metrics.max_depth}  |  Max fan-out: {max(metrics.fanout, default=0)}",
+            f"Functions: {len(metrics.defined_functions)} defined, {len(metrics.called_functions)} called  |  "
+            f"Variables: {len(metrics.variables)}",
+        ]
+        if metrics.diagnostics:
+            lines.append("Diagnostics: " + "; ".join(metrics.diagnostics[:5]))
+            if len(metrics.diagnostics) > 5:
+                lines[-1] += f" (+{len(metrics.diagnostics) - 5} more)"
+        return "\n".join(lines)
 
     def update_confirmation_widget(self):
         code = self.code_edit.toPlainText()
@@ -500,14 +619,14 @@ class ASTDesktopApp(QMainWindow):
                 with open(AST_FILE, 'r', encoding='utf-8') as f:
                     ast_content = f.read()
                     self.confirm_ast.setPlainText(ast_content)
-                    # Count the number of nodes in the AST JSON
+                    # Metrics come with the pipeline result; for an AST loaded
+                    # from disk they are computed in one pass over it
                     try:
-                        ast_data = json.loads(ast_content)
-                        if isinstance(ast_data, dict) and "body" in ast_data:
-                            node_count = len(ast_data["body"])
+                        if self.last_result is not None and self.last_result.metrics is not None:
+                            metrics = self.last_result.metrics
                         else:
-                            node_count = 0
-                        self.confirm_nodes.setText(f"Number of AST Nodes: {node_count}")
+                            metrics = compute_metrics(json.loads(ast_content))
+                        self.confirm_nodes.setText(self.metrics_text(metrics))
                     except json.JSONDecodeError:
                         self.confirm_nodes.setText("Number of AST Nodes: Error parsing JSON")
             except Exception as e:
@@ -516,7 +635,17 @@ class ASTDesktopApp(QMainWindow):
         else:
             self.confirm_ast.setPlainText("AST JSON not found.")
             self.confirm_nodes.setText("Number of AST Nodes: 0")
-        if os.path.exists(TREE_FILE):
+        if self.last_result is not None and self.last_result.renders is not None:
+            renders = self.last_result.renders
+            if renders.ready("thumbnail"):
+                self.show_thumbnail(renders, renders.get("thumbnail"))
+            else:
+                # The low-dpi thumbnail is rendered in the background and shown when done
+                self.confirm_tree.setText("Rendering AST tree...")
+                renders.request("thumbnail").add_done_callback(
+                    lambda future: self.thumbnail_ready.emit(renders, None if future.exception() else future.result())
+                )
+        elif os.path.exists(TREE_FILE):
             self.confirm_tree.clear()
             pixmap = QPixmap()
             for _ in range(3):
@@ -525,16 +654,31 @@ class ASTDesktopApp(QMainWindow):
                     break
                 time.sleep(0.1)
             if not pixmap.isNull():
-                label_width = self.confirm_tree.width()
-                label_height = self.confirm_tree.height()
-                self.confirm_tree.setPixmap(
-                    pixmap.scaled(label_width, label_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                )
+                self.set_tree_pixmap(pixmap)
             else:
                 self.confirm_tree.setText("AST Tree image could not be loaded.")
         else:
             self.confirm_tree.setText("AST Tree image not found.")
 
+    def show_thumbnail(self, renders, image):
+        # Thumbnails of an older run are dropped
+        if self.last_result is None or self.last_result.renders is not renders:
+            return
+        pixmap = QPixmap()
+        if image is not None:
+            pixmap.loadFromData(image)
+        if pixmap.isNull():
+            self.confirm_tree.setText("AST Tree image could not be rendered.")
+        else:
+            self.set_tree_pixmap(pixmap)
+
+    def set_tree_pixmap(self, pixmap):
+        label_width = self.confirm_tree.width()
+        label_height = self.confirm_tree.height()
+        self.confirm_tree.setPixmap(
+            pixmap.scaled(label_width, label_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        )
+
     def clear_code_editor(self):
         self.code_edit.clear()
 
@@ -0,0 +1,90 @@
+from collections import Counter
+
+from ast_walker import walk
+from semantic_analyzer import SCOPE_EXITS, Resolver
+
+
+class ASTMetrics:
+    """Node counts, shape, entities and diagnostics of one AST.
+
+    Built by compute_metrics() in a single walk that also runs the Resolver.
+    The elif_blocks entries are not counted as nodes; their children count
+    towards the IfStatement they belong to.
+    """
+
+    def __init__(self):
+        self.node_count = 0
+        self.type_counts = Counter()
+        self.max_depth = 0
+        # number of children -> number of nodes with that many children
+        self.fanout = Counter()
+        self.operators = Counter()
+        self.defined_functions = Counter()
+        self.called_functions = Counter()
+        self.variables = Counter()
+        self.diagnostics = []
+
+    def to_dict(self):
+        return {
+            "node_count": self.node_count,
+            "type_counts": dict(self.type_counts.most_common()),
+            "max_depth": self.max_depth,
+            "fanout": {str(children): count for children, count in sorted(self.fanout.items())},
+            "entities": {
+                "operators": dict(sorted(self.operators.items())),
+                "defined_functions": dict(sorted(self.defined_functions.items())),
+                "called_functions": dict(sorted(self.called_functions.items())),
+                "variables": dict(sorted(self.variables.items())),
+            },
+            "diagnostics": list(self.diagnostics),
+        }
+
+
+def compute_metrics(ast):
+    metrics = ASTMetrics()
+    resolver = Resolver(ast)
+    resolver_enter = resolver.enter
+    type_counts = metrics.type_counts
+    operators = metrics.operators
+    # Keyed by id() of typed nodes; ints only, so the cyclic GC has nothing to track
+    depths = {}
+    child_counts = Counter()
+    # id(elif entry) -> id(its IfStatement)
+    owners = {}
+
+    def enter(node, parent):
+        node_type = node.get("type")
+        if parent is None:
+            depths[id(node)] = 1
+        else:
+            parent_id = owners.get(id(parent), id(parent))
+            if node_type is None:
+                owners[id(node)] = parent_id
+            else:
+                child_counts[parent_id] += 1
+                depths[id(node)] = depths[parent_id] + 1
+        if node_type is None:
+            return
+        type_counts[node_type] += 1
+        if node_type == "BinaryExpression" or node_type == "UnaryExpression" or node_type == "AugmentedAssignment":
+            operators[node["operator"]] += 1
+        elif node_type == "Assignment":
+            operators["="] += 1
+        elif node_type == "FunctionDefinition":
+            metrics.defined_functions[node["name"]] += 1
+        elif node_type == "FunctionCall" and node["callee"].get("type") == "Identifier":
+            metrics.called_functions[node["callee"]["name"]] += 1
+        resolver_enter(node, parent)
+
+    walk(ast, enter, resolver.exit, SCOPE_EXITS)
+    resolver.finish()
+
+    metrics.node_count = sum(type_counts.values())
+    metrics.max_depth = max(depths.values(), default=0)
+    for node_id in depths:
+        metrics.fanout[child_counts.get(node_id, 0)] += 1
+    for declaration in resolver.declarations:
+        if declaration.kind != "function":
+            metrics.variables[declaration.name] += 1
+    metrics.diagnostics = resolver.errors
+    return metrics
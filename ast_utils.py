@@ -1,28 +1,78 @@
-import subprocess
-import json
-import os
-
-def run_full_pipeline(source_file):
-    # Run lexer
-    subprocess.run(["python", "lexer.py"], check=True)
-    # Run parser
-    subprocess.run(["python", "parser.py"], check=True)
-    # Run visualizer
-    subprocess.run(["python", "ast_visualizer.py"], check=True)
-
-
-def get_entities_from_tokens(tokens):
-    operators = set()
-    functions = set()
-    for token in tokens:
-        if token[0] == "OPERATOR":
-            operators.add(token[1])
-        if token[0] == "IDENTIFIER":
-            # Heuristic: function names are followed by '('
-            idx = tokens.index(token)
-            if idx + 1 < len(tokens) and tokens[idx + 1][0] == "SEPARATOR" and tokens[idx + 1][1] == "(":
-                functions.add(token[1])
-    return {
-        "operators": sorted(list(operators)),
-        "functions": sorted(list(functions))
-    } 
\ No newline at end of file
+import os
+
+from lexer import KIND_CODES
+
+def run_full_pipeline(source_file):
+    # Lex, parse and render in-process; artifacts land next to the source file
+    from pipeline import Pipeline
+    result = Pipeline().run_file(source_file)
+    result.save(os.path.dirname(os.path.abspath(source_file)))
+    return result
+
+
+def _record(table, name, line):
+    entry = table.get(name)
+    if entry is None:
+        entry = table[name] = [0, []]
+    entry[0] += 1
+    if line is not None and (not entry[1] or entry[1][-1] != line):
+        entry[1].append(line)
+
+
+def scan_entities(records, kinds, open_paren, def_keyword):
+    # Single pass over (kind, value, line) records. kinds is the
+    # (operator, identifier, separator, keyword) encoding used by the records,
+    # so the same scan works on token tuples and on raw TokenFile records.
+    # Returns {value: [count, lines]} tables for operators, called and defined functions.
+    operator, identifier, separator, keyword = kinds
+    operators = {}
+    called = {}
+    defined = {}
+    pending = None
+    after_def = False
+    for kind, value, line in records:
+        if pending is not None and kind == separator and value == open_paren:
+            name, name_line, is_definition = pending
+            _record(defined if is_definition else called, name, name_line)
+        pending = (value, line, after_def) if kind == identifier else None
+        after_def = kind == keyword and value == def_keyword
+        if kind == operator:
+            _record(operators, value, line)
+    return operators, called, defined
+
+
+def entity_report(operators, called, defined, decode=str):
+    def usage(table):
+        named = {decode(value): entry for value, entry in table.items()}
+        return {name: {"count": named[name][0], "lines": named[name][1]} for name in sorted(named)}
+
+    operator_usage = usage(operators)
+    called_functions = usage(called)
+    defined_functions = usage(defined)
+    return {
+        "operators": list(operator_usage),
+        "functions": sorted(set(called_functions) | set(defined_functions)),
+        "operator_usage": operator_usage,
+        "called_functions": called_functions,
+        "defined_functions": defined_functions,
+    }
+
+
+def get_entities_from_tokens(tokens):
+    # Lines are reported when the tokens carry them (TokenBuffer), otherwise left empty
+    lines = getattr(tokens, "lines", None)
+    if lines is not None:
+        records = ((kind, value, line) for (kind, value), line in zip(tokens, lines))
+    else:
+        records = ((token[0], token[1], None) for token in tokens)
+    tables = scan_entities(records, ("OPERATOR", "IDENTIFIER", "SEPARATOR", "KEYWORD"), "(", "def")
+    return entity_report(*tables)
+
+
+def get_entities_from_token_file(token_file):
+    # Same result as get_entities_from_tokens for a binary_format.TokenFile,
+    # scanning the raw records and decoding only the strings it reports
+    kinds = (KIND_CODES["OPERATOR"], KIND_CODES["IDENTIFIER"], KIND_CODES["SEPARATOR"], KIND_CODES["KEYWORD"])
+    records = ((code, value, line) for code, value, line, _ in token_file.iter_records())
+    tables = scan_entities(records, kinds, token_file.string_id("("), token_file.string_id("def"))
+    return entity_report(*tables, decode=token_file.string)
@@ -1,158 +1,422 @@
-import json
-from graphviz import Digraph
-
-# Function to load AST from a JSON file
-def load_ast(filename="ast.json"):
-    try:
-        with open(filename, "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        exit(1)
-    except json.JSONDecodeError:
-        print("Error: Failed to decode JSON from AST file.")
-        exit(1)
-
-def get_node_color(node_type):
-    colors = {
-        "Program": "#4A90E2",  # Blue
-        "Assignment": "#50E3C2",  # Teal
-        "BinaryExpression": "#F5A623",  # Orange
-        "UnaryExpression": "#F5A623",  # Orange
-        "Number": "#7ED321",  # Green
-        "String": "#7ED321",  # Green
-        "Identifier": "#BD10E0",  # Purple
-        "IfStatement": "#D0021B",  # Red
-        "WhileStatement": "#D0021B",  # Red
-        "ForStatement": "#D0021B",  # Red
-        "FunctionDefinition": "#9013FE",  # Deep Purple
-        "PrintStatement": "#4A90E2",  # Blue
-        "ReturnStatement": "#4A90E2",  # Blue
-        "BreakStatement": "#4A90E2",  # Blue
-        "ContinueStatement": "#4A90E2",  # Blue
-        "Boolean": "#7ED321",  # Green
-        "None": "#7ED321",  # Green
-        "AugmentedAssignment": "#50E3C2",  # Teal
-    }
-    return colors.get(node_type, "#9B9B9B")  # Default gray
-
-def get_node_label(node):
-    node_type = node.get("type", "Unknown")
-    label = node_type
-
-    if node_type == "Number":
-        label += f"\n{node['value']}"
-    elif node_type == "String":
-        label += f"\n'{node['value']}'"
-    elif node_type == "Identifier":
-        label += f"\n{node['name']}"
-    elif node_type == "BinaryExpression":
-        label += f"\n{node['operator']}"
-    elif node_type == "UnaryExpression":
-        label += f"\n{node['operator']}"
-    elif node_type == "Assignment":
-        label += f"\n{node['name']} ="
-    elif node_type == "AugmentedAssignment":
-        label += f"\n{node['left']['name']} {node['operator']}"
-    elif node_type == "PrintStatement":
-        label += "\nprint"
-    elif node_type == "IfStatement":
-        label += "\nif"
-    elif node_type == "WhileStatement":
-        label += "\nwhile"
-    elif node_type == "ForStatement":
-        label += "\nfor"
-    elif node_type == "FunctionDefinition":
-        label += f"\ndef {node['name']}"
-    elif node_type == "ReturnStatement":
-        label += "\nreturn"
-    elif node_type == "Boolean":
-        label += f"\n{node['value']}"
-    elif node_type == "None":
-        label += "\nNone"
-
-    return label
-
-# Recursive function to add nodes and edges to the Graphviz Digraph
-def add_nodes_edges(ast, dot, parent_id=None, node_id=[0]):
-    current_id = str(node_id[0])
-    node_type = ast.get("type", "Unknown")
-    label = get_node_label(ast)
-    color = get_node_color(node_type)
-
-    # Create node with styling
-    dot.node(current_id, label, 
-             style="filled",
-             fillcolor=color,
-             fontcolor="white",
-             shape="box",
-             margin="0.2",
-             fontname="Arial")
-
-    if parent_id is not None:
-        dot.edge(parent_id, current_id, color="#666666")
-
-    node_id[0] += 1
-
-    # Handle different node types
-    if node_type == "Program":
-        for stmt in ast.get("body", []):
-            add_nodes_edges(stmt, dot, current_id, node_id)
-    elif node_type == "BinaryExpression":
-        add_nodes_edges(ast["left"], dot, current_id, node_id)
-        add_nodes_edges(ast["right"], dot, current_id, node_id)
-    elif node_type == "UnaryExpression":
-        add_nodes_edges(ast["right"], dot, current_id, node_id)
-    elif node_type == "Assignment":
-        add_nodes_edges(ast["value"], dot, current_id, node_id)
-    elif node_type == "AugmentedAssignment":
-        add_nodes_edges(ast["right"], dot, current_id, node_id)
-    elif node_type == "PrintStatement":
-        for arg in ast.get("arguments", []):
-            add_nodes_edges(arg, dot, current_id, node_id)
-    elif node_type == "IfStatement":
-        add_nodes_edges(ast["condition"], dot, current_id, node_id)
-        for stmt in ast.get("body", []):
-            add_nodes_edges(stmt, dot, current_id, node_id)
-        for elif_block in ast.get("elif_blocks", []):
-            add_nodes_edges(elif_block["condition"], dot, current_id, node_id)
-            for stmt in elif_block.get("body", []):
-                add_nodes_edges(stmt, dot, current_id, node_id)
-        if ast.get("else_block"):
-            for stmt in ast["else_block"]:
-                add_nodes_edges(stmt, dot, current_id, node_id)
-    elif node_type == "WhileStatement":
-        add_nodes_edges(ast["condition"], dot, current_id, node_id)
-        for stmt in ast.get("body", []):
-            add_nodes_edges(stmt, dot, current_id, node_id)
-    elif node_type == "ForStatement":
-        # Fix: Wrap variable in Identifier node if it's a string
-        variable = ast["variable"]
-        if isinstance(variable, str):
-            variable = {"type": "Identifier", "name": variable}
-        add_nodes_edges(variable, dot, current_id, node_id)
-        add_nodes_edges(ast["iterable"], dot, current_id, node_id)
-        for stmt in ast.get("body", []):
-            add_nodes_edges(stmt, dot, current_id, node_id)
-    elif node_type == "FunctionDefinition":
-        for stmt in ast.get("body", []):
-            add_nodes_edges(stmt, dot, current_id, node_id)
-    elif node_type == "ReturnStatement" and ast.get("value"):
-        add_nodes_edges(ast["value"], dot, current_id, node_id)
-
-# Function to visualize AST and save it as a PNG
-def visualize_ast(ast):
-    dot = Digraph(comment="Abstract Syntax Tree", format='png')
-    dot.attr(rankdir='TB', size='8,5', dpi='300')
-    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial')
-    dot.attr('edge', fontname='Arial')
-    
-    add_nodes_edges(ast, dot)
-    
-    output_path = dot.render("ast_output", cleanup=True)
-    print(f"AST visualized and saved as: {output_path}")
-
-# Main entry point
-if __name__ == "__main__":
-    ast = load_ast("ast.json")
-    visualize_ast(ast)
+import json
+from xml.sax.saxutils import escape
+
+import numpy as np
+from graphviz import Digraph
+
+from ast_walker import children, walk
+from dot_fragments import FragmentCache, dot_statements
+from tree_layout import tidy_layout
+
+# Text metrics for the SVG backend: Arial at FONT_SIZE px averages about
+# CHAR_WIDTH px per character
+FONT_SIZE = 13
+CHAR_WIDTH = 7.5
+LINE_HEIGHT = 16
+NODE_PADDING_X = 16
+NODE_PADDING_Y = 10
+
+# Nodes drawn by a level-of-detail render before the rest is collapsed
+DEFAULT_NODE_BUDGET = 300
+
+# Function to load AST from a JSON file
+def load_ast(filename="ast.json"):
+    try:
+        with open(filename, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        exit(1)
+    except json.JSONDecodeError:
+        print("Error: Failed to decode JSON from AST file.")
+        exit(1)
+
+def get_node_color(node_type):
+    colors = {
+        "Program": "#4A90E2",  # Blue
+        "Assignment": "#50E3C2",  # Teal
+        "BinaryExpression": "#F5A623",  # Orange
+        "UnaryExpression": "#F5A623",  # Orange
+        "Number": "#7ED321",  # Green
+        "String": "#7ED321",  # Green
+        "Identifier": "#BD10E0",  # Purple
+        "IfStatement": "#D0021B",  # Red
+        "WhileStatement": "#D0021B",  # Red
+        "ForStatement": "#D0021B",  # Red
+        "FunctionDefinition": "#9013FE",  # Deep Purple
+        "PrintStatement": "#4A90E2",  # Blue
+        "ReturnStatement": "#4A90E2",  # Blue
+        "BreakStatement": "#4A90E2",  # Blue
+        "ContinueStatement": "#4A90E2",  # Blue
+        "Boolean": "#7ED321",  # Green
+        "None": "#7ED321",  # Green
+        "AugmentedAssignment": "#50E3C2",  # Teal
+    }
+    return colors.get(node_type, "#9B9B9B")  # Default gray
+
+def get_node_label(node):
+    node_type = node.get("type", "Unknown")
+    label = node_type
+
+    if node_type == "Number":
+        label += f"\n{node['value']}"
+    elif node_type == "String":
+        label += f"\n'{node['value']}'"
+    elif node_type == "Identifier":
+        label += f"\n{node['name']}"
+    elif node_type == "BinaryExpression":
+        label += f"\n{node['operator']}"
+    elif node_type == "UnaryExpression":
+        label += f"\n{node['operator']}"
+    elif node_type == "Assignment":
+        label += f"\n{node['name']} ="
+    elif node_type == "AugmentedAssignment":
+        label += f"\n{node['left']['name']} {node['operator']}"
+    elif node_type == "PrintStatement":
+        label += "\nprint"
+    elif node_type == "IfStatement":
+        label += "\nif"
+    elif node_type == "WhileStatement":
+        label += "\nwhile"
+    elif node_type == "ForStatement":
+        label += "\nfor"
+    elif node_type == "FunctionDefinition":
+        label += f"\ndef {node['name']}"
+    elif node_type == "ReturnStatement":
+        label += "\nreturn"
+    elif node_type == "Boolean":
+        label += f"\n{node['value']}"
+    elif node_type == "None":
+        label += "\nNone"
+
+    return label
+
+# Function to list the nodes that are drawn, in pre-order: labels, node types
+# and the index of each node's parent (-1 for the root). The elif_blocks
+# entries are not drawn; their children hang off the IfStatement. A for
+# loop's variable is a plain string and is drawn as an Identifier child.
+def display_tree(ast):
+    labels = []
+    types = []
+    parents = []
+    # id(dict node) -> index of the drawn node it maps to
+    indices = {}
+
+    def add(node, parent_index):
+        labels.append(get_node_label(node))
+        types.append(node.get("type", "Unknown"))
+        parents.append(parent_index)
+        return len(labels) - 1
+
+    def enter(node, parent):
+        parent_index = -1 if parent is None else indices[id(parent)]
+        if "type" not in node and parent is not None:
+            indices[id(node)] = parent_index
+            return
+        index = indices[id(node)] = add(node, parent_index)
+        if node.get("type") == "ForStatement":
+            variable = node["variable"]
+            if isinstance(variable, str):
+                variable = {"type": "Identifier", "name": variable}
+            add(variable, index)
+
+    walk(ast, enter)
+    return labels, types, parents
+
+# Function to list a drawn node's drawn children, in display_tree order
+def display_children(node):
+    kids = []
+    if node.get("type") == "ForStatement":
+        variable = node["variable"]
+        kids.append({"type": "Identifier", "name": variable} if isinstance(variable, str) else variable)
+    for child in children(node):
+        if "type" in child:
+            kids.append(child)
+        else:
+            kids.extend(display_children(child))
+    return kids
+
+# Function to find a drawn node by its path: the position of each node among
+# its parent's display_children(), from the root down
+def find_display_node(ast, path):
+    node = ast
+    for depth, position in enumerate(path):
+        kids = display_children(node)
+        if not 0 <= position < len(kids):
+            raise ValueError(f"No node at path {format_path(path[:depth + 1])}")
+        node = kids[position]
+    return node
+
+def format_path(path):
+    return ".".join(map(str, path))
+
+def parse_path(text):
+    try:
+        return tuple(int(part) for part in text.split(".")) if text else ()
+    except ValueError:
+        raise ValueError(f"Invalid node path: {text}")
+
+# Function to list the drawn nodes of the subtree at path like display_tree,
+# but level of detail limited: breadth first, at most max_nodes nodes and
+# none more than max_depth levels below the subtree root. The children left
+# out of each node are drawn as one Collapsed summary node with their count.
+# expansions maps each summary node's index to the (path, start) arguments
+# that draw what it hides: start skips the children that are already drawn.
+# The work done is bounded by max_nodes, not by the size of the AST.
+def summary_tree(ast, max_depth=None, max_nodes=DEFAULT_NODE_BUDGET, path=(), start=0):
+    if max_nodes is not None and max_nodes < 1:
+        raise ValueError(f"max_nodes must be at least 1, not {max_nodes}")
+    path = tuple(path)
+    budget = max_nodes - 1 if max_nodes is not None else float("inf")
+    # (node, path, depth, first drawn child) in breadth first order
+    queue = [(find_display_node(ast, path), path, 0, start)]
+    # per queue entry: queue positions of its drawn children, hidden child
+    # count, position of the first hidden child
+    plan = []
+    position = 0
+    while position < len(queue):
+        node, node_path, depth, first = queue[position]
+        kids = display_children(node)
+        count = 0 if max_depth is not None and depth >= max_depth else max(len(kids) - first, 0)
+        count = int(min(count, budget))
+        budget -= count
+        plan.append((range(len(queue), len(queue) + count), len(kids) - first - count, first + count))
+        queue.extend((kids[i], node_path + (i,), depth + 1, 0) for i in range(first, first + count))
+        position += 1
+
+    labels = []
+    types = []
+    parents = []
+    expansions = {}
+    # (hidden count, path, start) of each summary node
+    summaries = []
+    # Pre-order output; a summary node is its parent's last child
+    stack = [(0, -1)]
+    while stack:
+        position, parent = stack.pop()
+        index = len(labels)
+        parents.append(parent)
+        if position < 0:
+            hidden, node_path, first = summaries[~position]
+            labels.append(f"Collapsed\n{hidden} more" if first else f"Collapsed\n{hidden} hidden")
+            types.append("Collapsed")
+            expansions[index] = (node_path, first)
+            continue
+        node, node_path = queue[position][:2]
+        labels.append(get_node_label(node))
+        types.append(node.get("type", "Unknown"))
+        drawn, hidden, first = plan[position]
+        if hidden:
+            summaries.append((hidden, node_path, first))
+            stack.append((~(len(summaries) - 1), index))
+        stack.extend((child, index) for child in reversed(drawn))
+    return labels, types, parents, expansions
+
+# DOT fragments of recently drawn subtrees, shared by every render in the process
+fragment_cache = FragmentCache()
+
+# Function to get the attribute list text of a node statement, as
+# Digraph.node() writes it
+def node_attributes(label, node_type):
+    scratch = Digraph()
+    scratch.node("0", label,
+                 style="filled",
+                 fillcolor=get_node_color(node_type),
+                 fontcolor="white",
+                 shape="box",
+                 margin="0.2",
+                 fontname="Arial")
+    return scratch.body[0][len("\t0"):-1]
+
+def edge_attributes():
+    scratch = Digraph()
+    scratch.edge("0", "1", color="#666666")
+    return scratch.body[0][len("\t0 -> 1"):-1]
+
+EDGE_ATTRIBUTES = edge_attributes()
+
+# Function to add the nodes and edges of display_tree() lists to a Graphviz
+# Digraph; node ids are numbered from first. Unchanged subtrees are copied
+# from fragment_cache. Collapsed nodes are dashed and carry their expansion
+# as the node id.
+def add_display_nodes(dot, labels, types, parents, first=0, parent_id=None, expansions=None):
+    if not expansions and parent_id is None:
+        dot.body.append(dot_statements(labels, types, parents, node_attributes, EDGE_ATTRIBUTES, fragment_cache, first))
+        return
+    expansions = expansions or {}
+    for index, (label, node_type, parent) in enumerate(zip(labels, types, parents)):
+        current_id = str(first + index)
+        attributes = {"style": "filled"}
+        if index in expansions:
+            node_path, start = expansions[index]
+            attributes = {"style": "filled,dashed", "id": f"collapsed:{format_path(node_path)}:{start}"}
+        # Create node with styling
+        dot.node(current_id, label,
+                 fillcolor=get_node_color(node_type),
+                 fontcolor="white",
+                 shape="box",
+                 margin="0.2",
+                 fontname="Arial",
+                 **attributes)
+        parent_graph_id = parent_id if parent < 0 else str(first + parent)
+        if parent_graph_id is not None:
+            dot.edge(parent_graph_id, current_id, color="#666666")
+
+# Function to add nodes and edges to the Graphviz Digraph, numbering nodes
+# from first; returns the next free node number. All numbering state is local
+# to the call, so graphs can be built from several threads at once.
+def add_nodes_edges(ast, dot, parent_id=None, first=0):
+    labels, types, parents = display_tree(ast)
+    add_display_nodes(dot, labels, types, parents, first, parent_id)
+    return first + len(labels)
+
+# Function to create the styled, empty Graphviz Digraph every render uses
+def new_graph(dpi='300'):
+    dot = Digraph(comment="Abstract Syntax Tree", format='png')
+    dot.attr(rankdir='TB', size='8,5', dpi=dpi)
+    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial')
+    dot.attr('edge', fontname='Arial')
+    return dot
+
+# Function to build the styled Graphviz Digraph for an AST
+def build_graph(ast, dpi='300'):
+    dot = new_graph(dpi)
+    add_nodes_edges(ast, dot)
+    return dot
+
+# Function to build the styled Graphviz Digraph for display_tree() lists
+def display_graph(labels, types, parents, expansions=None, dpi='300'):
+    dot = new_graph(dpi)
+    add_display_nodes(dot, labels, types, parents, expansions=expansions)
+    return dot
+
+# Function to render display_tree() lists to PNG bytes with Graphviz
+def display_png(labels, types, parents, expansions=None):
+    return display_graph(labels, types, parents, expansions).pipe(format='png')
+
+# Function to render an AST to PNG bytes in memory
+def render_ast_png(ast):
+    return build_graph(ast).pipe(format='png')
+
+# Function to lay out display_tree() lists with the tidy tree layout; node
+# boxes are sized from their label text
+def layout_display(labels, parents):
+    lines = [label.split("\n") for label in labels]
+    widths = np.array([max(map(len, label_lines)) for label_lines in lines]) * CHAR_WIDTH + 2 * NODE_PADDING_X
+    heights = np.array([len(label_lines) for label_lines in lines]) * LINE_HEIGHT + 2 * NODE_PADDING_Y
+    return tidy_layout(parents, widths, heights), lines
+
+# Function to lay out the drawn nodes of an AST
+def layout_ast(ast):
+    labels, types, parents = display_tree(ast)
+    layout, lines = layout_display(labels, parents)
+    return layout, lines, types
+
+# Function to render display_tree() lists to SVG bytes without Graphviz.
+# Collapsed nodes carry their expansion in data-path / data-start attributes.
+def display_svg(labels, types, parents, expansions=None):
+    layout, lines = layout_display(labels, parents)
+    width = layout.width + 10
+    height = layout.height + 10
+    return svg_document(
+        width, height, (0, 0, width, height),
+        svg_edges(layout, np.arange(len(parents))) + svg_nodes(layout, lines, types, np.arange(len(lines)), expansions),
+    )
+
+# Function to wrap SVG elements in a document of the given pixel size that
+# shows the view_box (x, y, width, height) of the drawing
+def svg_document(width, height, view_box, elements):
+    x, y, view_width, view_height = view_box
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="{x:.1f} {y:.1f} {view_width:.1f} {view_height:.1f}" font-family="Arial" font-size="{FONT_SIZE}">',
+        f'<rect x="{x:.1f}" y="{y:.1f}" width="{view_width:.1f}" height="{view_height:.1f}" fill="white"/>',
+    ]
+    out.extend(elements)
+    out.append("</svg>")
+    return "\n".join(out).encode("utf-8")
+
+# Function to draw the edges into the given laid-out nodes as one path, from
+# the bottom of the parent to the top of the child
+def svg_edges(layout, nodes):
+    nodes = np.asarray(nodes, dtype=np.int64)
+    nodes = nodes[layout.parents[nodes] >= 0]
+    parents = layout.parents[nodes]
+    segments = zip(layout.x[parents].tolist(), (layout.y + layout.heights)[parents].tolist(),
+                   layout.x[nodes].tolist(), layout.y[nodes].tolist())
+    edges = "".join(f"M{x1:.1f} {y1:.1f}L{x2:.1f} {y2:.1f}" for x1, y1, x2, y2 in segments)
+    return [f'<path d="{edges}" stroke="#666666" fill="none"/>'] if edges else []
+
+# Function to draw the given laid-out nodes as boxes with their label lines;
+# text=False leaves the labels out
+def svg_nodes(layout, lines, types, nodes, expansions=None, text=True):
+    expansions = expansions or {}
+    nodes = np.asarray(nodes, dtype=np.int64)
+    boxes = zip(nodes.tolist(), layout.x[nodes].tolist(), layout.y[nodes].tolist(),
+                layout.widths[nodes].tolist(), layout.heights[nodes].tolist())
+    out = []
+    for index, x, y, width, height in boxes:
+        expansion = ""
+        if index in expansions:
+            node_path, start = expansions[index]
+            expansion = f' class="collapsed" data-path="{format_path(node_path)}" data-start="{start}"'
+        out.append(
+            f'<rect x="{x - width / 2:.1f}" y="{y:.1f}" width="{width:.1f}" height="{height:.1f}" '
+            f'rx="4" fill="{get_node_color(types[index])}"{expansion}/>'
+        )
+        if not text:
+            continue
+        text_y = y + NODE_PADDING_Y + LINE_HEIGHT - 4
+        spans = "".join(
+            f'<tspan x="{x:.1f}" y="{text_y + line * LINE_HEIGHT:.1f}">{escape(label_line)}</tspan>'
+            for line, label_line in enumerate(lines[index])
+        )
+        out.append(f'<text fill="white" text-anchor="middle">{spans}</text>')
+    return out
+
+# Function to render an AST to SVG bytes without Graphviz
+def render_ast_svg(ast):
+    return display_svg(*display_tree(ast))
+
+# Image renderers by backend name; each turns an AST into image bytes
+RENDER_BACKENDS = {
+    "graphviz": render_ast_png,
+    "svg": render_ast_svg,
+}
+
+# The same backends, drawing summary_tree() lists
+DISPLAY_RENDERERS = {
+    "graphviz": display_png,
+    "svg": display_svg,
+}
+
+# Function to render an AST with the named backend
+def render_ast(ast, backend="graphviz"):
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend: {backend}")
+    return RENDER_BACKENDS[backend](ast)
+
+# Function to render the subtree at path (the whole AST by default) with
+# subtrees past the node budget or depth collapsed; a Collapsed node is
+# expanded by calling this again with its path and start
+def render_subtree(ast, path=(), start=0, backend="graphviz", max_depth=None, max_nodes=DEFAULT_NODE_BUDGET):
+    if backend not in DISPLAY_RENDERERS:
+        raise ValueError(f"Unknown render backend: {backend}")
+    return DISPLAY_RENDERERS[backend](*summary_tree(ast, max_depth, max_nodes, path, start))
+
+# Function to visualize an AST with the named backend; returns the image
+# bytes, or writes them to output_path and returns that. Safe to call from
+# several threads at once.
+def visualize_ast(ast, output_path=None, backend="graphviz"):
+    image = render_ast(ast, backend)
+    if output_path is None:
+        return image
+    with open(output_path, "wb") as f:
+        f.write(image)
+    return output_path
+
+# Main entry point
+if __name__ == "__main__":
+    ast = load_ast("ast.json")
+    output_path = visualize_ast(ast, "ast_output.png")
+    print(f"AST visualized and saved as: {output_path}")
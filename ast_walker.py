@@ -0,0 +1,114 @@
+# Fields that hold child nodes, per node type, in source order. A field holds
+# a node or a list of nodes; None (a missing else_block or return value) is
+# skipped. The untyped dicts in IfStatement.elif_blocks are listed under None.
+# Adding a node type means adding its line here.
+CHILD_FIELDS = {
+    "Program": ("body",),
+    "Assignment": ("value",),
+    "AugmentedAssignment": ("left", "right"),
+    "BinaryExpression": ("left", "right"),
+    "UnaryExpression": ("right",),
+    "FunctionCall": ("callee", "arguments"),
+    "PrintStatement": ("arguments",),
+    "IfStatement": ("condition", "body", "elif_blocks", "else_block"),
+    None: ("condition", "body"),
+    "WhileStatement": ("condition", "body"),
+    "ForStatement": ("iterable", "body"),
+    "FunctionDefinition": ("body",),
+    "ReturnStatement": ("value",),
+    "Number": (),
+    "String": (),
+    "Identifier": (),
+    "Boolean": (),
+    "None": (),
+    "BreakStatement": (),
+    "ContinueStatement": (),
+}
+
+
+# Generated once: the same fields last to first, for pushing onto a stack
+REVERSED_CHILD_FIELDS = {node_type: fields[::-1] for node_type, fields in CHILD_FIELDS.items()}
+
+
+def child_fields(node, table=CHILD_FIELDS):
+    # Types missing from the table fall back to every dict or list value
+    fields = table.get(node.get("type"))
+    if fields is None:
+        fields = [key for key, value in node.items() if isinstance(value, (dict, list))]
+        if table is REVERSED_CHILD_FIELDS:
+            fields.reverse()
+    return fields
+
+
+def children(node):
+    # Child nodes of a dict node, in source order
+    result = []
+    for field in child_fields(node):
+        value = node.get(field)
+        if value.__class__ is dict:
+            result.append(value)
+        elif value.__class__ is list:
+            result.extend(item for item in value if item.__class__ is dict)
+    return result
+
+
+def walk(root, enter=None, exit=None, exit_types=None):
+    # Depth-first walk with an explicit stack, so nesting depth is not limited
+    # by the recursion limit. enter(node, parent) runs in pre-order and may
+    # return False to skip the node's subtree; exit(node, parent) runs in
+    # post-order once all children are done (not for skipped nodes), only for
+    # node types in exit_types if that is given. Stack entries are
+    # (node, parent) to visit or (node, parent, None) to exit.
+    stack = [(root, None)]
+    push = stack.append
+    pop = stack.pop
+    table = REVERSED_CHILD_FIELDS
+    while stack:
+        entry = pop()
+        if len(entry) == 3:
+            exit(entry[0], entry[1])
+            continue
+        node, parent = entry
+        if enter is not None and enter(node, parent) is False:
+            continue
+        node_type = node.get("type")
+        if exit is not None and (exit_types is None or node_type in exit_types):
+            push((node, parent, None))
+        fields = table.get(node_type)
+        if fields is None:
+            fields = child_fields(node, table)
+        for field in fields:
+            value = node.get(field)
+            if value.__class__ is dict:
+                push((value, node))
+            elif value.__class__ is list:
+                for item in reversed(value):
+                    if item.__class__ is dict:
+                        push((item, node))
+
+
+def iter_preorder(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        nodes = children(node)
+        nodes.reverse()
+        stack.extend(nodes)
+
+
+def iter_postorder(root):
+    # Reverse of a right-to-left pre-order
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(children(node))
+    order.reverse()
+    return iter(order)
+
+
+def count_nodes(root):
+    # Typed nodes only; the elif_blocks entries are not nodes of their own
+    return sum(1 for node in iter_preorder(root) if "type" in node)
@@ -0,0 +1,68 @@
+import tracemalloc
+
+from lexer import Lexer
+from parser import Parser
+from bench_utils import best_of, generate_source
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, peak
+
+
+def count_dict_types(ast):
+    counts = {}
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            node_type = node.get("type")
+            if node_type is not None:
+                counts[node_type] = counts.get(node_type, 0) + 1
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return counts
+
+
+def count_arena_types(arena):
+    counts = {}
+    for index in arena.walk():
+        node_type = arena.type_of(index)
+        if node_type is not None:
+            counts[node_type] = counts.get(node_type, 0) + 1
+    return counts
+
+
+def count_view_types(arena):
+    counts = {}
+    stack = [arena.root()]
+    while stack:
+        node = stack.pop()
+        counts[node.type] = counts.get(node.type, 0) + 1
+        stack.extend(node.children())
+    return counts
+
+
+# Memory held by the parsed AST and the cost of a full walk: dict tree vs NodeArena
+if __name__ == "__main__":
+    for n_functions in (100, 1000, 3000):
+        tokens = Lexer(source_code=generate_source(n_functions), engine="regex").tokenize()
+        ast, dict_bytes, dict_peak = measure(lambda: Parser(tokens, verbose=False).parse())
+        arena, arena_bytes, arena_peak = measure(lambda: Parser(tokens, verbose=False).parse_arena())
+        assert count_dict_types(ast) == count_arena_types(arena)
+        n_nodes = len(arena)
+        print(f"{n_nodes} nodes -> dict tree {dict_bytes / 2**20:.1f} MiB (peak {dict_peak / 2**20:.1f}), "
+              f"arena {arena_bytes / 2**20:.1f} MiB (peak {arena_peak / 2**20:.1f}, arrays {arena.nbytes() / 2**20:.1f})")
+        rows = [
+            ("walk dict tree", lambda: count_dict_types(ast)),
+            ("walk arena indices", lambda: count_arena_types(arena)),
+            ("arena.type_counts()", lambda: arena.type_counts()),
+            ("walk ArenaNode views", lambda: count_view_types(arena)),
+            ("arena.to_dict()", lambda: arena.to_dict()),
+        ]
+        for label, func in rows:
+            print(f"    {label:<24} {best_of(func, repeat=3) * 1000:9.2f} ms")
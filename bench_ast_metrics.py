@@ -0,0 +1,41 @@
+from collections import Counter
+
+from ast_metrics import compute_metrics
+from ast_walker import children, count_nodes, iter_preorder, walk
+from bench_utils import best_of, generate_source
+from pipeline import Pipeline
+from semantic_analyzer import Resolver
+
+
+def separate_passes(ast):
+    # The same numbers, one walk per analysis
+    count_nodes(ast)
+    Counter(node["type"] for node in iter_preorder(ast) if "type" in node)
+    depths = {id(ast): 1}
+    fanout = Counter()
+
+    def enter(node, parent):
+        if parent is not None:
+            depths[id(node)] = depths[id(parent)] + ("type" in node)
+
+    walk(ast, enter)
+    max(depths.values())
+    for node in iter_preorder(ast):
+        if "type" in node:
+            fanout[len(children(node))] += 1
+    operators = Counter()
+    for node in iter_preorder(ast):
+        if "operator" in node:
+            operators[node["operator"]] += 1
+    Resolver(ast).analyze()
+
+
+# One fused metrics walk against a walk per analysis
+if __name__ == "__main__":
+    for n_functions in (100, 1000, 5000):
+        ast = Pipeline(render=False).run(generate_source(n_functions)).ast
+        fused = best_of(lambda: compute_metrics(ast), repeat=3)
+        separate = best_of(lambda: separate_passes(ast), repeat=3)
+        nodes = count_nodes(ast)
+        print(f"{n_functions:>5} functions {nodes:>7} nodes -> fused: {fused * 1000:.1f} ms, "
+              f"separate: {separate * 1000:.1f} ms, speedup x{separate / fused:.2f}")
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+
+from ast_utils import get_entities_from_token_file
+from binary_format import ASTFile, TokenFile
+from bench_utils import best_of, generate_source
+from pipeline import Pipeline
+
+
+def load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def open_and_close(cls, path):
+    cls(path).close()
+
+
+def token_entities(path):
+    with TokenFile(path) as token_file:
+        return get_entities_from_token_file(token_file)
+
+
+def ast_materialize(path):
+    with ASTFile(path) as ast_file:
+        return ast_file.to_python()
+
+
+# File size and load time of the binary token/AST files against tokens.json / ast.json
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    for n_functions in (100, 1000, 3000):
+        Pipeline(render=False).run(generate_source(n_functions)).save(directory)
+        paths = {name: os.path.join(directory, name) for name in ("tokens.json", "tokens.bin", "ast.json", "ast.bin")}
+        sizes = {name: os.path.getsize(path) / 1024 for name, path in paths.items()}
+        print(f"{n_functions} functions: tokens.json {sizes['tokens.json']:.0f} KiB vs tokens.bin {sizes['tokens.bin']:.0f} KiB, "
+              f"ast.json {sizes['ast.json']:.0f} KiB vs ast.bin {sizes['ast.bin']:.0f} KiB")
+        rows = [
+            ("tokens: json.load", lambda: load_json(paths["tokens.json"])),
+            ("tokens: mmap open", lambda: open_and_close(TokenFile, paths["tokens.bin"])),
+            ("entities: mmap record scan", lambda: token_entities(paths["tokens.bin"])),
+            ("ast: json.load", lambda: load_json(paths["ast.json"])),
+            ("ast: mmap open", lambda: open_and_close(ASTFile, paths["ast.bin"])),
+            ("ast: mmap full decode", lambda: ast_materialize(paths["ast.bin"])),
+        ]
+        for label, func in rows:
+            print(f"    {label:<28} {best_of(func, repeat=3) * 1000:9.2f} ms")
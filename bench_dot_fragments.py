@@ -0,0 +1,54 @@
+import time
+
+from ast_visualizer import build_graph, display_tree, fragment_cache, get_node_color, new_graph
+from bench_utils import generate_source, history_sources
+from pipeline import Pipeline
+
+
+def uncached_source(ast):
+    # DOT built one Digraph.node / Digraph.edge call per node, as before fragments
+    dot = new_graph()
+    labels, types, parents = display_tree(ast)
+    for index, (label, node_type, parent) in enumerate(zip(labels, types, parents)):
+        dot.node(str(index), label, style="filled", fillcolor=get_node_color(node_type), fontcolor="white",
+                 shape="box", margin="0.2", fontname="Arial")
+        if parent >= 0:
+            dot.edge(str(parent), str(index), color="#666666")
+    return dot.source
+
+
+def edit_session(n_functions, n_edits):
+    # One function's constant changes per step, like repeated edits of one file
+    source = generate_source(n_functions)
+    sources = [source]
+    for edit in range(n_edits):
+        target = f"total = a + b * {edit % n_functions}\n"
+        source = source.replace(target, f"total = a + b * {edit % n_functions} + {edit}\n", 1)
+        sources.append(source)
+    return sources
+
+
+def replay(name, sources):
+    asts = [Pipeline(render=False).run(source).ast for source in sources]
+    fragment_cache.clear()
+    hits, misses = fragment_cache.hits, fragment_cache.misses
+    cached = uncached = 0.0
+    for ast in asts:
+        start = time.perf_counter()
+        fragmented = build_graph(ast).source
+        cached += time.perf_counter() - start
+        start = time.perf_counter()
+        plain = uncached_source(ast)
+        uncached += time.perf_counter() - start
+        assert fragmented == plain
+    hits, misses = fragment_cache.hits - hits, fragment_cache.misses - misses
+    print(f"{name}: {len(asts)} renders, fragment hit rate {hits / max(hits + misses, 1):.0%}, "
+          f"mean DOT build {cached / len(asts) * 1000:.2f} ms vs {uncached / len(asts) * 1000:.2f} ms uncached "
+          f"(x{uncached / cached:.1f})")
+
+
+# DOT fragment memoization over recorded and synthetic edit sessions
+if __name__ == "__main__":
+    replay("history/", history_sources())
+    for n_functions in (20, 200):
+        replay(f"{n_functions}-function file, 30 edits", edit_session(n_functions, 30))
@@ -0,0 +1,47 @@
+import tempfile
+import os
+
+from ast_utils import get_entities_from_token_file, get_entities_from_tokens
+from binary_format import TokenFile, write_tokens
+from bench_utils import best_of, generate_source
+from token_buffer import TokenBuffer
+
+
+def quadratic_entities(tokens):
+    # The former get_entities_from_tokens, kept here as the baseline
+    operators = set()
+    functions = set()
+    for token in tokens:
+        if token[0] == "OPERATOR":
+            operators.add(token[1])
+        if token[0] == "IDENTIFIER":
+            idx = tokens.index(token)
+            if idx + 1 < len(tokens) and tokens[idx + 1][0] == "SEPARATOR" and tokens[idx + 1][1] == "(":
+                functions.add(token[1])
+    return operators, functions
+
+
+def token_file_entities(path):
+    with TokenFile(path) as token_file:
+        return get_entities_from_token_file(token_file)
+
+
+# Entity extraction time per token as the input grows; a linear scan keeps it flat
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tokens.bin")
+    for n_functions in (10, 100, 400, 1100, 2200):
+        buffer = TokenBuffer.from_source(generate_source(n_functions))
+        tokens = buffer.to_list()
+        write_tokens(path, buffer)
+        rows = [
+            ("token list", lambda: get_entities_from_tokens(tokens)),
+            ("TokenBuffer", lambda: get_entities_from_tokens(buffer)),
+            ("tokens.bin", lambda: token_file_entities(path)),
+        ]
+        if n_functions <= 100:
+            rows.append(("old tokens.index scan", lambda: quadratic_entities(tokens)))
+        print(f"{len(tokens)} tokens")
+        for label, func in rows:
+            elapsed = best_of(func, repeat=3)
+            print(f"    {label:<24} {elapsed * 1000:9.2f} ms  {elapsed * 1e9 / len(tokens):7.0f} ns/token")
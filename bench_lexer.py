@@ -0,0 +1,13 @@
+from lexer import Lexer, LEXER_ENGINES
+from bench_utils import best_of, generate_source
+
+# Throughput of each Lexer engine on synthetic programs of growing size
+if __name__ == "__main__":
+    for n_functions in (100, 1000, 5000):
+        source = generate_source(n_functions)
+        n_lines = source.count("\n")
+        timings = {}
+        for engine in LEXER_ENGINES:
+            timings[engine] = best_of(lambda: Lexer(source_code=source, engine=engine).tokenize(), repeat=3)
+        report = ", ".join(f"{engine}: {n_lines / t:,.0f} lines/s ({t * 1000:.1f} ms)" for engine, t in timings.items())
+        print(f"{n_lines} lines -> {report}, speedup x{timings['char'] / timings['regex']:.2f}")
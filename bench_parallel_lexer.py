@@ -0,0 +1,22 @@
+import os
+import time
+
+from lexer import Lexer
+from parallel_lexer import tokenize_parallel
+from bench_utils import generate_source
+
+# Speedup of tokenize_parallel over the serial lexer by worker count
+if __name__ == "__main__":
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, max_workers})
+    for n_functions in (2000, 10000):
+        source = generate_source(n_functions)
+        start = time.perf_counter()
+        Lexer(source_code=source, engine="regex").tokenize()
+        serial = time.perf_counter() - start
+        print(f"{source.count(chr(10))} lines ({len(source) / 1e6:.1f} MB), serial {serial:.2f} s, {max_workers} CPUs")
+        for workers in worker_counts:
+            start = time.perf_counter()
+            tokenize_parallel(source, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"    {workers} workers: {elapsed:.2f} s, speedup x{serial / elapsed:.2f}")
@@ -0,0 +1,35 @@
+import sys
+
+from lexer import Lexer
+from parser import EXPRESSION_ENGINES, Parser
+from bench_utils import best_of, generate_source
+
+
+def parse_time(tokens, engine):
+    try:
+        return best_of(lambda: Parser(tokens, verbose=False, expression_engine=engine).parse(), repeat=3)
+    except RecursionError:
+        return None
+
+
+def report(label, source):
+    tokens = Lexer(source_code=source, engine="regex").tokenize()
+    timings = {engine: parse_time(tokens, engine) for engine in EXPRESSION_ENGINES}
+    cells = [f"{engine}: {'RecursionError' if t is None else f'{t * 1000:.1f} ms'}" for engine, t in timings.items()]
+    if None not in timings.values():
+        cells.append(f"speedup x{timings['recursive'] / timings['precedence']:.2f}")
+    print(f"{label:<32} {len(tokens):>7} tokens -> " + ", ".join(cells))
+
+
+# Expression engines on long operator chains, deep parentheses and whole programs
+if __name__ == "__main__":
+    print(f"recursion limit {sys.getrecursionlimit()}")
+    for length in (1000, 10000, 50000):
+        report(f"chain of {length} terms", "x = " + " + ".join(f"a{i} * {i}" for i in range(length)) + "\n")
+    for depth in (50, 100, 1000, 10000):
+        report(f"{depth} nested parentheses", "x = " + "(" * depth + "1" + " + 1)" * depth + "\n")
+    for n_functions in (100, 1000):
+        report(f"{n_functions} generated functions", generate_source(n_functions))
+    # Mostly statement dispatch and token matching, little expression work
+    statements = "def f(a):\n    while (a):\n        continue\n        break\n    print(a)\n    a += 2\n    return\n"
+    report("5000 statement-heavy functions", statements * 5000)
@@ -0,0 +1,48 @@
+import shutil
+import time
+
+from graphviz import Source
+
+from ast_visualizer import build_graph
+from bench_dot_fragments import edit_session
+from bench_utils import history_sources
+from pipeline import Pipeline
+from render_daemon import DEFAULT_WORKERS, DotRenderService
+
+
+def corpus():
+    # The recorded history plus a synthetic 30-edit session, as DOT sources
+    sources = history_sources() + edit_session(20, 30)
+    return [build_graph(Pipeline(render=False).run(source).ast).source for source in sources]
+
+
+def per_process(graphs):
+    # One dot process per render, as Digraph.pipe does
+    start = time.perf_counter()
+    images = [Source(graph).pipe(format="png") for graph in graphs]
+    return time.perf_counter() - start, images
+
+
+def pooled(graphs, workers, batch_size):
+    start = time.perf_counter()
+    with DotRenderService("png", workers=workers, batch_size=batch_size) as service:
+        images = service.render_many(graphs)
+        stats = service.stats()
+    return time.perf_counter() - start, images, stats
+
+
+# Rendering the history corpus to PNG: a process per render vs the pool
+if __name__ == "__main__":
+    graphs = corpus()
+    if shutil.which("dot") is None:
+        print(f"{len(graphs)} graphs: dot is not installed, skipped")
+        raise SystemExit
+    elapsed, expected = per_process(graphs)
+    print(f"{len(graphs)} graphs, one process each: {elapsed:.2f} s ({len(graphs) / elapsed:.1f} graphs/s)")
+    for workers in sorted({1, DEFAULT_WORKERS}):
+        for batch_size in (1, 16):
+            elapsed, images, stats = pooled(graphs, workers, batch_size)
+            assert images == expected
+            print(f"pool of {workers}, batches of up to {batch_size}: {elapsed:.2f} s "
+                  f"({len(graphs) / elapsed:.1f} graphs/s, {stats['batches']} batches, "
+                  f"{stats['processes']} processes)")
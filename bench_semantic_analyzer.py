@@ -0,0 +1,50 @@
+import sys
+
+from bench_utils import best_of, generate_source
+from pipeline import Pipeline
+from semantic_analyzer import Resolver
+
+
+class ScopeScanResolver(Resolver):
+    # Same walk, but each lookup searches the scopes innermost first, the
+    # way the old SemanticAnalyzer.is_declared did
+    def lookup(self, name):
+        scope = self.scope
+        while scope is not None:
+            declaration = scope.names.get(name)
+            if declaration is not None:
+                return declaration
+            scope = scope.parent
+        return None
+
+
+def nested_functions(depth, uses=20):
+    # depth nested defs; the innermost body reads names from the outermost scope
+    lines = [f"g{i} = {i}" for i in range(uses)]
+    for level in range(depth):
+        lines.append("    " * level + f"def f{level}(p{level}):")
+    indent = "    " * depth
+    for i in range(uses):
+        lines.append(indent + f"v{i} = g{i} + p0")
+    lines.append(indent + "return v0")
+    return "\n".join(lines) + "\n"
+
+
+def report(label, source):
+    ast = Pipeline(render=False).run(source).ast
+    resolver = Resolver(ast)
+    resolver.resolve()
+    references = len(resolver.bindings)
+    timings = {cls.__name__: best_of(lambda: cls(ast).resolve(), repeat=3) for cls in (Resolver, ScopeScanResolver)}
+    cells = [f"{name}: {t * 1000:.1f} ms ({t / references * 1e9:.0f} ns/ref)" for name, t in timings.items()]
+    print(f"{label:<28} {references:>7} refs -> " + ", ".join(cells))
+
+
+# Name resolution on many functions and on deeply nested scopes
+if __name__ == "__main__":
+    # The recursive-descent statement parser needs a few frames per nesting level
+    sys.setrecursionlimit(20000)
+    for n_functions in (1000, 5000):
+        report(f"{n_functions} generated functions", generate_source(n_functions))
+    for depth in (10, 100, 1000):
+        report(f"{depth} nested functions", nested_functions(depth, uses=200))
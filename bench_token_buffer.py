@@ -0,0 +1,25 @@
+import tracemalloc
+
+from lexer import Lexer
+from token_buffer import TokenBuffer
+from bench_utils import generate_source
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+# Memory held by a tokenized program: tuple list vs TokenBuffer arrays
+if __name__ == "__main__":
+    for n_functions in (100, 1000, 5000):
+        source = generate_source(n_functions)
+        tokens, tuple_bytes = measure(lambda: Lexer(source_code=source, engine="regex").tokenize())
+        buffer, buffer_bytes = measure(lambda: TokenBuffer.from_source(source))
+        # The TokenBuffer figure includes the source text its tokens point into
+        print(f"{len(tokens)} tokens -> tuple list: {tuple_bytes / len(tokens):.1f} B/token, "
+              f"TokenBuffer: {buffer_bytes / len(buffer):.1f} B/token "
+              f"(arrays alone {buffer.nbytes() / len(buffer):.1f} B/token)")
@@ -0,0 +1,33 @@
+from ast_visualizer import DEFAULT_NODE_BUDGET, layout_ast, render_ast_png, render_ast_svg, render_subtree
+from ast_walker import count_nodes
+from bench_utils import best_of, generate_source
+from pipeline import Pipeline
+
+
+def graphviz_time(ast):
+    # None when the dot binary is not installed
+    try:
+        return best_of(lambda: render_ast_png(ast), repeat=1)
+    except Exception as e:
+        if type(e).__name__ != "ExecutableNotFound":
+            raise
+        return None
+
+
+# Built-in tidy tree layout + SVG, full and level of detail, against Graphviz
+# dot, by tree size
+if __name__ == "__main__":
+    for n_functions in (10, 100, 1000, 5000):
+        ast = Pipeline(render=False).run(generate_source(n_functions)).ast
+        layout = best_of(lambda: layout_ast(ast), repeat=3)
+        svg = best_of(lambda: render_ast_svg(ast), repeat=3)
+        budget = best_of(lambda: render_subtree(ast, backend="svg"), repeat=3)
+        if n_functions > 1000:
+            # dot takes minutes on trees this large
+            dot_text = "skipped"
+        else:
+            dot = graphviz_time(ast)
+            dot_text = "unavailable" if dot is None else f"{dot * 1000:.1f} ms (x{dot / svg:.1f})"
+        print(f"{n_functions:>5} functions {count_nodes(ast):>7} nodes -> layout: {layout * 1000:.1f} ms, "
+              f"svg: {svg * 1000:.1f} ms, svg with {DEFAULT_NODE_BUDGET} node budget: {budget * 1000:.1f} ms, "
+              f"graphviz png: {dot_text}")
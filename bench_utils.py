@@ -0,0 +1,48 @@
+import glob
+import os
+import time
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")
+
+FUNCTION_TEMPLATE = '''# function {n}
+def func_{n}(a, b):
+    total = a + b * {n}
+    while (total < 1000):
+        total += 0x1F
+        if (total % 2 == 0):
+            print("even", total)
+        elif (total > 500):
+            break
+        else:
+            total = total - 1
+    for i in range(0, b):
+        total = func_{m}(total, i) // 2
+    return total
+
+'''
+
+
+def history_sources():
+    sources = []
+    for path in sorted(glob.glob(os.path.join(HISTORY_DIR, "*.py"))):
+        with open(path, "r", encoding="utf-8") as f:
+            sources.append(f.read())
+    return sources
+
+
+def generate_source(n_functions):
+    # Synthetic program exercising every statement the parser understands
+    parts = [FUNCTION_TEMPLATE.format(n=n, m=max(n - 1, 0)) for n in range(n_functions)]
+    parts.append("result = func_0(1, 2)\nprint(result)\n")
+    return "".join(parts)
+
+
+def best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
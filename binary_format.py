@@ -0,0 +1,422 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping, Sequence
+
+from lexer import KIND_CODES, TOKEN_KINDS
+
+# File layout (all integers little-endian):
+#   header   magic, version, kind, string count, string blob size, three section counts
+#   strings  (string count + 1) uint32 offsets into the blob, then the UTF-8 blob padded to 4 bytes
+#   records  fixed-width records, see TOKEN_RECORD and the AST_* structs
+MAGIC = b"ASTB"
+VERSION = 2
+KIND_TOKENS = 1
+KIND_AST = 2
+KIND_OCCURRENCES = 3
+
+HEADER = struct.Struct("<4sHHIIIII")
+
+# kind code, value (string id, or the width for INDENT/DEDENT), line, column
+TOKEN_RECORD = struct.Struct("<BxxxIII")
+INDENT_CODES = (KIND_CODES["INDENT"], KIND_CODES["DEDENT"])
+
+# AST values are tagged records; dicts point at a run of (key, value) entries,
+# lists at a run of item slots, both holding indices into the value table
+AST_VALUE = struct.Struct("<BxxxII")
+AST_ENTRY = struct.Struct("<II")
+TAG_NONE, TAG_STR, TAG_INT, TAG_FALSE, TAG_TRUE, TAG_DICT, TAG_LIST = range(7)
+
+# Occurrence index: string id N owns entry N, a run of (first, count) into the
+# token index and line number sections. Names are stored in sorted order so a
+# lookup is a binary search over the string table.
+OCCURRENCE_ENTRY = struct.Struct("<II")
+
+
+class StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def encode(self):
+        offsets = array("I", [0])
+        blob = bytearray()
+        for value in self.strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        blob += b"\0" * (-len(blob) % 4)
+        return offsets.tobytes(), bytes(blob)
+
+
+def _write_file(path, kind, strings, counts, sections):
+    offsets, blob = strings.encode()
+    header = HEADER.pack(MAGIC, VERSION, kind, len(strings.strings), len(blob), *counts)
+    # Write next to the target and rename, so readers never map a half-written file
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(offsets)
+        f.write(blob)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+def write_tokens(path, tokens):
+    # tokens: a TokenBuffer (line/column kept) or any iterable of (kind, value) pairs
+    strings = StringTable()
+    records = bytearray()
+    lines = getattr(tokens, "lines", None)
+    columns = getattr(tokens, "columns", None)
+    for index, (kind, value) in enumerate(tokens):
+        code = KIND_CODES[kind]
+        if code not in INDENT_CODES:
+            value = strings.intern(value)
+        line = lines[index] if lines is not None else 0
+        column = columns[index] if columns is not None else 0
+        records += TOKEN_RECORD.pack(code, value, line, column)
+    _write_file(path, KIND_TOKENS, strings, (len(records) // TOKEN_RECORD.size, 0, 0), [records])
+
+
+def write_ast(path, ast):
+    strings = StringTable()
+    values = []
+    entry_keys = array("I")
+    entry_values = array("I")
+    items = array("I")
+    # Iterative so that deeply nested trees do not hit the recursion limit.
+    # Each stack entry is a value plus the slot that must receive its index.
+    stack = [(ast, None, 0)]
+    while stack:
+        value, slot, slot_index = stack.pop()
+        index = len(values)
+        if slot is not None:
+            slot[slot_index] = index
+        if value is None:
+            values.append((TAG_NONE, 0, 0))
+        elif isinstance(value, str):
+            values.append((TAG_STR, strings.intern(value), 0))
+        elif isinstance(value, bool):
+            values.append((TAG_TRUE if value else TAG_FALSE, 0, 0))
+        elif isinstance(value, int):
+            if not -0x80000000 <= value <= 0x7FFFFFFF:
+                raise ValueError(f"Cannot store {value} in a binary AST file, ints must fit in 32 bits")
+            values.append((TAG_INT, value & 0xFFFFFFFF, 0))
+        elif isinstance(value, dict):
+            first = len(entry_keys)
+            values.append((TAG_DICT, first, len(value)))
+            for key in value:
+                entry_keys.append(strings.intern(key))
+                entry_values.append(0)
+            for offset, child in reversed(list(enumerate(value.values()))):
+                stack.append((child, entry_values, first + offset))
+        elif isinstance(value, (list, tuple)):
+            first = len(items)
+            values.append((TAG_LIST, first, len(value)))
+            items.extend([0] * len(value))
+            for offset in range(len(value) - 1, -1, -1):
+                stack.append((value[offset], items, first + offset))
+        else:
+            raise TypeError(f"Cannot store {type(value).__name__} in a binary AST file")
+
+    value_records = b"".join(AST_VALUE.pack(*record) for record in values)
+    entry_records = b"".join(AST_ENTRY.pack(key, value) for key, value in zip(entry_keys, entry_values))
+    counts = (len(values), len(entry_keys), len(items))
+    _write_file(path, KIND_AST, strings, counts, [value_records, entry_records, items.tobytes()])
+
+
+def write_occurrences(path, index):
+    # index: an OccurrenceIndex
+    strings = StringTable()
+    entries = bytearray()
+    token_indices = array("I")
+    lines = array("I")
+    # Code point order is also UTF-8 byte order, which is what the reader compares
+    for name in sorted(index.entries):
+        name_indices, name_lines = index.entries[name]
+        strings.intern(name)
+        entries += OCCURRENCE_ENTRY.pack(len(token_indices), len(name_indices))
+        token_indices.extend(name_indices)
+        lines.extend(name_lines)
+    counts = (len(strings.strings), len(token_indices), 0)
+    _write_file(path, KIND_OCCURRENCES, strings, counts, [entries, token_indices.tobytes(), lines.tobytes()])
+
+
+class _MappedFile:
+    def __init__(self, path, expected_kind):
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, kind, string_count, blob_size, *counts = HEADER.unpack_from(self.view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a binary AST/token file")
+        if version != VERSION or kind != expected_kind:
+            self.close()
+            raise ValueError(f"'{path}' has version {version} kind {kind}, expected version {VERSION} kind {expected_kind}")
+        position = HEADER.size
+        self.string_offsets = self.view[position:position + 4 * (string_count + 1)].cast("I")
+        position += 4 * (string_count + 1)
+        self.blob = self.view[position:position + blob_size]
+        self.counts = counts
+        self.records_start = position + blob_size
+        self.string_cache = {}
+
+    def string(self, string_id):
+        value = self.string_cache.get(string_id)
+        if value is None:
+            start = self.string_offsets[string_id]
+            value = str(self.blob[start:self.string_offsets[string_id + 1]], "utf-8")
+            self.string_cache[string_id] = value
+        return value
+
+    def string_id(self, value):
+        # Linear in the number of distinct strings, never in the number of records
+        encoded = value.encode("utf-8")
+        for string_id in range(len(self.string_offsets) - 1):
+            if self.blob[self.string_offsets[string_id]:self.string_offsets[string_id + 1]] == encoded:
+                return string_id
+        return None
+
+    def close(self):
+        for name in ("string_offsets", "blob", "records", "view"):
+            part = getattr(self, name, None)
+            if part is not None:
+                part.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TokenFile(_MappedFile, Sequence):
+    """Memory-mapped token stream; tokens are decoded only when indexed."""
+
+    def __init__(self, path):
+        super().__init__(path, KIND_TOKENS)
+        count = self.counts[0]
+        self.records = self.view[self.records_start:self.records_start + count * TOKEN_RECORD.size]
+
+    def __len__(self):
+        return self.counts[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        code, value, _, _ = TOKEN_RECORD.unpack_from(self.records, index * TOKEN_RECORD.size)
+        return TOKEN_KINDS[code], value if code in INDENT_CODES else self.string(value)
+
+    def iter_records(self):
+        # Raw (kind code, value id, line, column) tuples: no strings are decoded
+        return TOKEN_RECORD.iter_unpack(self.records)
+
+    def position(self, index):
+        _, _, line, column = TOKEN_RECORD.unpack_from(self.records, index * TOKEN_RECORD.size)
+        return line, column
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(list(self), f)
+
+
+class OccurrenceFile(_MappedFile):
+    """Memory-mapped occurrence index with the OccurrenceIndex query API."""
+
+    def __init__(self, path):
+        super().__init__(path, KIND_OCCURRENCES)
+        name_count, occurrence_count, _ = self.counts
+        start = self.records_start
+        self.entries = self.view[start:start + name_count * OCCURRENCE_ENTRY.size]
+        start += name_count * OCCURRENCE_ENTRY.size
+        self.token_indices = self.view[start:start + occurrence_count * 4].cast("I")
+        start += occurrence_count * 4
+        self.lines = self.view[start:start + occurrence_count * 4].cast("I")
+
+    def close(self):
+        for part in (getattr(self, "entries", None), getattr(self, "token_indices", None), getattr(self, "lines", None)):
+            if part is not None:
+                part.release()
+        super().close()
+
+    def name_id(self, name):
+        # Binary search over the sorted names, comparing raw UTF-8 bytes so
+        # only the probed names are read and none of them is decoded
+        encoded = name.encode("utf-8")
+        offsets = self.string_offsets
+        low, high = 0, self.counts[0]
+        while low < high:
+            middle = (low + high) // 2
+            probe = self.blob[offsets[middle]:offsets[middle + 1]].tobytes()
+            if probe < encoded:
+                low = middle + 1
+            elif probe > encoded:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _run(self, name):
+        string_id = self.name_id(name)
+        if string_id is None:
+            return 0, 0
+        return OCCURRENCE_ENTRY.unpack_from(self.entries, string_id * OCCURRENCE_ENTRY.size)
+
+    def occurrences(self, name):
+        first, count = self._run(name)
+        return list(zip(self.token_indices[first:first + count], self.lines[first:first + count]))
+
+    def count(self, name):
+        return self._run(name)[1]
+
+    def names(self):
+        return [self.string(i) for i in range(self.counts[0])]
+
+
+class ASTFile(_MappedFile):
+    """Memory-mapped AST; root() returns lazy views decoded on access."""
+
+    def __init__(self, path):
+        super().__init__(path, KIND_AST)
+        value_count, entry_count, item_count = self.counts
+        start = self.records_start
+        self.values = self.view[start:start + value_count * AST_VALUE.size]
+        start += value_count * AST_VALUE.size
+        self.entries = self.view[start:start + entry_count * AST_ENTRY.size]
+        start += entry_count * AST_ENTRY.size
+        self.items = self.view[start:start + item_count * 4].cast("I")
+
+    def close(self):
+        for part in (getattr(self, "values", None), getattr(self, "entries", None), getattr(self, "items", None)):
+            if part is not None:
+                part.release()
+        super().close()
+
+    def value(self, index):
+        tag, a, b = AST_VALUE.unpack_from(self.values, index * AST_VALUE.size)
+        if tag == TAG_STR:
+            return self.string(a)
+        if tag == TAG_DICT:
+            return LazyDict(self, a, b)
+        if tag == TAG_LIST:
+            return LazyList(self, a, b)
+        if tag == TAG_INT:
+            return a - (1 << 32) if a & 0x80000000 else a
+        return (None, None, None, False, True)[tag]
+
+    def root(self):
+        return self.value(0)
+
+    def to_python(self):
+        # Children always follow their parent in the value table, so one
+        # backwards sweep over the raw records rebuilds the whole tree
+        strings = [self.string(i) for i in range(len(self.string_offsets) - 1)]
+        entries = list(AST_ENTRY.iter_unpack(self.entries))
+        items = self.items
+        built = [None] * self.counts[0]
+        records = list(AST_VALUE.iter_unpack(self.values))
+        for index in range(len(records) - 1, -1, -1):
+            tag, a, b = records[index]
+            if tag == TAG_STR:
+                built[index] = strings[a]
+            elif tag == TAG_DICT:
+                built[index] = {strings[key]: built[value] for key, value in entries[a:a + b]}
+            elif tag == TAG_LIST:
+                built[index] = [built[i] for i in items[a:a + b]]
+            elif tag == TAG_INT:
+                built[index] = a - (1 << 32) if a & 0x80000000 else a
+            else:
+                built[index] = (None, None, None, False, True)[tag]
+        return built[0] if built else None
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_python(), f, indent=2)
+
+
+class LazyDict(Mapping):
+    __slots__ = ("file", "first", "count")
+
+    def __init__(self, file, first, count):
+        self.file = file
+        self.first = first
+        self.count = count
+
+    def _entry(self, offset):
+        return AST_ENTRY.unpack_from(self.file.entries, (self.first + offset) * AST_ENTRY.size)
+
+    def __getitem__(self, key):
+        for offset in range(self.count):
+            key_id, value_index = self._entry(offset)
+            if self.file.string(key_id) == key:
+                return self.file.value(value_index)
+        raise KeyError(key)
+
+    def __iter__(self):
+        for offset in range(self.count):
+            yield self.file.string(self._entry(offset)[0])
+
+    def __len__(self):
+        return self.count
+
+
+class LazyList(Sequence):
+    __slots__ = ("file", "first", "count")
+
+    def __init__(self, file, first, count):
+        self.file = file
+        self.first = first
+        self.count = count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("list index out of range")
+        return self.file.value(self.file.items[self.first + index])
+
+    def __len__(self):
+        return self.count
+
+
+def to_python(value):
+    # Materialize lazy views into plain dicts and lists, iteratively
+    if not isinstance(value, (LazyDict, LazyList)):
+        return value
+    root = {} if isinstance(value, LazyDict) else []
+    stack = [(value, root)]
+    while stack:
+        lazy, target = stack.pop()
+        pairs = lazy.items() if isinstance(lazy, LazyDict) else enumerate(lazy)
+        for key, child in pairs:
+            if isinstance(child, LazyDict):
+                converted = {}
+                stack.append((child, converted))
+            elif isinstance(child, LazyList):
+                converted = []
+                stack.append((child, converted))
+            else:
+                converted = child
+            if isinstance(target, dict):
+                target[key] = converted
+            else:
+                target.append(converted)
+    return root
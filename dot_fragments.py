@@ -0,0 +1,162 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_CHARS = 32 * 1024 * 1024
+# Bigger subtrees are not memoized as a whole; their top nodes are written one
+# by one around the memoized subtrees below them. This also bounds the cost of
+# renumbering a fragment into its parent's.
+MAX_FRAGMENT_NODES = 2000
+
+# Fragments are str.format templates whose positional fields are node ids.
+# Literal braces in the DOT text are kept as {L} / {R} fields, so a fragment
+# can be renumbered into a bigger one and still be formatted again.
+ESCAPE_BRACES = str.maketrans({"{": "{L}", "}": "{R}"})
+KEEP_BRACES = {"L": "{L}", "R": "{R}"}
+BRACES = {"L": "{", "R": "}"}
+
+
+class FragmentCache:
+    """Bounded LRU of DOT fragments keyed by the structural hash of the
+    subtree they draw.
+
+    A fragment is the (head, tail) pair of templates for a whole subtree:
+    head is the root's node statement, tail the statements of everything
+    below it, with node ids numbered from 0 at the root in pre-order. Once
+    the templates hold more than max_chars characters, the least recently
+    used are dropped. Safe to share between threads.
+    """
+
+    def __init__(self, max_chars=DEFAULT_MAX_CHARS):
+        self.max_chars = max_chars
+        self.entries = OrderedDict()
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            fragment = self.entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = fragment
+            self.chars += len(fragment[0]) + len(fragment[1])
+            while self.chars > self.max_chars and self.entries:
+                head, tail = self.entries.popitem(last=False)[1]
+                self.chars -= len(head) + len(tail)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "chars": self.chars,
+                "max_chars": self.max_chars,
+            }
+
+
+def subtree_sizes(parents):
+    # Nodes in each subtree, for a pre-order parent list
+    sizes = [1] * len(parents)
+    for node in range(len(parents) - 1, 0, -1):
+        sizes[parents[node]] += sizes[node]
+    return sizes
+
+
+def structural_hashes(labels, types, parents):
+    # Digest of each subtree's labels, types and shape; equal subtrees get
+    # equal digests wherever they are in the tree
+    digests = [b""] * len(parents)
+    # Child digests, last child first, as the reverse walk meets them
+    child_digests = [[] for _ in parents]
+    for node in range(len(parents) - 1, -1, -1):
+        kids = child_digests[node]
+        digest = hashlib.blake2b(f"{types[node]}\0{labels[node]}\0{len(kids)}\0".encode("utf-8"), digest_size=16)
+        for child_digest in reversed(kids):
+            digest.update(child_digest)
+        digests[node] = digest.digest()
+        if parents[node] >= 0:
+            child_digests[parents[node]].append(digests[node])
+    return digests
+
+
+def dot_statements(labels, types, parents, node_attributes, edge_attributes, cache, first=0):
+    """DOT node and edge statements for display_tree() lists, with node ids
+    numbered from first. node_attributes(label, node_type) gives a node's
+    attribute list text (e.g. ' [label=x]'), edge_attributes that of every
+    edge. Subtrees already in cache are copied from there; new ones are
+    built from their children's fragments and added to it."""
+    n = len(parents)
+    sizes = subtree_sizes(parents)
+    digests = structural_hashes(labels, types, parents)
+    children = [[] for _ in range(n)]
+    for node in range(1, n):
+        children[parents[node]].append(node)
+    # Relative id fields, sliced when renumbering a child's fragment
+    fields = ["{%d}" % number for number in range(min(n, MAX_FRAGMENT_NODES) + 1)]
+    edge = "\t{0} -> {1}" + edge_attributes.translate(ESCAPE_BRACES) + "\n"
+
+    def fragment(root):
+        found = cache.get(digests[root])
+        if found is not None:
+            return found
+        # Missing subtrees from root down, stopping at the cached ones
+        built = {}
+        missing = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            missing.append(node)
+            for child in children[node]:
+                found = cache.get(digests[child])
+                if found is None:
+                    stack.append(child)
+                else:
+                    built[child] = found
+        # Children before parents
+        for node in reversed(missing):
+            head = "\t{0}" + node_attributes(labels[node], types[node]).translate(ESCAPE_BRACES) + "\n"
+            tail = []
+            for child in children[node]:
+                child_head, child_tail = built[child]
+                offset = child - node
+                tail.append(child_head.format(fields[offset], **KEEP_BRACES))
+                tail.append(edge.format("{0}", fields[offset], **KEEP_BRACES))
+                tail.append(child_tail.format(*fields[offset:offset + sizes[child]], **KEEP_BRACES))
+            built[node] = (head, "".join(tail))
+            cache.put(digests[node], built[node])
+        return built[root]
+
+    out = []
+    node = 0
+    while node < n:
+        parent = parents[node]
+        if sizes[node] <= MAX_FRAGMENT_NODES:
+            head, tail = fragment(node)
+            out.append(head.format(first + node, **BRACES))
+            if parent >= 0:
+                out.append(edge.format(first + parent, first + node, **BRACES))
+            out.append(tail.format(*range(first + node, first + node + sizes[node]), **BRACES))
+            node += sizes[node]
+        else:
+            out.append(f"\t{first + node}{node_attributes(labels[node], types[node])}\n")
+            if parent >= 0:
+                out.append(f"\t{first + parent} -> {first + node}{edge_attributes}\n")
+            node += 1
+    return "".join(out)
@@ -0,0 +1,134 @@
+# Statement grammar of the language the Parser accepts. Terminals are
+# (kind, value) pairs, with value None for "any token of this kind"; every
+# other symbol is the name of a rule. A rule is a list of alternatives and an
+# empty alternative means the rule may match nothing.
+#
+# Adding a statement means adding its rule here, listing it under "statement"
+# and giving Parser a handler for it in STATEMENT_HANDLERS.
+
+
+def keyword(value):
+    return ("KEYWORD", value)
+
+
+def separator(value):
+    return ("SEPARATOR", value)
+
+
+NAME = ("IDENTIFIER", None)
+
+ASSIGNMENT_OPERATORS = ("=", "+=", "-=", "*=", "/=", "%=", "**=", "//=")
+
+GRAMMAR = {
+    "statement": [
+        ["print_statement"],
+        ["if_statement"],
+        ["while_statement"],
+        ["for_statement"],
+        ["function_definition"],
+        ["return_statement"],
+        ["break_statement"],
+        ["continue_statement"],
+        ["assignment"],
+    ],
+    "print_statement": [[keyword("print"), separator("("), "arguments", separator(")")]],
+    "if_statement": [[keyword("if"), separator("("), "expression", separator(")"), separator(":"), "block",
+                      "elif_blocks", "else_block"]],
+    "elif_blocks": [[keyword("elif"), separator("("), "expression", separator(")"), separator(":"), "block",
+                     "elif_blocks"], []],
+    "else_block": [[keyword("else"), separator(":"), "block"], []],
+    "while_statement": [[keyword("while"), separator("("), "expression", separator(")"), separator(":"), "block"]],
+    "for_statement": [[keyword("for"), NAME, keyword("in"), "expression", separator(":"), "block"]],
+    "function_definition": [[keyword("def"), NAME, separator("("), "parameters", separator(")"), separator(":"),
+                             "block"]],
+    "return_statement": [[keyword("return"), "return_value"]],
+    "return_value": [["expression"], []],
+    "break_statement": [[keyword("break")]],
+    "continue_statement": [[keyword("continue")]],
+    "assignment": [[NAME, "assignment_operator", "expression"]],
+    "assignment_operator": [[("OPERATOR", op)] for op in ASSIGNMENT_OPERATORS],
+
+    "arguments": [["expression", "more_arguments"], []],
+    "more_arguments": [[separator(","), "expression", "more_arguments"], []],
+    "parameters": [[NAME, "more_parameters"], []],
+    "more_parameters": [[separator(","), NAME, "more_parameters"], []],
+    "block": [[("INDENT", None), "statements", ("DEDENT", None)]],
+    "statements": [["statement", "statements"], []],
+
+    # Expressions are parsed by the expression engines; this rule only lists
+    # the tokens an expression can start with
+    "expression": [
+        [("NUMBER", None)],
+        [("STRING", None)],
+        [NAME],
+        [keyword("True")],
+        [keyword("False")],
+        [keyword("None")],
+        [separator("(")],
+        [("OPERATOR", "+")],
+        [("OPERATOR", "-")],
+        [("OPERATOR", "not")],
+    ],
+}
+
+
+def first_sets(grammar):
+    # FIRST set of every rule, plus None in the set when the rule can match
+    # nothing. Iterates to a fixed point, so left-recursive rules are fine.
+    first = {rule: set() for rule in grammar}
+    changed = True
+    while changed:
+        changed = False
+        for rule, alternatives in grammar.items():
+            for alternative in alternatives:
+                symbols = sequence_first(alternative, first)
+                if not symbols <= first[rule]:
+                    first[rule] |= symbols
+                    changed = True
+    return first
+
+
+def sequence_first(symbols, first):
+    result = set()
+    for symbol in symbols:
+        if isinstance(symbol, tuple):
+            result.add(symbol)
+            return result
+        if symbol not in first:
+            raise ValueError(f"Grammar uses undefined rule '{symbol}'")
+        result |= first[symbol] - {None}
+        if None not in first[symbol]:
+            return result
+    result.add(None)
+    return result
+
+
+def dispatch_table(grammar, rule, actions, first=None):
+    # Maps the tokens that can start rule to the action of the alternative
+    # they select: (kind, value) keys for terminals with a value, bare kind
+    # keys for terminals that accept any value of their kind. actions maps
+    # the head symbol of each alternative to what the table should hold.
+    if first is None:
+        first = first_sets(grammar)
+    table = {}
+    for alternative in grammar[rule]:
+        if not alternative:
+            continue
+        action = actions[alternative[0]]
+        for terminal in sequence_first(alternative, first) - {None}:
+            key = terminal[0] if terminal[1] is None else terminal
+            if key in table and table[key] != action:
+                raise ValueError(f"Rule '{rule}' is ambiguous on {key}: {table[key]} or {action}")
+            table[key] = action
+    kinds = {key for key in table if isinstance(key, str)}
+    for key in table:
+        if isinstance(key, tuple) and key[0] in kinds and table[key] != table[key[0]]:
+            raise ValueError(f"Rule '{rule}' is ambiguous on {key}: {table[key]} or {table[key[0]]}")
+    return table
+
+
+def token_set(grammar, rule, first=None):
+    # Same key format as dispatch_table(), for "can rule start here?" checks
+    if first is None:
+        first = first_sets(grammar)
+    return frozenset(terminal[0] if terminal[1] is None else terminal for terminal in first[rule] - {None})
@@ -0,0 +1,113 @@
+from parser import Parser
+
+
+def token_hash(tokens, start, end):
+    # Covers the statement's tokens plus the one token of lookahead after it,
+    # which decides e.g. whether an if continues with elif/else
+    return hash(tuple(tokens[start:end + 1]))
+
+
+class ReusingParser(Parser):
+    """Parser that records a span for every statement it parses and skips
+    over statements found in its reuse table instead of parsing them again.
+
+    entries holds (start, end, digest, node, last) per statement in pre-order,
+    where last is the index just past the entries of its nested statements.
+    """
+
+    def __init__(self, tokens, reuse=None, old_entries=None, old_tokens=None, expression_engine="precedence"):
+        super().__init__(tokens, verbose=False, expression_engine=expression_engine)
+        self.reuse = reuse or {}
+        self.old_entries = old_entries or []
+        self.old_tokens = old_tokens or []
+        self.entries = []
+        self.reused = False
+
+    def seek(self, pos):
+        # Same position bookkeeping advance() does for each skipped token, so
+        # errors after a reused statement still report the right line and column
+        tokens = self.tokens
+        for token in tokens[self.pos + 1:pos + 1]:
+            if token[0] == "NEWLINE":
+                self.line_num += 1
+                self.column = 0
+            else:
+                self.column += len(str(token[1]))
+        self.pos = pos
+        self.current_token = tokens[pos] if pos < len(tokens) else None
+        self.next_token = tokens[pos + 1] if pos + 1 < len(tokens) else None
+        self.token_iter = (tokens[i] for i in range(pos + 2, len(tokens)))
+
+    def parse_statement(self):
+        start = self.pos
+        candidate = self.reuse.get(start)
+        if candidate is not None:
+            index, shift = candidate
+            old_start, old_end, digest, node, last = self.old_entries[index]
+            end = old_end + shift
+            # The hash only rules candidates out cheaply; the token slices decide
+            if (token_hash(self.tokens, start, end) == digest
+                    and self.tokens[start:end + 1] == self.old_tokens[old_start:old_end + 1]):
+                offset = len(self.entries) - index
+                for s, e, d, n, l in self.old_entries[index:last]:
+                    self.entries.append((s + shift, e + shift, d, n, l + offset))
+                self.seek(end)
+                self.reused = True
+                return node
+
+        slot = len(self.entries)
+        self.entries.append(None)
+        node = super().parse_statement()
+        self.entries[slot] = (start, self.pos, token_hash(self.tokens, start, self.pos), node, len(self.entries))
+        self.reused = False
+        return node
+
+
+class IncrementalParser:
+    """Keeps the statement spans of the last parse so that after an edit only
+    the statements whose tokens changed are parsed again.
+
+    Tokens must be a list of (kind, value) tuples, e.g. Lexer(incremental=True).tokens.
+    """
+
+    def __init__(self, expression_engine="precedence"):
+        self.expression_engine = expression_engine
+        self.ast = None
+        self.entries = []
+        self.tokens = []
+
+    def parse(self, tokens):
+        return self.run(ReusingParser(tokens, expression_engine=self.expression_engine))[0]
+
+    def reparse(self, tokens, changed):
+        # changed is the (first, old_end, new_end) range returned by Lexer.relex():
+        # old tokens[first:old_end] became tokens[first:new_end]. Statements whose
+        # tokens (and lookahead token) lie entirely before or after that range are
+        # reused, shifted to their new position, once their tokens match.
+        # Returns the new AST and the indices of the top-level statements that
+        # were parsed again.
+        if self.ast is None:
+            raise ValueError("reparse() needs a previous parse()")
+        first, old_end, new_end = changed
+        shift = new_end - old_end
+        reuse = {}
+        for index, (start, end, _, _, _) in enumerate(self.entries):
+            if end < first:
+                reuse[start] = (index, 0)
+            elif start >= old_end:
+                reuse[start + shift] = (index, shift)
+        parser = ReusingParser(tokens, reuse, self.entries, self.tokens, self.expression_engine)
+        return self.run(parser)
+
+    def run(self, parser):
+        body = []
+        replaced = []
+        for statement in parser.iter_statements():
+            if not parser.reused:
+                replaced.append(len(body))
+            body.append(statement)
+        self.ast = {"type": "Program", "body": body}
+        self.entries = parser.entries
+        # Copied, since the lexer edits its token list in place
+        self.tokens = list(parser.tokens)
+        return self.ast, replaced
@@ -1,210 +1,463 @@
-import json
-
-tokens = [ "KEYWORDS", "OPERATORS", "SEPARATORS", "IDENTIFIER", "NUMBER", "STRING", "INDENT", "DEDENT"]
-class Lexer:
-    def __init__(self, filename):
-        self.filename = filename
-        self.source_code = self.load_source_code()
-        self.tokens = []
-        self.symbol_table = {}
-        self.keywords = {
-            "if", "else", "elif", "while", "for", "return", "def", "class", 
-            "import", "from", "print", "in", "not", "and", "or", "True", "False",
-            "None", "break", "continue", "try", "except", "finally", "raise",
-            "async", "await", "with", "as", "pass", "global", "nonlocal"
-        }
-        self.operators = {
-            "+", "-", "*", "/", "%", "=", "==", "!=", "<", ">", "<=", ">=",
-            "+=", "-=", "*=", "/=", "%=", "**", "//", "//=", "**=", "&=", "|=",
-            "^=", "<<=", ">>=", "&", "|", "^", "~", "<<", ">>", "is", "is not"
-        }
-        self.delimiters = {
-            "(", ")", "{", "}", "[", "]", ",", ":", ".", ";", "@", "->",
-            "...", "\\", "`"
-        }
-        self.indent_stack = [0]
-        self.line_num = 1
-        self.column = 0
-
-    def add_to_symbol_table(self, token_type, value):
-        if value not in self.symbol_table:
-            self.symbol_table[value] = token_type
-    
-    def save_token(self, filename="tokens.json"):
-        try:
-            with open(filename, "w")as f:
-                json.dump(self.tokens, f)
-            print(f"token stream saved to'{filename}'.")
-        except Exception as e:
-            print(f"failed to save tokens: {e}")
-
-    def load_source_code(self):
-        try:
-            with open(self.filename, "r") as file:
-                return file.readlines()
-        except FileNotFoundError:
-            raise Exception(f"Error: File '{self.filename}' not found.")
-        except Exception as e:
-            raise Exception(f"Error reading file '{self.filename}': {e}")
-
-    def is_identifier(self, token):
-        return (token[0].isalpha() or token[0] == '_') and all(c.isalnum() or c == '_' for c in token)
-
-    def is_number(self, token):
-        if token.isdigit():
-            return True
-        if '.' in token:
-            parts = token.split('.')
-            return len(parts) == 2 and all(part.isdigit() for part in parts)
-        return False
-
-    def tokenize(self):
-        for line in self.source_code:
-            stripped_line = line.rstrip()
-            if not stripped_line:
-                self.line_num += 1
-                continue
-
-            tokens_in_line = self.process_line(line)
-            self.tokens.extend(tokens_in_line)
-            self.line_num += 1
-
-        return self.tokens
-
-    def process_line(self, line):
-        tokens = []
-        stripped_line = line.lstrip()
-        leading_spaces = len(line) - len(stripped_line)
-        self.column = 0
-
-        # Handle indentation
-        if leading_spaces > self.indent_stack[-1]:
-            self.indent_stack.append(leading_spaces)
-            tokens.append(("INDENT", leading_spaces))
-        elif leading_spaces < self.indent_stack[-1]:
-            while self.indent_stack and leading_spaces < self.indent_stack[-1]:
-                self.indent_stack.pop()
-                tokens.append(("DEDENT", leading_spaces))
-
-        i = 0
-        while i < len(line):
-            char = line[i]
-            self.column = i
-
-            if char.isspace():
-                i += 1
-                continue
-
-            if char == "#":
-                comment = line[i:].strip()
-                tokens.append(("COMMENT", comment))
-                break
-
-            # Handle string literals with different quotes
-            if char in ('"', "'"):
-                quote = char
-                string_literal = ""
-                i += 1
-                while i < len(line) and line[i] != quote:
-                    if line[i] == '\\':
-                        i += 1
-                        if i < len(line):
-                            string_literal += '\\' + line[i]
-                    else:
-                        string_literal += line[i]
-                    i += 1
-                if i >= len(line):
-                    self.error(f"Unterminated string literal at line {self.line_num}")
-                i += 1
-                tokens.append(("STRING", string_literal))
-                continue
-
-            # Handle multi-character operators
-            matched_op = False
-            for op_len in range(3, 0, -1):
-                if i + op_len <= len(line) and line[i:i+op_len] in self.operators:
-                    tokens.append(("OPERATOR", line[i:i+op_len]))
-                    self.add_to_symbol_table("OPERATOR", line[i:i+op_len])
-                    i += op_len
-                    matched_op = True
-                    break
-            if matched_op:
-                continue
-
-            # Handle delimiters
-            if char in self.delimiters:
-                tokens.append(("SEPARATOR", char))
-                self.add_to_symbol_table("SEPARATOR", char)
-                i += 1
-                continue
-
-            # Handle numbers (including hex, binary, and float)
-            if char.isdigit() or (char == "." and i + 1 < len(line) and line[i + 1].isdigit()):
-                num = ""
-                is_hex = False
-                is_binary = False
-                if char == "0" and i + 1 < len(line):
-                    if line[i + 1].lower() == "x":
-                        is_hex = True
-                        num = "0x"
-                        i += 2
-                    elif line[i + 1].lower() == "b":
-                        is_binary = True
-                        num = "0b"
-                        i += 2
-                while i < len(line):
-                    if is_hex and line[i].lower() in "0123456789abcdef":
-                        num += line[i]
-                    elif is_binary and line[i] in "01":
-                        num += line[i]
-                    elif not is_hex and not is_binary and (line[i].isdigit() or line[i] == "."):
-                        num += line[i]
-                    else:
-                        break
-                    i += 1
-                tokens.append(("NUMBER", num))
-                self.add_to_symbol_table("NUMBER", num)
-                continue
-
-            # Handle identifiers and keywords
-            if char.isalpha() or char == "_":
-                ident = ""
-                while i < len(line) and (line[i].isalnum() or line[i] == "_"):
-                    ident += line[i]
-                    i += 1
-                if ident in self.keywords:
-                    tokens.append(("KEYWORD", ident))
-                else:
-                    tokens.append(("IDENTIFIER", ident))
-                self.add_to_symbol_table("IDENTIFIER", ident)
-                continue
-
-            # Unknown token
-            tokens.append(("UNKNOWN", char))
-            i += 1
-
-        return tokens
-
-    def error(self, message):
-        raise Exception(f"Lexer error at line {self.line_num}, column {self.column}: {message}")
-
-    def save_symbol_table(self, filename="symbol_table.txt"):
-        try:
-            with open(filename, "w") as file:
-                for symbol, token_type in self.symbol_table.items():
-                    file.write(f"{token_type}, {symbol}\n")
-            print(f"Symbol table saved to '{filename}'.")
-        except Exception as e:
-            print(f"Failed to save symbol table: {e}")
-
-
-if __name__ == "__main__":
-    lexer = Lexer("source.py")  # Replace with your file
-    tokens = lexer.tokenize()
-
-    print("Tokens:\n")
-    for token in tokens:
-        print(token)
-
-    lexer.save_token("tokens.json")
-    lexer.save_symbol_table("symbols.txt")
+import io
+import json
+import re
+from array import array
+
+from occurrence_index import OccurrenceIndex
+
+tokens = [ "KEYWORDS", "OPERATORS", "SEPARATORS", "IDENTIFIER", "NUMBER", "STRING", "INDENT", "DEDENT"]
+
+# Token kinds in the order of their compact integer codes
+TOKEN_KINDS = ("KEYWORD", "OPERATOR", "SEPARATOR", "IDENTIFIER", "NUMBER", "STRING",
+               "INDENT", "DEDENT", "COMMENT", "UNKNOWN")
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+# "char" walks each line character by character, "regex" scans it with one compiled pattern
+LEXER_ENGINES = ("char", "regex")
+
+def build_master_pattern(operators, delimiters):
+    # Same precedence as the checks in Lexer.process_line. Names come first
+    # because they are the most common token; the lookahead keeps word
+    # operators such as "is" winning at the start of a name, as they do there.
+    # Whitespace has no alternative, so finditer() skips over it.
+    ops = sorted((op for op in operators if len(op) <= 3), key=lambda op: (-len(op), op))
+    word_ops = [op for op in ops if op[0].isalpha() or op[0] == "_"]
+    seps = sorted(d for d in delimiters if len(d) == 1)
+    return re.compile(r"""
+        (?P<NAME>{not_word_op}[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OPERATOR>{ops})
+      | (?P<SEPARATOR>[{seps}])
+      | (?P<HEX>0[xX][0-9a-fA-F]*)
+      | (?P<BINARY>0[bB][01]*)
+      | (?P<NUMBER>[0-9][0-9.]*)
+      | "(?P<DSTRING>[^"\\]*(?:\\.[^"\\]*)*)"
+      | '(?P<SSTRING>[^'\\]*(?:\\.[^'\\]*)*)'
+      | (?P<QUOTE>["'])
+      | (?P<COMMENT>\#.*)
+      | (?P<UNKNOWN>\S)
+    """.format(not_word_op="(?!{})".format("|".join(word_ops)) if word_ops else "",
+               ops="|".join(re.escape(op) for op in ops),
+               seps="".join(re.escape(d) for d in seps)),
+        re.VERBOSE | re.DOTALL)
+
+def write_token_stream(tokens, f):
+    # Same text as json.dump(list(tokens), f), written one token at a time
+    f.write("[")
+    for i, token in enumerate(tokens):
+        if i:
+            f.write(", ")
+        f.write(json.dumps(token))
+    f.write("]")
+
+class Lexer:
+    def __init__(self, filename=None, source_code=None, engine="char", incremental=False, index_occurrences=False):
+        if engine not in LEXER_ENGINES:
+            raise ValueError(f"Unknown lexer engine '{engine}', expected one of {LEXER_ENGINES}")
+        self.filename = filename
+        if source_code is None:
+            self.source_code = self.load_source_code()
+        else:
+            self.source_code = self.split_source_code(source_code)
+        self.tokens = []
+        self.symbol_table = {}
+        self.keywords = {
+            "if", "else", "elif", "while", "for", "return", "def", "class", 
+            "import", "from", "print", "in", "not", "and", "or", "True", "False",
+            "None", "break", "continue", "try", "except", "finally", "raise",
+            "async", "await", "with", "as", "pass", "global", "nonlocal"
+        }
+        self.operators = {
+            "+", "-", "*", "/", "%", "=", "==", "!=", "<", ">", "<=", ">=",
+            "+=", "-=", "*=", "/=", "%=", "**", "//", "//=", "**=", "&=", "|=",
+            "^=", "<<=", ">>=", "&", "|", "^", "~", "<<", ">>", "is", "is not"
+        }
+        self.delimiters = {
+            "(", ")", "{", "}", "[", "]", ",", ":", ".", ";", "@", "->",
+            "...", "\\", "`"
+        }
+        self.indent_stack = [0]
+        self.line_num = 1
+        self.column = 0
+        self.engine = engine
+        # With incremental=True, tokenize() remembers how many tokens each line
+        # produced and the indent stack before it, so relex() can patch the stream
+        self.incremental = incremental
+        self.line_token_counts = None
+        self.line_indent_states = None
+        # With index_occurrences=True every lexed line is also recorded in an
+        # OccurrenceIndex; token_count is the stream index of the next token
+        self.occurrence_index = OccurrenceIndex() if index_occurrences else None
+        self.token_count = 0
+        if engine == "regex":
+            self.master_pattern = build_master_pattern(self.operators, self.delimiters)
+            self.scan_line = self.process_line_regex
+        else:
+            self.scan_line = self.process_line
+
+    def add_to_symbol_table(self, token_type, value):
+        if value not in self.symbol_table:
+            self.symbol_table[value] = token_type
+    
+    def save_token(self, filename="tokens.json"):
+        # Reuse tokenize() output when present, otherwise lex straight into the file
+        try:
+            with open(filename, "w")as f:
+                write_token_stream(self.tokens or self.iter_tokens(), f)
+            print(f"token stream saved to'{filename}'.")
+        except Exception as e:
+            print(f"failed to save tokens: {e}")
+
+    def load_source_code(self):
+        try:
+            with open(self.filename, "r") as file:
+                return file.readlines()
+        except FileNotFoundError:
+            raise Exception(f"Error: File '{self.filename}' not found.")
+        except Exception as e:
+            raise Exception(f"Error reading file '{self.filename}': {e}")
+
+    def split_source_code(self, source_code):
+        # Split like readlines() on a file opened in text mode; other
+        # iterables (e.g. open files) are kept as-is and read lazily
+        if isinstance(source_code, str):
+            return io.StringIO(source_code, newline=None).readlines()
+        return source_code
+
+    def is_identifier(self, token):
+        return (token[0].isalpha() or token[0] == '_') and all(c.isalnum() or c == '_' for c in token)
+
+    def is_number(self, token):
+        if token.isdigit():
+            return True
+        if '.' in token:
+            parts = token.split('.')
+            return len(parts) == 2 and all(part.isdigit() for part in parts)
+        return False
+
+    def record_occurrences(self, tokens_in_line):
+        if self.occurrence_index is not None:
+            self.occurrence_index.add_line(tokens_in_line, self.token_count, self.line_num)
+        self.token_count += len(tokens_in_line)
+
+    def rebuild_occurrences(self):
+        # After relex() the token indices after the edit have shifted, so the
+        # index is rebuilt from the per-line token counts
+        self.occurrence_index = OccurrenceIndex()
+        first = 0
+        for line_num, count in enumerate(self.line_token_counts, 1):
+            self.occurrence_index.add_line(self.tokens[first:first + count], first, line_num)
+            first += count
+
+    def iter_token_spans(self, lines=None):
+        # Like iter_tokens(), but yields (kind, value, offset, length, line, column)
+        # where offset and length locate the token in "".join(lines)
+        if lines is None:
+            lines = self.source_code
+        elif isinstance(lines, str):
+            lines = io.StringIO(lines, newline=None)
+        line_offset = 0
+        for line in lines:
+            if line.rstrip():
+                spans = []
+                tokens_in_line = self.scan_line(line, spans)
+                self.record_occurrences(tokens_in_line)
+                for (kind, value), (column, length) in zip(tokens_in_line, spans):
+                    yield kind, value, line_offset + column, length, self.line_num, column
+            self.line_num += 1
+            line_offset += len(line)
+
+    def tokenize(self):
+        if self.incremental:
+            self.source_code = list(self.source_code)
+            self.line_token_counts = array("I")
+            self.line_indent_states = []
+            for line in self.source_code:
+                self.lex_tracked_line(line, self.tokens, self.line_token_counts, self.line_indent_states)
+            # The entry after the last line holds the final indent stack
+            self.line_indent_states.append(tuple(self.indent_stack))
+            return self.tokens
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def lex_tracked_line(self, line, tokens, counts, states):
+        states.append(tuple(self.indent_stack))
+        if line.rstrip():
+            tokens_in_line = self.scan_line(line)
+            self.record_occurrences(tokens_in_line)
+            tokens.extend(tokens_in_line)
+            counts.append(len(tokens_in_line))
+        else:
+            counts.append(0)
+        self.line_num += 1
+
+    # Replace source lines [start, end) (0-based) with new_text and patch self.tokens.
+    # Lexing restarts from the indent stack saved for line `start` and stops at the
+    # first line after the edit whose saved indent stack matches the current one;
+    # the tokens from there on are reused. Returns the tokens and the changed range
+    # (first, old_end, new_end): old tokens[first:old_end] became tokens[first:new_end].
+    def relex(self, start, end, new_text):
+        if self.line_token_counts is None:
+            raise ValueError("relex() needs a Lexer created with incremental=True that has been tokenized")
+        old_lines = self.source_code
+        if not 0 <= start <= end <= len(old_lines):
+            raise ValueError(f"Invalid line range {start}:{end} for {len(old_lines)} lines")
+        new_lines = list(self.split_source_code(new_text))
+        if new_lines and not new_lines[-1].endswith("\n") and end < len(old_lines):
+            new_lines[-1] += "\n"
+        if new_lines and start == len(old_lines) and start and not old_lines[-1].endswith("\n"):
+            # Lines added after an unterminated last line start below it
+            old_lines[-1] += "\n"
+
+        counts = self.line_token_counts
+        states = self.line_indent_states
+        self.indent_stack = list(states[start])
+        self.line_num = start + 1
+        new_tokens = []
+        new_counts = array("I")
+        new_states = []
+        for line in new_lines:
+            self.lex_tracked_line(line, new_tokens, new_counts, new_states)
+        resync = end
+        while resync < len(old_lines) and tuple(self.indent_stack) != states[resync]:
+            self.lex_tracked_line(old_lines[resync], new_tokens, new_counts, new_states)
+            resync += 1
+        if resync == len(old_lines):
+            states[-1] = tuple(self.indent_stack)
+
+        first = sum(counts[:start])
+        old_end = first + sum(counts[start:resync])
+        self.tokens[first:old_end] = new_tokens
+        old_lines[start:resync] = new_lines + old_lines[end:resync]
+        counts[start:resync] = new_counts
+        states[start:resync] = new_states
+        self.indent_stack = list(states[-1])
+        self.line_num = len(old_lines) + 1
+        self.token_count = len(self.tokens)
+        if self.occurrence_index is not None:
+            self.rebuild_occurrences()
+        return self.tokens, (first, old_end, first + len(new_tokens))
+
+    def iter_tokens(self, lines=None):
+        # Lex lazily from any iterable of lines (list, open file, generator),
+        # holding only the current line and the indent stack in memory
+        if lines is None:
+            lines = self.source_code
+        elif isinstance(lines, str):
+            lines = io.StringIO(lines, newline=None)
+        for line in lines:
+            stripped_line = line.rstrip()
+            if not stripped_line:
+                self.line_num += 1
+                continue
+
+            tokens_in_line = self.scan_line(line)
+            self.record_occurrences(tokens_in_line)
+            yield from tokens_in_line
+            self.line_num += 1
+
+    # When a spans list is passed, the scanners append one (column, length)
+    # pair per token locating its text in the line. INDENT/DEDENT cover the
+    # leading whitespace, strings cover the text between the quotes.
+    def process_indent(self, line, spans=None):
+        tokens = []
+        stripped_line = line.lstrip()
+        leading_spaces = len(line) - len(stripped_line)
+
+        if leading_spaces > self.indent_stack[-1]:
+            self.indent_stack.append(leading_spaces)
+            tokens.append(("INDENT", leading_spaces))
+        elif leading_spaces < self.indent_stack[-1]:
+            while self.indent_stack and leading_spaces < self.indent_stack[-1]:
+                self.indent_stack.pop()
+                tokens.append(("DEDENT", leading_spaces))
+        if spans is not None:
+            spans.extend([(0, leading_spaces)] * len(tokens))
+        return tokens
+
+    def process_line(self, line, spans=None):
+        # Handle indentation
+        tokens = self.process_indent(line, spans)
+        self.column = 0
+
+        i = 0
+        while i < len(line):
+            char = line[i]
+            self.column = i
+            start = i
+
+            if char.isspace():
+                i += 1
+                continue
+
+            if char == "#":
+                comment = line[i:].strip()
+                tokens.append(("COMMENT", comment))
+                if spans is not None:
+                    spans.append((start, len(comment)))
+                break
+
+            # Handle string literals with different quotes
+            if char in ('"', "'"):
+                quote = char
+                string_literal = ""
+                i += 1
+                while i < len(line) and line[i] != quote:
+                    if line[i] == '\\':
+                        i += 1
+                        if i < len(line):
+                            string_literal += '\\' + line[i]
+                    else:
+                        string_literal += line[i]
+                    i += 1
+                if i >= len(line):
+                    self.error(f"Unterminated string literal at line {self.line_num}")
+                i += 1
+                tokens.append(("STRING", string_literal))
+                if spans is not None:
+                    spans.append((start + 1, i - start - 2))
+                continue
+
+            # Handle multi-character operators
+            matched_op = False
+            for op_len in range(3, 0, -1):
+                if i + op_len <= len(line) and line[i:i+op_len] in self.operators:
+                    tokens.append(("OPERATOR", line[i:i+op_len]))
+                    self.add_to_symbol_table("OPERATOR", line[i:i+op_len])
+                    if spans is not None:
+                        spans.append((start, op_len))
+                    i += op_len
+                    matched_op = True
+                    break
+            if matched_op:
+                continue
+
+            # Handle delimiters
+            if char in self.delimiters:
+                tokens.append(("SEPARATOR", char))
+                self.add_to_symbol_table("SEPARATOR", char)
+                if spans is not None:
+                    spans.append((start, 1))
+                i += 1
+                continue
+
+            # Handle numbers (including hex, binary, and float)
+            if char.isdigit() or (char == "." and i + 1 < len(line) and line[i + 1].isdigit()):
+                num = ""
+                is_hex = False
+                is_binary = False
+                if char == "0" and i + 1 < len(line):
+                    if line[i + 1].lower() == "x":
+                        is_hex = True
+                        num = "0x"
+                        i += 2
+                    elif line[i + 1].lower() == "b":
+                        is_binary = True
+                        num = "0b"
+                        i += 2
+                while i < len(line):
+                    if is_hex and line[i].lower() in "0123456789abcdef":
+                        num += line[i]
+                    elif is_binary and line[i] in "01":
+                        num += line[i]
+                    elif not is_hex and not is_binary and (line[i].isdigit() or line[i] == "."):
+                        num += line[i]
+                    else:
+                        break
+                    i += 1
+                tokens.append(("NUMBER", num))
+                self.add_to_symbol_table("NUMBER", num)
+                if spans is not None:
+                    spans.append((start, i - start))
+                continue
+
+            # Handle identifiers and keywords
+            if char.isalpha() or char == "_":
+                ident = ""
+                while i < len(line) and (line[i].isalnum() or line[i] == "_"):
+                    ident += line[i]
+                    i += 1
+                if ident in self.keywords:
+                    tokens.append(("KEYWORD", ident))
+                else:
+                    tokens.append(("IDENTIFIER", ident))
+                self.add_to_symbol_table("IDENTIFIER", ident)
+                if spans is not None:
+                    spans.append((start, i - start))
+                continue
+
+            # Unknown token
+            tokens.append(("UNKNOWN", char))
+            if spans is not None:
+                spans.append((start, 1))
+            i += 1
+
+        return tokens
+
+    def process_line_regex(self, line, spans=None):
+        # The pattern only mirrors str.isalpha()/isdigit() for ASCII text
+        if not line.isascii():
+            return self.process_line(line, spans)
+
+        tokens = self.process_indent(line, spans)
+        append = tokens.append
+        keywords = self.keywords
+        # setdefault() keeps the first kind seen, like add_to_symbol_table
+        remember = self.symbol_table.setdefault
+        for match in self.master_pattern.finditer(line):
+            kind = match.lastgroup
+            value = match.group()
+            if kind == "NAME":
+                append(("KEYWORD" if value in keywords else "IDENTIFIER", value))
+                remember(value, "IDENTIFIER")
+            elif kind == "OPERATOR" or kind == "SEPARATOR":
+                append((kind, value))
+                remember(value, kind)
+            elif kind == "NUMBER" or kind == "HEX" or kind == "BINARY":
+                if kind != "NUMBER":
+                    value = value[:2].lower() + value[2:]
+                append(("NUMBER", value))
+                remember(value, "NUMBER")
+            elif kind == "DSTRING" or kind == "SSTRING":
+                value = match.group(kind)
+                append(("STRING", value))
+                if spans is not None:
+                    spans.append((match.start(kind), len(value)))
+                continue
+            elif kind == "COMMENT":
+                value = value.strip()
+                append(("COMMENT", value))
+                if spans is not None:
+                    spans.append((match.start(), len(value)))
+                break
+            elif kind == "QUOTE":
+                self.column = match.start()
+                self.error(f"Unterminated string literal at line {self.line_num}")
+            else:
+                append(("UNKNOWN", value))
+            if spans is not None:
+                spans.append((match.start(), match.end() - match.start()))
+        return tokens
+
+    def error(self, message):
+        raise Exception(f"Lexer error at line {self.line_num}, column {self.column}: {message}")
+
+    def save_symbol_table(self, filename="symbol_table.txt"):
+        try:
+            with open(filename, "w") as file:
+                for symbol, token_type in self.symbol_table.items():
+                    file.write(f"{token_type}, {symbol}\n")
+            print(f"Symbol table saved to '{filename}'.")
+        except Exception as e:
+            print(f"Failed to save symbol table: {e}")
+
+
+if __name__ == "__main__":
+    lexer = Lexer("source.py")  # Replace with your file
+    tokens = lexer.tokenize()
+
+    print("Tokens:\n")
+    for token in tokens:
+        print(token)
+
+    lexer.save_token("tokens.json")
+    lexer.save_symbol_table("symbols.txt")
@@ -1,124 +1,266 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Form
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, HTMLResponse
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.templating import Jinja2Templates
-import shutil
-import os
-import json
-from datetime import datetime
-from ast_utils import run_full_pipeline, get_entities_from_tokens
-
-app = FastAPI()
-
-# Allow CORS for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
-
-DATA_DIR = os.path.dirname(os.path.abspath(__file__))
-HISTORY_DIR = os.path.join(DATA_DIR, "history")
-SOURCE_FILE = os.path.join(DATA_DIR, "source.py")
-TOKENS_FILE = os.path.join(DATA_DIR, "tokens.json")
-AST_FILE = os.path.join(DATA_DIR, "ast.json")
-TREE_FILE = os.path.join(DATA_DIR, "ast_output.png")
-
-os.makedirs(HISTORY_DIR, exist_ok=True)
-
-@app.get("/", response_class=HTMLResponse)
-def home(request: Request, idx: int = -1):
-    files = sorted([f for f in os.listdir(HISTORY_DIR) if f.endswith(".py")], reverse=True)
-    code = ""
-    ast_generation_time = "0.0s"
-    if files:
-        if idx == -1:
-            idx = 0
-        idx = max(0, min(idx, len(files)-1))
-        with open(os.path.join(HISTORY_DIR, files[idx]), "r", encoding="utf-8") as f:
-            code = f.read()
-    ast_json = ""
-    if os.path.exists(AST_FILE):
-        with open(AST_FILE, "r", encoding="utf-8") as f:
-            ast_json = f.read()
-    tree_exists = os.path.exists(TREE_FILE)
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "code": code,
-        "ast_json": ast_json,
-        "tree_exists": tree_exists,
-        "idx": idx,
-        "history": files,
-        "history_len": len(files),
-        "ast_generation_time": ast_generation_time
-    })
-
-@app.post("/submit", response_class=HTMLResponse)
-def submit_code(request: Request, code: str = Form(...)):
-    with open(SOURCE_FILE, "w", encoding="utf-8") as f:
-        f.write(code)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    with open(os.path.join(HISTORY_DIR, f"source_{timestamp}.py"), "w", encoding="utf-8") as f:
-        f.write(code)
-    try:
-        run_full_pipeline(SOURCE_FILE)
-    except Exception as e:
-        return HTMLResponse(f"<h1>Pipeline error: {e}</h1>")
-    return RedirectResponse(url="/", status_code=303)
-
-@app.delete("/source")
-def delete_source():
-    if os.path.exists(SOURCE_FILE):
-        os.remove(SOURCE_FILE)
-    return {"status": "deleted"}
-
-@app.post("/generate")
-def generate_ast():
-    try:
-        run_full_pipeline(SOURCE_FILE)
-        return {"status": "generated"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/history")
-def get_history():
-    files = sorted([f for f in os.listdir(HISTORY_DIR) if f.endswith(".py")], reverse=True)
-    return {"history": files}
-
-@app.get("/history/{filename}")
-def get_history_file(filename: str):
-    file_path = os.path.join(HISTORY_DIR, filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return {"code": f.read()}
-
-@app.get("/entities")
-def get_entities():
-    if not os.path.exists(TOKENS_FILE):
-        raise HTTPException(status_code=404, detail="Tokens not found")
-    with open(TOKENS_FILE, "r", encoding="utf-8") as f:
-        tokens = json.load(f)
-    entities = get_entities_from_tokens(tokens)
-    return JSONResponse(content=entities)
-
-@app.get("/ast_json")
-def get_ast_json():
-    if not os.path.exists(AST_FILE):
-        raise HTTPException(status_code=404, detail="AST not found")
-    return FileResponse(AST_FILE, media_type="application/json")
-
-@app.get("/tree_img")
-def get_tree_img():
-    if not os.path.exists(TREE_FILE):
-        raise HTTPException(status_code=404, detail="Tree image not found")
-    return FileResponse(TREE_FILE, media_type="image/png")
-
-@app.post("/end")
-def end_session():
-    # Optionally clean up files or stop background tasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Form
+from fastapi.responses import Response, FileResponse, JSONResponse, RedirectResponse, HTMLResponse, StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.templating import Jinja2Templates
+import shutil
+import os
+import json
+import threading
+from datetime import datetime
+from ast_metrics import compute_metrics
+from ast_visualizer import DEFAULT_NODE_BUDGET, parse_path, render_subtree
+from ast_utils import get_entities_from_tokens, get_entities_from_token_file
+from binary_format import ASTFile, OccurrenceFile, TokenFile
+from pipeline import Pipeline
+from render_profiles import RENDER_PROFILES, Renders
+from result_cache import ResultCache
+from tree_tiles import TilePyramid
+
+app = FastAPI()
+
+# Allow CORS for frontend
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+SOURCE_FILE = os.path.join(DATA_DIR, "source.py")
+TOKENS_FILE = os.path.join(DATA_DIR, "tokens.json")
+TOKENS_BIN_FILE = os.path.join(DATA_DIR, "tokens.bin")
+AST_FILE = os.path.join(DATA_DIR, "ast.json")
+AST_BIN_FILE = os.path.join(DATA_DIR, "ast.bin")
+OCCURRENCES_FILE = os.path.join(DATA_DIR, "occurrences.bin")
+METRICS_FILE = os.path.join(DATA_DIR, "metrics.json")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+os.makedirs(HISTORY_DIR, exist_ok=True)
+
+pipeline = Pipeline()
+result_cache = ResultCache(CACHE_DIR)
+# (AST file, mtime) -> TilePyramid of the AST last served as tiles
+tile_pyramids = {}
+# (AST file, mtime) -> Renders of the saved AST, images made on first request
+current_renders = {}
+# Held while the AST is saved and while an entry of tile_pyramids or
+# current_renders is looked up, built and stored, so a request never stores
+# or serves one made for a different AST
+current_ast_lock = threading.Lock()
+
+@app.get("/", response_class=HTMLResponse)
+def home(request: Request, idx: int = -1):
+    files = sorted([f for f in os.listdir(HISTORY_DIR) if f.endswith(".py")], reverse=True)
+    code = ""
+    ast_generation_time = "0.0s"
+    if files:
+        if idx == -1:
+            idx = 0
+        idx = max(0, min(idx, len(files)-1))
+        with open(os.path.join(HISTORY_DIR, files[idx]), "r", encoding="utf-8") as f:
+            code = f.read()
+    ast_json = ""
+    if os.path.exists(AST_FILE):
+        with open(AST_FILE, "r", encoding="utf-8") as f:
+            ast_json = f.read()
+    # Images are rendered when /tree_img asks for them
+    tree_exists = os.path.exists(AST_BIN_FILE) or os.path.exists(AST_FILE)
+    return templates.TemplateResponse("index.html", {
+        "request": request,
+        "code": code,
+        "ast_json": ast_json,
+        "tree_exists": tree_exists,
+        "idx": idx,
+        "history": files,
+        "history_len": len(files),
+        "ast_generation_time": ast_generation_time
+    })
+
+@app.post("/submit", response_class=HTMLResponse)
+def submit_code(request: Request, code: str = Form(...)):
+    with open(SOURCE_FILE, "w", encoding="utf-8") as f:
+        f.write(code)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(os.path.join(HISTORY_DIR, f"source_{timestamp}.py"), "w", encoding="utf-8") as f:
+        f.write(code)
+    try:
+        save_result(result_cache.run(pipeline, code))
+    except Exception as e:
+        return HTMLResponse(f"<h1>Pipeline error: {e}</h1>")
+    return RedirectResponse(url="/", status_code=303)
+
+def save_result(result):
+    # Saved files plus the result's renders, kept for the image endpoints
+    with current_ast_lock:
+        result.save(DATA_DIR)
+        current_renders.clear()
+        current_renders[ast_file_key()] = result.renders
+
+@app.delete("/source")
+def delete_source():
+    if os.path.exists(SOURCE_FILE):
+        os.remove(SOURCE_FILE)
+    return {"status": "deleted"}
+
+@app.post("/generate")
+def generate_ast():
+    try:
+        with open(SOURCE_FILE, "r", encoding="utf-8") as f:
+            save_result(result_cache.run(pipeline, f.read()))
+        return {"status": "generated"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/history")
+def get_history():
+    files = sorted([f for f in os.listdir(HISTORY_DIR) if f.endswith(".py")], reverse=True)
+    return {"history": files}
+
+@app.get("/history/{filename}")
+def get_history_file(filename: str):
+    file_path = os.path.join(HISTORY_DIR, filename)
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="File not found")
+    with open(file_path, "r", encoding="utf-8") as f:
+        return {"code": f.read()}
+
+@app.get("/entities")
+def get_entities(name: str = None):
+    if name is not None:
+        # Single-name lookup, answered from the occurrence index without touching the tokens
+        if not os.path.exists(OCCURRENCES_FILE):
+            raise HTTPException(status_code=404, detail="Occurrence index not found")
+        with OccurrenceFile(OCCURRENCES_FILE) as index:
+            occurrences = index.occurrences(name)
+        return JSONResponse(content={
+            "name": name,
+            "count": len(occurrences),
+            "occurrences": [{"token": token, "line": line} for token, line in occurrences],
+        })
+    if os.path.exists(TOKENS_BIN_FILE):
+        with TokenFile(TOKENS_BIN_FILE) as token_file:
+            return JSONResponse(content=get_entities_from_token_file(token_file))
+    if not os.path.exists(TOKENS_FILE):
+        raise HTTPException(status_code=404, detail="Tokens not found")
+    with open(TOKENS_FILE, "r", encoding="utf-8") as f:
+        tokens = json.load(f)
+    entities = get_entities_from_tokens(tokens)
+    return JSONResponse(content=entities)
+
+@app.get("/ast_stream")
+def get_ast_stream():
+    # One JSON statement per line, sent as soon as each one is parsed
+    if not os.path.exists(SOURCE_FILE):
+        raise HTTPException(status_code=404, detail="Source not found")
+    statements = pipeline.iter_file_statements(SOURCE_FILE)
+    return StreamingResponse((json.dumps(statement) + "\n" for statement in statements), media_type="application/x-ndjson")
+
+@app.get("/ast_json")
+def get_ast_json():
+    if not os.path.exists(AST_FILE) and os.path.exists(AST_BIN_FILE):
+        with ASTFile(AST_BIN_FILE) as ast_file:
+            return JSONResponse(content=ast_file.to_python())
+    if not os.path.exists(AST_FILE):
+        raise HTTPException(status_code=404, detail="AST not found")
+    return FileResponse(AST_FILE, media_type="application/json")
+
+@app.get("/metrics")
+def get_metrics():
+    # Node counts, depth, fan-out, entities and diagnostics from one pass over the AST
+    if os.path.exists(METRICS_FILE):
+        return FileResponse(METRICS_FILE, media_type="application/json")
+    return JSONResponse(content=compute_metrics(load_current_ast()).to_dict())
+
+def load_current_ast():
+    if os.path.exists(AST_BIN_FILE):
+        with ASTFile(AST_BIN_FILE) as ast_file:
+            return ast_file.to_python()
+    if os.path.exists(AST_FILE):
+        with open(AST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    raise HTTPException(status_code=404, detail="AST not found")
+
+def ast_file_key():
+    path = AST_BIN_FILE if os.path.exists(AST_BIN_FILE) else AST_FILE
+    return (path, os.stat(path).st_mtime_ns) if os.path.exists(path) else None
+
+def renders_of_current_ast():
+    # Images are rendered by the caller, outside the lock
+    with current_ast_lock:
+        key = ast_file_key()
+        renders = current_renders.get(key)
+        if renders is None:
+            renders = Renders(load_current_ast())
+            current_renders.clear()
+            current_renders[key] = renders
+        return renders
+
+@app.get("/tree_img")
+def get_tree_img(profile: str = "png"):
+    # Render profiles: dot, svg, thumbnail, png; each is rendered on its first
+    # request for the current AST and kept
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(status_code=404, detail=f"Unknown render profile: {profile}")
+    try:
+        image = renders_of_current_ast().get(profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=image, media_type=RENDER_PROFILES[profile][2])
+
+@app.get("/tree_svg")
+def get_tree_svg():
+    # Drawn by the built-in tidy tree layout; needs no Graphviz install
+    return Response(content=renders_of_current_ast().get("svg"), media_type="image/svg+xml")
+
+@app.get("/tree_subtree")
+def get_tree_subtree(path: str = "", start: int = 0, max_nodes: int = DEFAULT_NODE_BUDGET, max_depth: int = None):
+    # Level-of-detail SVG of the subtree at path; each collapsed node carries
+    # the data-path / data-start to request next to expand it
+    if max_nodes < 1:
+        raise HTTPException(status_code=400, detail="max_nodes must be at least 1")
+    try:
+        svg = render_subtree(load_current_ast(), parse_path(path), start, "svg", max_depth, max_nodes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=svg, media_type="image/svg+xml")
+
+def current_tile_pyramid():
+    # Tiles are rebuilt only when the saved AST changes
+    with current_ast_lock:
+        key = ast_file_key()
+        pyramid = tile_pyramids.get(key)
+        if pyramid is None:
+            pyramid = TilePyramid(load_current_ast())
+            tile_pyramids.clear()
+            tile_pyramids[key] = pyramid
+        return pyramid
+
+@app.get("/tree_tiles")
+def get_tree_tiles():
+    # Tile size, zoom levels and the tile grid of each, for a deep-zoom viewer
+    return current_tile_pyramid().info()
+
+@app.get("/tree_tiles/{z}/{x}/{y}")
+def get_tree_tile(z: int, x: int, y: int):
+    try:
+        tile = current_tile_pyramid().tile(z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=tile, media_type="image/svg+xml")
+
+@app.get("/cache_stats")
+def get_cache_stats():
+    # Counters are per worker process; entries and bytes are shared on disk
+    return {"pid": os.getpid(), **result_cache.stats()}
+
+@app.post("/end")
+def end_session():
+    # Optionally clean up files or stop background tasks
     return {"status": "ended"} 
\ No newline at end of file
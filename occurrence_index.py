@@ -0,0 +1,38 @@
+import sys
+from array import array
+
+# Token kinds whose lexemes are indexed; strings, numbers and separators are not
+INDEXED_KINDS = frozenset({"IDENTIFIER", "KEYWORD", "OPERATOR"})
+
+
+class OccurrenceIndex:
+    """Maps each lexeme to the token indices and line numbers where it occurs."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, name, token_index, line):
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.entries[sys.intern(name)] = (array("I"), array("I"))
+        entry[0].append(token_index)
+        entry[1].append(line)
+
+    def add_line(self, tokens_in_line, first_token_index, line):
+        for offset, (kind, value) in enumerate(tokens_in_line):
+            if kind in INDEXED_KINDS:
+                self.add(value, first_token_index + offset, line)
+
+    def occurrences(self, name):
+        # [(token_index, line), ...] in source order
+        entry = self.entries.get(name)
+        if entry is None:
+            return []
+        return list(zip(entry[0], entry[1]))
+
+    def count(self, name):
+        entry = self.entries.get(name)
+        return len(entry[0]) if entry is not None else 0
+
+    def names(self):
+        return list(self.entries)
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Lexer
+
+
+def is_chunk_boundary(line):
+    # A non-blank line starting in column 0 pops the indent stack back to [0],
+    # so lexing can restart there from a fresh Lexer
+    return bool(line.rstrip()) and not line[0].isspace()
+
+
+def split_chunks(lines, n_chunks):
+    # Returns the first line index of each chunk, always starting with 0
+    target = max(1, len(lines) // max(1, n_chunks))
+    starts = [0]
+    index = target
+    while index < len(lines):
+        while index < len(lines) and not is_chunk_boundary(lines[index]):
+            index += 1
+        if index < len(lines):
+            starts.append(index)
+        index += target
+    return starts
+
+
+def lex_chunk(lines, first_line_num, engine):
+    lexer = Lexer(source_code=lines, engine=engine)
+    lexer.line_num = first_line_num
+    tokens = lexer.tokenize()
+    return tokens, len(lexer.indent_stack), lexer.symbol_table
+
+
+def tokenize_parallel(source_code, workers=None, engine="regex", chunks_per_worker=4):
+    """Lex one large source in a process pool; returns (tokens, symbol_table).
+
+    The source is cut at column-0 lines. Each chunk is lexed from a fresh
+    indent stack, then the DEDENT tokens the serial lexer would emit on the
+    chunk's first line are put back, so the stream matches Lexer.tokenize().
+    """
+    lines = Lexer(source_code=source_code).source_code
+    if not isinstance(lines, list):
+        lines = list(lines)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        tokens, _, symbol_table = lex_chunk(lines, 1, engine)
+        return tokens, symbol_table
+    starts = split_chunks(lines, workers * chunks_per_worker)
+    bounds = list(zip(starts, starts[1:] + [len(lines)]))
+
+    tokens = []
+    symbol_table = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(lex_chunk, lines[start:end], start + 1, engine) for start, end in bounds]
+        open_indents = 1
+        for future in futures:
+            chunk_tokens, chunk_indents, chunk_symbols = future.result()
+            tokens.extend([("DEDENT", 0)] * (open_indents - 1))
+            tokens.extend(chunk_tokens)
+            open_indents = chunk_indents
+            for symbol, token_type in chunk_symbols.items():
+                symbol_table.setdefault(symbol, token_type)
+    return tokens, symbol_table
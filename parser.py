@@ -1,337 +1,456 @@
-import json
-
-# Read tokens from JSON file
-def read_tokens_from_json(filename):
-    with open(filename, 'r') as file:
-        return json.load(file)
-
-class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[self.pos] if self.tokens else None
-        self.line_num = 1
-        self.column = 0
-        print("Tokens loaded:", self.tokens)  # Debug print
-
-    def error(self, message):
-        raise Exception(f"Parse error at line {self.line_num}, column {self.column}: {message}")
-
-    def advance(self):
-        self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-            if self.current_token[0] == "NEWLINE":
-                self.line_num += 1
-                self.column = 0
-            else:
-                self.column += len(str(self.current_token[1]))
-        else:
-            self.current_token = None
-
-    def consume(self, token_type, value=None):
-        if self.current_token is None:
-            self.error(f"Unexpected end of input. Expected token type {token_type}.")
-        elif self.current_token[0] == token_type:
-            if value is not None and self.current_token[1] != value:
-                self.error(f"Expected token value '{value}', but got '{self.current_token[1]}'")
-            token = self.current_token
-            self.advance()
-            return token
-        else:
-            self.error(f"Expected token type {token_type}, but got {self.current_token}")
-
-    def parse(self):
-        return self.parse_program()
-
-    def parse_program(self):
-        statements = []
-        while self.current_token:
-            # Skip comments and other non-statement tokens
-            if self.current_token[0] in ("COMMENT", "NEWLINE", "INDENT", "DEDENT"):
-                self.advance()
-                continue
-            statements.append(self.parse_statement())
-        return {"type": "Program", "body": statements}
-
-    def parse_statement(self):
-        if self.current_token[0] == "KEYWORD":
-            if self.current_token[1] == "print":
-                return self.parse_print()
-            elif self.current_token[1] == "if":
-                return self.parse_if()
-            elif self.current_token[1] == "while":
-                return self.parse_while()
-            elif self.current_token[1] == "for":
-                return self.parse_for()
-            elif self.current_token[1] == "def":
-                return self.parse_function_def()
-            elif self.current_token[1] == "return":
-                return self.parse_return()
-            elif self.current_token[1] == "break":
-                return self.parse_break()
-            elif self.current_token[1] == "continue":
-                return self.parse_continue()
-        elif self.current_token[0] == "IDENTIFIER":
-            return self.parse_assignment()
-        else:
-            self.error(f"Invalid statement: {self.current_token}")
-
-    def parse_assignment(self):
-        var_name = self.current_token[1]
-        self.consume("IDENTIFIER")
-        
-        # Handle augmented assignment operators
-        if self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+=", "-=", "*=", "/=", "%=", "**=", "//="):
-            op = self.current_token[1]
-            self.consume("OPERATOR")
-            right = self.parse_expression()
-            return {
-                "type": "AugmentedAssignment",
-                "operator": op,
-                "left": {"type": "Identifier", "name": var_name},
-                "right": right
-            }
-        
-        # Regular assignment
-        self.consume("OPERATOR", "=")
-        expression = self.parse_expression()
-        return {"type": "Assignment", "name": var_name, "value": expression}
-
-    def parse_print(self):
-        self.consume("KEYWORD", "print")
-        self.consume("SEPARATOR", "(")
-        args = []
-        if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
-            args.append(self.parse_expression())
-            while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
-                self.consume("SEPARATOR", ",")
-                args.append(self.parse_expression())
-        self.consume("SEPARATOR", ")")
-        return {"type": "PrintStatement", "arguments": args}
-
-    def parse_if(self):
-        self.consume("KEYWORD", "if")
-        self.consume("SEPARATOR", "(")
-        condition = self.parse_expression()
-        self.consume("SEPARATOR", ")")
-        self.consume("SEPARATOR", ":")
-        
-        body = self.parse_block()
-        elif_blocks = []
-        else_block = None
-
-        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "elif":
-            self.consume("KEYWORD", "elif")
-            self.consume("SEPARATOR", "(")
-            elif_condition = self.parse_expression()
-            self.consume("SEPARATOR", ")")
-            self.consume("SEPARATOR", ":")
-            elif_body = self.parse_block()
-            elif_blocks.append({
-                "condition": elif_condition,
-                "body": elif_body
-            })
-
-        if self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "else":
-            self.consume("KEYWORD", "else")
-            self.consume("SEPARATOR", ":")
-            else_block = self.parse_block()
-
-        return {
-            "type": "IfStatement",
-            "condition": condition,
-            "body": body,
-            "elif_blocks": elif_blocks,
-            "else_block": else_block
-        }
-
-    def parse_while(self):
-        self.consume("KEYWORD", "while")
-        self.consume("SEPARATOR", "(")
-        condition = self.parse_expression()
-        self.consume("SEPARATOR", ")")
-        self.consume("SEPARATOR", ":")
-        body = self.parse_block()
-        return {"type": "WhileStatement", "condition": condition, "body": body}
-
-    def parse_for(self):
-        self.consume("KEYWORD", "for")
-        var = self.consume("IDENTIFIER")[1]
-        self.consume("KEYWORD", "in")
-        iterable = self.parse_expression()
-        self.consume("SEPARATOR", ":")
-        body = self.parse_block()
-        return {"type": "ForStatement", "variable": var, "iterable": iterable, "body": body}
-
-    def parse_function_def(self):
-        self.consume("KEYWORD", "def")
-        name = self.consume("IDENTIFIER")[1]
-        self.consume("SEPARATOR", "(")
-        params = []
-        if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
-            params.append(self.consume("IDENTIFIER")[1])
-            while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
-                self.consume("SEPARATOR", ",")
-                params.append(self.consume("IDENTIFIER")[1])
-        self.consume("SEPARATOR", ")")
-        self.consume("SEPARATOR", ":")
-        body = self.parse_block()
-        return {"type": "FunctionDefinition", "name": name, "parameters": params, "body": body}
-
-    def parse_return(self):
-        self.consume("KEYWORD", "return")
-        value = None
-        if self.current_token[0] != "NEWLINE":
-            value = self.parse_expression()
-        return {"type": "ReturnStatement", "value": value}
-
-    def parse_break(self):
-        self.consume("KEYWORD", "break")
-        return {"type": "BreakStatement"}
-
-    def parse_continue(self):
-        self.consume("KEYWORD", "continue")
-        return {"type": "ContinueStatement"}
-
-    def parse_block(self):
-        statements = []
-        # Consume INDENT at the start of a block, if present
-        if self.current_token and self.current_token[0] == "INDENT":
-            self.consume("INDENT")
-        while self.current_token and self.current_token[0] != "DEDENT":
-            if self.current_token[0] == "NEWLINE":
-                self.advance()
-                continue
-            statements.append(self.parse_statement())
-        if self.current_token and self.current_token[0] == "DEDENT":
-            self.consume("DEDENT")
-        return statements
-
-    def parse_expression(self):
-        return self.parse_or()
-
-    def parse_or(self):
-        node = self.parse_and()
-        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "or":
-            self.consume("KEYWORD", "or")
-            right = self.parse_and()
-            node = {"type": "BinaryExpression", "operator": "or", "left": node, "right": right}
-        return node
-
-    def parse_and(self):
-        node = self.parse_comparison()
-        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "and":
-            self.consume("KEYWORD", "and")
-            right = self.parse_comparison()
-            node = {"type": "BinaryExpression", "operator": "and", "left": node, "right": right}
-        return node
-
-    def parse_comparison(self):
-        node = self.parse_term()
-        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("==", "!=", "<", ">", "<=", ">=", "is", "is not", "in", "not in"):
-            op = self.current_token[1]
-            self.consume("OPERATOR")
-            right = self.parse_term()
-            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
-        return node
-
-    def parse_term(self):
-        node = self.parse_factor()
-        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+", "-"):
-            op = self.current_token[1]
-            self.consume("OPERATOR")
-            right = self.parse_factor()
-            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
-        return node
-
-    def parse_factor(self):
-        node = self.parse_power()
-        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("*", "/", "%", "//"):
-            op = self.current_token[1]
-            self.consume("OPERATOR")
-            right = self.parse_power()
-            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
-        return node
-
-    def parse_power(self):
-        node = self.parse_unary()
-        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] == "**":
-            self.consume("OPERATOR", "**")
-            right = self.parse_unary()
-            node = {"type": "BinaryExpression", "operator": "**", "left": node, "right": right}
-        return node
-
-    def parse_unary(self):
-        if self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+", "-", "not"):
-            op = self.current_token[1]
-            self.consume("OPERATOR")
-            right = self.parse_unary()
-            return {"type": "UnaryExpression", "operator": op, "right": right}
-        return self.parse_primary()
-
-    def parse_primary(self):
-        token_type, token_value = self.current_token
-
-        if token_type == "NUMBER":
-            return self.parse_number()
-        elif token_type == "STRING":
-            return self.parse_string()
-        elif token_type == "IDENTIFIER":
-            node = self.parse_identifier()
-            # Handle function call
-            while self.current_token and self.current_token[0] == "SEPARATOR" and self.current_token[1] == "(":
-                self.consume("SEPARATOR", "(")
-                args = []
-                if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
-                    args.append(self.parse_expression())
-                    while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
-                        self.consume("SEPARATOR", ",")
-                        args.append(self.parse_expression())
-                self.consume("SEPARATOR", ")")
-                node = {"type": "FunctionCall", "callee": node, "arguments": args}
-            return node
-        elif token_type == "KEYWORD" and token_value in ("True", "False", "None"):
-            return self.parse_boolean_or_none()
-        elif token_type == "SEPARATOR" and token_value == "(":
-            self.consume("SEPARATOR", "(")
-            expr = self.parse_expression()
-            self.consume("SEPARATOR", ")")
-            return expr
-        else:
-            self.error(f"Invalid primary expression: {self.current_token}")
-
-    def parse_number(self):
-        num = self.current_token[1]
-        self.consume("NUMBER")
-        return {"type": "Number", "value": num}
-
-    def parse_string(self):
-        value = self.current_token[1]
-        self.consume("STRING")
-        return {"type": "String", "value": value}
-
-    def parse_identifier(self):
-        name = self.current_token[1]
-        self.consume("IDENTIFIER")
-        return {"type": "Identifier", "name": name}
-
-    def parse_boolean_or_none(self):
-        value = self.current_token[1]
-        self.consume("KEYWORD")
-        return {"type": "Boolean" if value in ("True", "False") else "None", "value": value}
-
-# Main execution
-if __name__ == "__main__":
-    tokens = read_tokens_from_json("tokens.json")
-    print(f"Tokens read from tokens.json: {tokens}")
-
-    parser = Parser(tokens)
-    ast = parser.parse()
-
-    print("Abstract Syntax Tree (AST):")
-    print(json.dumps(ast, indent=2))  # Pretty print the AST
-    with open("ast.json","w")as f:
-        json.dump(ast,f,indent=2)
-    print("ast written to ast.json")
-    
+import json
+
+from ast_arena import NodeArena
+from grammar import GRAMMAR, dispatch_table, first_sets, token_set
+
+# "precedence" parses expressions with one binding-power table and explicit
+# stacks, "recursive" with one method per precedence level (parse_or ... parse_primary)
+EXPRESSION_ENGINES = ("precedence", "recursive")
+
+# Binding power of each binary operator, all left-associative. Prefix +, -
+# and not bind tighter than any of them, so -a ** b is (-a) ** b.
+BINDING_POWERS = {
+    ("KEYWORD", "or"): 1,
+    ("KEYWORD", "and"): 2,
+    **{("OPERATOR", op): 3 for op in ("==", "!=", "<", ">", "<=", ">=", "is", "is not", "in", "not in")},
+    ("OPERATOR", "+"): 4,
+    ("OPERATOR", "-"): 4,
+    **{("OPERATOR", op): 5 for op in ("*", "/", "%", "//")},
+    ("OPERATOR", "**"): 6,
+}
+UNARY_OPERATORS = ("+", "-", "not")
+UNARY_POWER = 7
+LEAF_TYPES = {"NUMBER": "Number", "STRING": "String", "IDENTIFIER": "Identifier"}
+LEAF_FIELDS = {"Number": "value", "String": "value", "Identifier": "name"}
+
+# Parser method for each alternative of the "statement" rule in grammar.py.
+# parse_statement() picks one with a table built from the rules' FIRST sets;
+# the handler may skip checking the token it was dispatched on.
+STATEMENT_HANDLERS = {
+    "print_statement": "parse_print",
+    "if_statement": "parse_if",
+    "while_statement": "parse_while",
+    "for_statement": "parse_for",
+    "function_definition": "parse_function_def",
+    "return_statement": "parse_return",
+    "break_statement": "parse_break",
+    "continue_statement": "parse_continue",
+    "assignment": "parse_assignment",
+}
+FIRST_SETS = first_sets(GRAMMAR)
+STATEMENT_DISPATCH = dispatch_table(GRAMMAR, "statement", STATEMENT_HANDLERS, FIRST_SETS)
+EXPRESSION_START = token_set(GRAMMAR, "expression", FIRST_SETS)
+
+# Read tokens from JSON file
+def read_tokens_from_json(filename):
+    with open(filename, 'r') as file:
+        return json.load(file)
+
+class Parser:
+    def __init__(self, tokens, verbose=True, expression_engine="precedence"):
+        if expression_engine not in EXPRESSION_ENGINES:
+            raise ValueError(f"Unknown expression engine '{expression_engine}', expected one of {EXPRESSION_ENGINES}")
+        # tokens may be a list or any iterator of (kind, value) pairs, e.g.
+        # Lexer.iter_tokens(); the parser only keeps one token of lookahead
+        self.tokens = tokens
+        self.token_iter = iter(tokens)
+        self.pos = 0
+        self.current_token = next(self.token_iter, None)
+        self.next_token = next(self.token_iter, None)
+        self.line_num = 1
+        self.column = 0
+        self.expression_engine = expression_engine
+        self.statement_dispatch = {key: getattr(self, name) for key, name in STATEMENT_DISPATCH.items()}
+        if expression_engine == "precedence":
+            self.parse_expression = self.parse_precedence
+        else:
+            self.parse_expression = self.parse_or
+        if verbose and tokens is not self.token_iter:
+            print("Tokens loaded:", self.tokens)  # Debug print
+
+    def error(self, message):
+        raise Exception(f"Parse error at line {self.line_num}, column {self.column}: {message}")
+
+    def advance(self):
+        self.pos += 1
+        token = self.current_token = self.next_token
+        if token is not None:
+            self.next_token = next(self.token_iter, None)
+            if token[0] == "NEWLINE":
+                self.line_num += 1
+                self.column = 0
+            else:
+                self.column += len(str(token[1]))
+
+    def consume(self, token_type, value=None):
+        token = self.current_token
+        if token is not None and token[0] == token_type and (value is None or token[1] == value):
+            self.advance()
+            return token
+        if token is None:
+            self.error(f"Unexpected end of input. Expected token type {token_type}.")
+        elif token[0] == token_type:
+            self.error(f"Expected token value '{value}', but got '{token[1]}'")
+        else:
+            self.error(f"Expected token type {token_type}, but got {token}")
+
+    def parse(self):
+        return self.parse_program()
+
+    def parse_program(self):
+        return {"type": "Program", "body": list(self.iter_statements())}
+
+    def parse_arena(self):
+        # Like parse(), but each statement is moved into a NodeArena as soon as
+        # it is parsed, so the dict tree of the whole program is never built
+        return NodeArena.from_statements(self.iter_statements())
+
+    def iter_statements(self):
+        # Yields each top-level statement as soon as it is complete. With a
+        # token iterator, tokens are pulled only as far as the statement needs
+        # (one past its end, to see whether an if continues with elif/else).
+        while self.current_token:
+            # Skip comments and other non-statement tokens
+            if self.current_token[0] in ("COMMENT", "NEWLINE", "INDENT", "DEDENT"):
+                self.advance()
+                continue
+            yield self.parse_statement()
+
+    def parse_statement(self):
+        # Kind keys (e.g. any IDENTIFIER) first, then (kind, value) keys
+        token = self.current_token
+        dispatch = self.statement_dispatch
+        handler = dispatch.get(token[0]) or dispatch.get((token[0], token[1]))
+        if handler is None:
+            self.error(f"Invalid statement: {token}")
+        return handler()
+
+    def parse_assignment(self):
+        var_name = self.current_token[1]
+        self.advance()
+        
+        # Handle augmented assignment operators
+        if self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+=", "-=", "*=", "/=", "%=", "**=", "//="):
+            op = self.current_token[1]
+            self.consume("OPERATOR")
+            right = self.parse_expression()
+            return {
+                "type": "AugmentedAssignment",
+                "operator": op,
+                "left": {"type": "Identifier", "name": var_name},
+                "right": right
+            }
+        
+        # Regular assignment
+        self.consume("OPERATOR", "=")
+        expression = self.parse_expression()
+        return {"type": "Assignment", "name": var_name, "value": expression}
+
+    def parse_print(self):
+        self.advance()
+        self.consume("SEPARATOR", "(")
+        args = []
+        if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
+            args.append(self.parse_expression())
+            while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
+                self.consume("SEPARATOR", ",")
+                args.append(self.parse_expression())
+        self.consume("SEPARATOR", ")")
+        return {"type": "PrintStatement", "arguments": args}
+
+    def parse_if(self):
+        self.advance()
+        self.consume("SEPARATOR", "(")
+        condition = self.parse_expression()
+        self.consume("SEPARATOR", ")")
+        self.consume("SEPARATOR", ":")
+        
+        body = self.parse_block()
+        elif_blocks = []
+        else_block = None
+
+        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "elif":
+            self.consume("KEYWORD", "elif")
+            self.consume("SEPARATOR", "(")
+            elif_condition = self.parse_expression()
+            self.consume("SEPARATOR", ")")
+            self.consume("SEPARATOR", ":")
+            elif_body = self.parse_block()
+            elif_blocks.append({
+                "condition": elif_condition,
+                "body": elif_body
+            })
+
+        if self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "else":
+            self.consume("KEYWORD", "else")
+            self.consume("SEPARATOR", ":")
+            else_block = self.parse_block()
+
+        return {
+            "type": "IfStatement",
+            "condition": condition,
+            "body": body,
+            "elif_blocks": elif_blocks,
+            "else_block": else_block
+        }
+
+    def parse_while(self):
+        self.advance()
+        self.consume("SEPARATOR", "(")
+        condition = self.parse_expression()
+        self.consume("SEPARATOR", ")")
+        self.consume("SEPARATOR", ":")
+        body = self.parse_block()
+        return {"type": "WhileStatement", "condition": condition, "body": body}
+
+    def parse_for(self):
+        self.advance()
+        var = self.consume("IDENTIFIER")[1]
+        self.consume("KEYWORD", "in")
+        iterable = self.parse_expression()
+        self.consume("SEPARATOR", ":")
+        body = self.parse_block()
+        return {"type": "ForStatement", "variable": var, "iterable": iterable, "body": body}
+
+    def parse_function_def(self):
+        self.advance()
+        name = self.consume("IDENTIFIER")[1]
+        self.consume("SEPARATOR", "(")
+        params = []
+        if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
+            params.append(self.consume("IDENTIFIER")[1])
+            while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
+                self.consume("SEPARATOR", ",")
+                params.append(self.consume("IDENTIFIER")[1])
+        self.consume("SEPARATOR", ")")
+        self.consume("SEPARATOR", ":")
+        body = self.parse_block()
+        return {"type": "FunctionDefinition", "name": name, "parameters": params, "body": body}
+
+    def parse_return(self):
+        self.advance()
+        value = None
+        token = self.current_token
+        if token is not None and (token[0] in EXPRESSION_START or (token[0], token[1]) in EXPRESSION_START):
+            value = self.parse_expression()
+        return {"type": "ReturnStatement", "value": value}
+
+    def parse_break(self):
+        self.advance()
+        return {"type": "BreakStatement"}
+
+    def parse_continue(self):
+        self.advance()
+        return {"type": "ContinueStatement"}
+
+    def parse_block(self):
+        statements = []
+        # Consume INDENT at the start of a block, if present
+        if self.current_token and self.current_token[0] == "INDENT":
+            self.consume("INDENT")
+        while self.current_token and self.current_token[0] != "DEDENT":
+            if self.current_token[0] == "NEWLINE":
+                self.advance()
+                continue
+            statements.append(self.parse_statement())
+        if self.current_token and self.current_token[0] == "DEDENT":
+            self.consume("DEDENT")
+        return statements
+
+    def parse_precedence(self):
+        # Operands and pending operators live on two stacks. Each operator
+        # entry is (binding power, operator, arity); an open parenthesis is
+        # (0, None, 0), which no binary operator can reduce past. Only the
+        # arguments of function calls recurse, through parse_primary().
+        token = self.current_token
+        leaf_type = LEAF_TYPES.get(token[0]) if token is not None else None
+        if leaf_type is not None:
+            # Fast path for a lone number, string or name followed by a non-operator
+            following = self.next_token
+            if following is None or (following[1] != "(" and (following[0], following[1]) not in BINDING_POWERS):
+                self.advance()
+                return {"type": leaf_type, LEAF_FIELDS[leaf_type]: token[1]}
+        operands = []
+        operators = []
+        open_groups = 0
+        while True:
+            # Operand position: prefix operators and "(" first
+            token = self.current_token
+            while token is not None:
+                if token[0] == "OPERATOR" and token[1] in UNARY_OPERATORS:
+                    operators.append((UNARY_POWER, token[1], 1))
+                elif token[0] == "SEPARATOR" and token[1] == "(":
+                    operators.append((0, None, 0))
+                    open_groups += 1
+                else:
+                    break
+                self.advance()
+                token = self.current_token
+            # Numbers, strings and names that are not called are built inline,
+            # everything else goes through parse_primary()
+            leaf_type = LEAF_TYPES.get(token[0]) if token is not None else None
+            if leaf_type == "Identifier" and self.next_token is not None:
+                following = self.next_token
+                if following[0] == "SEPARATOR" and following[1] == "(":
+                    leaf_type = None
+            if leaf_type is not None:
+                operands.append({"type": leaf_type, LEAF_FIELDS[leaf_type]: token[1]})
+                self.advance()
+            else:
+                operands.append(self.parse_primary())
+
+            # Operator position: close groups, then a binary operator or the end
+            token = self.current_token
+            while open_groups and token is not None and token[0] == "SEPARATOR" and token[1] == ")":
+                while operators[-1][2]:
+                    self.reduce_operator(operands, operators)
+                operators.pop()
+                open_groups -= 1
+                self.advance()
+                token = self.current_token
+            power = BINDING_POWERS.get((token[0], token[1])) if token is not None else None
+            if power is None:
+                break
+            while operators and operators[-1][0] >= power:
+                self.reduce_operator(operands, operators)
+            operators.append((power, token[1], 2))
+            self.advance()
+
+        if open_groups:
+            self.consume("SEPARATOR", ")")
+        while operators:
+            self.reduce_operator(operands, operators)
+        return operands[0]
+
+    def reduce_operator(self, operands, operators):
+        _, op, arity = operators.pop()
+        if arity == 1:
+            operands[-1] = {"type": "UnaryExpression", "operator": op, "right": operands[-1]}
+        else:
+            right = operands.pop()
+            operands[-1] = {"type": "BinaryExpression", "operator": op, "left": operands[-1], "right": right}
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "or":
+            self.consume("KEYWORD", "or")
+            right = self.parse_and()
+            node = {"type": "BinaryExpression", "operator": "or", "left": node, "right": right}
+        return node
+
+    def parse_and(self):
+        node = self.parse_comparison()
+        while self.current_token and self.current_token[0] == "KEYWORD" and self.current_token[1] == "and":
+            self.consume("KEYWORD", "and")
+            right = self.parse_comparison()
+            node = {"type": "BinaryExpression", "operator": "and", "left": node, "right": right}
+        return node
+
+    def parse_comparison(self):
+        node = self.parse_term()
+        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("==", "!=", "<", ">", "<=", ">=", "is", "is not", "in", "not in"):
+            op = self.current_token[1]
+            self.consume("OPERATOR")
+            right = self.parse_term()
+            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
+        return node
+
+    def parse_term(self):
+        node = self.parse_factor()
+        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+", "-"):
+            op = self.current_token[1]
+            self.consume("OPERATOR")
+            right = self.parse_factor()
+            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
+        return node
+
+    def parse_factor(self):
+        node = self.parse_power()
+        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("*", "/", "%", "//"):
+            op = self.current_token[1]
+            self.consume("OPERATOR")
+            right = self.parse_power()
+            node = {"type": "BinaryExpression", "operator": op, "left": node, "right": right}
+        return node
+
+    def parse_power(self):
+        node = self.parse_unary()
+        while self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] == "**":
+            self.consume("OPERATOR", "**")
+            right = self.parse_unary()
+            node = {"type": "BinaryExpression", "operator": "**", "left": node, "right": right}
+        return node
+
+    def parse_unary(self):
+        if self.current_token and self.current_token[0] == "OPERATOR" and self.current_token[1] in ("+", "-", "not"):
+            op = self.current_token[1]
+            self.consume("OPERATOR")
+            right = self.parse_unary()
+            return {"type": "UnaryExpression", "operator": op, "right": right}
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token_type, token_value = self.current_token
+
+        if token_type == "NUMBER":
+            return self.parse_number()
+        elif token_type == "STRING":
+            return self.parse_string()
+        elif token_type == "IDENTIFIER":
+            node = self.parse_identifier()
+            # Handle function call
+            while self.current_token and self.current_token[0] == "SEPARATOR" and self.current_token[1] == "(":
+                self.consume("SEPARATOR", "(")
+                args = []
+                if self.current_token[0] != "SEPARATOR" or self.current_token[1] != ")":
+                    args.append(self.parse_expression())
+                    while self.current_token[0] == "SEPARATOR" and self.current_token[1] == ",":
+                        self.consume("SEPARATOR", ",")
+                        args.append(self.parse_expression())
+                self.consume("SEPARATOR", ")")
+                node = {"type": "FunctionCall", "callee": node, "arguments": args}
+            return node
+        elif token_type == "KEYWORD" and token_value in ("True", "False", "None"):
+            return self.parse_boolean_or_none()
+        elif token_type == "SEPARATOR" and token_value == "(":
+            self.consume("SEPARATOR", "(")
+            expr = self.parse_expression()
+            self.consume("SEPARATOR", ")")
+            return expr
+        else:
+            self.error(f"Invalid primary expression: {self.current_token}")
+
+    def parse_number(self):
+        num = self.current_token[1]
+        self.consume("NUMBER")
+        return {"type": "Number", "value": num}
+
+    def parse_string(self):
+        value = self.current_token[1]
+        self.consume("STRING")
+        return {"type": "String", "value": value}
+
+    def parse_identifier(self):
+        name = self.current_token[1]
+        self.consume("IDENTIFIER")
+        return {"type": "Identifier", "name": name}
+
+    def parse_boolean_or_none(self):
+        value = self.current_token[1]
+        self.consume("KEYWORD")
+        return {"type": "Boolean" if value in ("True", "False") else "None", "value": value}
+
+# Main execution
+if __name__ == "__main__":
+    tokens = read_tokens_from_json("tokens.json")
+    print(f"Tokens read from tokens.json: {tokens}")
+
+    parser = Parser(tokens)
+    ast = parser.parse()
+
+    print("Abstract Syntax Tree (AST):")
+    print(json.dumps(ast, indent=2))  # Pretty print the AST
+    with open("ast.json","w")as f:
+        json.dump(ast,f,indent=2)
+    print("ast written to ast.json")
+    
@@ -0,0 +1,115 @@
+import json
+import os
+
+from lexer import Lexer, write_token_stream
+from parser import Parser
+from token_buffer import TokenBuffer
+from render_profiles import RENDER_PROFILES, Renders
+from ast_metrics import compute_metrics
+from ast_utils import get_entities_from_tokens
+from binary_format import write_ast, write_occurrences, write_tokens
+
+TOKENS_FILENAME = "tokens.json"
+TOKENS_BIN_FILENAME = "tokens.bin"
+SYMBOLS_FILENAME = "symbols.txt"
+AST_FILENAME = "ast.json"
+AST_BIN_FILENAME = "ast.bin"
+OCCURRENCES_FILENAME = "occurrences.bin"
+METRICS_FILENAME = "metrics.json"
+IMAGE_FILENAME = RENDER_PROFILES["png"][1]
+SVG_FILENAME = RENDER_PROFILES["svg"][1]
+# The render profile each backend makes while the pipeline runs; the others
+# are rendered later, when asked for
+IMAGE_PROFILES = {"graphviz": "dot", "svg": "svg"}
+
+# Part of every ResultCache key; bump it when the same source would now give
+# different tokens, AST, entities or image
+PIPELINE_VERSION = "4"
+
+
+class PipelineResult:
+    """Artifacts of one lexer -> parser -> visualizer run, kept in memory."""
+
+    def __init__(self, tokens, ast, entities, image=None, symbol_table=None, occurrences=None, metrics=None,
+                 image_filename=IMAGE_FILENAME, renders=None):
+        self.tokens = tokens
+        self.ast = ast
+        self.entities = entities
+        self.image = image
+        self.symbol_table = symbol_table or {}
+        self.occurrences = occurrences
+        self.metrics = metrics
+        self.image_filename = image_filename
+        # Renders of the AST; image is the one made during the run
+        self.renders = renders
+
+    def save(self, directory, json_export=True):
+        # Binary token/AST files are always written; json_export also writes the
+        # tokens.json / ast.json files the lexer.py and parser.py scripts produce
+        write_tokens(os.path.join(directory, TOKENS_BIN_FILENAME), self.tokens)
+        write_ast(os.path.join(directory, AST_BIN_FILENAME), self.ast)
+        if self.occurrences is not None:
+            write_occurrences(os.path.join(directory, OCCURRENCES_FILENAME), self.occurrences)
+        if self.metrics is not None:
+            with open(os.path.join(directory, METRICS_FILENAME), "w") as f:
+                json.dump(self.metrics.to_dict(), f, indent=2)
+        if json_export:
+            with open(os.path.join(directory, TOKENS_FILENAME), "w") as f:
+                write_token_stream(self.tokens, f)
+            with open(os.path.join(directory, AST_FILENAME), "w") as f:
+                json.dump(self.ast, f, indent=2)
+        with open(os.path.join(directory, SYMBOLS_FILENAME), "w") as f:
+            for symbol, token_type in self.symbol_table.items():
+                f.write(f"{token_type}, {symbol}\n")
+        if self.renders is not None:
+            self.renders.save(directory)
+        elif self.image is not None:
+            with open(os.path.join(directory, self.image_filename), "wb") as f:
+                f.write(self.image)
+
+
+class Pipeline:
+    """Runs Lexer, Parser and the AST renderer in-process, without temp files.
+
+    Only the cheap render profile of the backend is made during run():
+    the DOT text for "graphviz", the built-in tidy tree layout for "svg".
+    PNGs are rendered from result.renders when something asks for them.
+    Setting max_nodes or max_depth draws level-of-detail images instead,
+    with what lies beyond them collapsed into summary nodes.
+    """
+
+    def __init__(self, render=True, engine="regex", backend="graphviz", max_nodes=None, max_depth=None):
+        if backend not in IMAGE_PROFILES:
+            raise ValueError(f"Unknown render backend: {backend}")
+        self.render = render
+        self.engine = engine
+        self.backend = backend
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+
+    def run(self, source_text):
+        lexer = Lexer(source_code=source_text, engine=self.engine, index_occurrences=True)
+        tokens = TokenBuffer.from_lexer(lexer)
+        ast = Parser(tokens, verbose=False).parse()
+        entities = get_entities_from_tokens(tokens)
+        metrics = compute_metrics(ast)
+        profile = IMAGE_PROFILES[self.backend]
+        renders = Renders(ast, self.max_nodes, self.max_depth) if self.render else None
+        image = renders.get(profile) if self.render else None
+        return PipelineResult(tokens, ast, entities, image, lexer.symbol_table, lexer.occurrence_index, metrics,
+                              RENDER_PROFILES[profile][1], renders)
+
+    def run_file(self, filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            return self.run(f.read())
+
+    def iter_statements(self, source):
+        # Lex and parse in lockstep: source may be text, an open file or any
+        # iterable of lines, and each top-level statement is yielded as soon
+        # as it is parsed, before the rest of the source has been read
+        lexer = Lexer(source_code=source, engine=self.engine)
+        return Parser(lexer.iter_tokens(), verbose=False).iter_statements()
+
+    def iter_file_statements(self, filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            yield from self.iter_statements(f)
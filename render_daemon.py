@@ -0,0 +1,225 @@
+import os
+import queue
+import select
+import struct
+import subprocess
+import threading
+from concurrent.futures import Future
+
+from graphviz import ExecutableNotFound
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Most graphs one dot process is fed in one go
+DEFAULT_BATCH_SIZE = 16
+# Most graphs waiting for a worker; submit() blocks once the queue is full
+DEFAULT_QUEUE_SIZE = 64
+# A worker that sends nothing for this long is killed and its batch failed
+DEFAULT_TIMEOUT = 60.0
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+SVG_END = b"</svg>\n"
+
+# dot may wait for the first token of the next graph before it renders the
+# last one it read; each batch ends with this empty graph so every real graph
+# in it is rendered without waiting for the next batch
+SENTINEL = b"digraph{}\n"
+
+
+def png_end(buffer, start):
+    # End of the PNG starting at start, walking its chunks up to IEND, or -1
+    # if buffer does not hold all of it yet
+    position = start + len(PNG_SIGNATURE)
+    while position + 8 <= len(buffer):
+        length, chunk_type = struct.unpack_from(">I4s", buffer, position)
+        position += 12 + length
+        if chunk_type == b"IEND":
+            return position if position <= len(buffer) else -1
+    return -1
+
+
+def svg_end(buffer, start):
+    # Labels are XML-escaped, so "</svg>" only ends the document
+    end = buffer.find(SVG_END, start)
+    return -1 if end < 0 else end + len(SVG_END)
+
+
+# Output formats a worker can split into one image per graph
+OUTPUT_ENDS = {
+    "png": png_end,
+    "svg": svg_end,
+}
+
+
+class DotWorker:
+    """One long-lived dot process rendering graphs to one output format.
+
+    render_batch() writes a batch of DOT sources to the process's stdin and
+    reads one image per source back from its stdout, split by format. Not
+    thread-safe; a DotRenderService gives each of its threads a worker.
+    """
+
+    def __init__(self, format="png", timeout=DEFAULT_TIMEOUT):
+        if format not in OUTPUT_ENDS:
+            raise ValueError(f"Unsupported output format: {format}")
+        self.format = format
+        self.timeout = timeout
+        self.output_end = OUTPUT_ENDS[format]
+        command = ["dot", f"-T{format}"]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL)
+        except FileNotFoundError as e:
+            raise ExecutableNotFound(command) from e
+        self.buffer = bytearray()
+        # Outputs of earlier sentinels still to be skipped
+        self.sentinels = 0
+
+    def render_batch(self, sources):
+        data = b"".join(source.encode("utf-8") for source in sources) + SENTINEL
+        # Written from another thread, so dot never blocks on a full stdout
+        # pipe while this one blocks on a full stdin pipe
+        errors = []
+        writer = threading.Thread(target=self.write, args=(data, errors), daemon=True)
+        writer.start()
+        for _ in range(self.sentinels):
+            self.read_image()
+        self.sentinels = 1
+        images = [self.read_image() for _ in sources]
+        writer.join()
+        if errors:
+            raise errors[0]
+        return images
+
+    def write(self, data, errors):
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        except OSError as e:
+            errors.append(e)
+
+    def read_image(self):
+        fd = self.process.stdout.fileno()
+        while True:
+            end = self.output_end(self.buffer, 0) if self.buffer else -1
+            if end >= 0:
+                image = bytes(self.buffer[:end])
+                del self.buffer[:end]
+                return image
+            if not select.select([fd], [], [], self.timeout)[0]:
+                raise RuntimeError(f"dot sent no output for {self.timeout} s")
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                raise RuntimeError(f"dot exited with status {self.process.wait()}")
+            self.buffer += chunk
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            # Unwritten input of a failed batch
+            pass
+        self.process.stdout.close()
+
+
+class DotRenderService:
+    """Pool of persistent dot processes rendering DOT sources to images.
+
+    submit() queues a source and returns a Future of its image; once
+    max_queue sources are waiting it blocks until a worker catches up. Each
+    of the worker threads takes up to batch_size waiting sources at a time
+    and renders them in one go through its own dot process, started on first
+    use and restarted after a failure; a source dot cannot render fails
+    every source of its batch. Safe to share between threads; close()
+    (or leaving a with block) stops the threads and processes.
+    """
+
+    def __init__(self, format="png", workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE,
+                 max_queue=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_TIMEOUT):
+        if format not in OUTPUT_ENDS:
+            raise ValueError(f"Unsupported output format: {format}")
+        self.format = format
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.graphs = 0
+        self.batches = 0
+        self.processes = 0
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self.work, name=f"dot-{i}", daemon=True) for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, source):
+        future = Future()
+        self.queue.put((source, future))
+        return future
+
+    def render(self, source):
+        return self.submit(source).result()
+
+    def render_many(self, sources):
+        # Images in the order of sources
+        futures = [self.submit(source) for source in sources]
+        return [future.result() for future in futures]
+
+    def work(self):
+        worker = None
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    # Put back for this thread's next get, after the batch
+                    self.queue.put(None)
+                    break
+                batch.append(job)
+            try:
+                if worker is None:
+                    worker = DotWorker(self.format, self.timeout)
+                    with self.lock:
+                        self.processes += 1
+                images = worker.render_batch([source for source, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                if worker is not None:
+                    worker.close()
+                    worker = None
+                continue
+            for (_, future), image in zip(batch, images):
+                future.set_result(image)
+            with self.lock:
+                self.graphs += len(batch)
+                self.batches += 1
+        if worker is not None:
+            worker.close()
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "graphs": self.graphs,
+                "batches": self.batches,
+                "processes": self.processes,
+                "queued": self.queue.qsize(),
+            }
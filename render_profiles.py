@@ -0,0 +1,131 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ast_visualizer import build_graph, display_graph, display_svg, display_tree, summary_tree
+from render_daemon import DotRenderService
+
+THUMBNAIL_DPI = "48"
+
+# Background renders of every Renders in the process
+render_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="render")
+# PNG renders go to persistent dot processes instead of one process each
+dot_service = DotRenderService("png", workers=2)
+
+
+def render_dot(renders):
+    return renders.graph().source.encode("utf-8")
+
+
+def render_thumbnail(renders):
+    return dot_service.render(renders.graph(THUMBNAIL_DPI).source)
+
+
+def render_png(renders):
+    return dot_service.render(renders.graph().source)
+
+
+def render_svg(renders):
+    return display_svg(*renders.display_lists())
+
+
+# Render profiles by name: how to make the image, the file it is saved as and
+# its media type. Cheapest first.
+RENDER_PROFILES = {
+    "dot": (render_dot, "ast_output.dot", "text/vnd.graphviz"),
+    "svg": (render_svg, "ast_output.svg", "image/svg+xml"),
+    "thumbnail": (render_thumbnail, "ast_thumbnail.png", "image/png"),
+    "png": (render_png, "ast_output.png", "image/png"),
+}
+
+
+class Renders:
+    """Images of one AST, one per render profile, each made at most once.
+
+    get() returns a profile's image, rendering it in the calling thread if
+    nobody has asked for it yet; request() starts the render in the
+    background instead and returns a Future. Both wait for a render that is
+    already running. With max_nodes or max_depth set, every profile draws the
+    level-of-detail tree (see summary_tree). Pickles with the finished images
+    only.
+    """
+
+    def __init__(self, ast, max_nodes=None, max_depth=None):
+        self.ast = ast
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.images = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"ast": self.ast, "max_nodes": self.max_nodes, "max_depth": self.max_depth, "images": dict(self.images)}
+
+    def __setstate__(self, state):
+        self.__init__(state["ast"], state["max_nodes"], state["max_depth"])
+        self.images.update(state["images"])
+
+    def display_lists(self):
+        if self.max_nodes is None and self.max_depth is None:
+            return display_tree(self.ast) + ({},)
+        return summary_tree(self.ast, self.max_depth, self.max_nodes)
+
+    def graph(self, dpi="300"):
+        if self.max_nodes is None and self.max_depth is None:
+            return build_graph(self.ast, dpi)
+        labels, types, parents, expansions = self.display_lists()
+        return display_graph(labels, types, parents, expansions, dpi)
+
+    def ready(self, profile):
+        return profile in self.images
+
+    def get(self, profile):
+        return self.start(profile, background=False).result()
+
+    def request(self, profile):
+        return self.start(profile, background=True)
+
+    def start(self, profile, background):
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {profile}")
+        with self.lock:
+            if profile in self.images:
+                future = Future()
+                future.set_result(self.images[profile])
+                return future
+            if profile in self.pending:
+                return self.pending[profile]
+            if background:
+                future = self.pending[profile] = render_executor.submit(self.render, profile)
+                return future
+            future = self.pending[profile] = Future()
+        # Rendered here; other threads asking meanwhile wait on the future
+        try:
+            future.set_result(self.render(profile))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def render(self, profile):
+        try:
+            image = RENDER_PROFILES[profile][0](self)
+        except Exception:
+            with self.lock:
+                self.pending.pop(profile, None)
+            raise
+        with self.lock:
+            self.images[profile] = image
+            self.pending.pop(profile, None)
+        return image
+
+    def save(self, directory):
+        # Files of finished profiles are written, the others' removed, so no
+        # image of an older AST is left behind
+        for profile, (_, filename, _) in RENDER_PROFILES.items():
+            path = os.path.join(directory, filename)
+            image = self.images.get(profile)
+            if image is not None:
+                with open(path, "wb") as f:
+                    f.write(image)
+            elif os.path.exists(path):
+                os.remove(path)
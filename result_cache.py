@@ -0,0 +1,130 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from pipeline import PIPELINE_VERSION
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".result"
+
+
+class ResultCache:
+    """On-disk cache of PipelineResults keyed by a hash of the source text.
+
+    Each entry is one pickled file named after the key. Files are written to
+    a temporary name and renamed into place, so several processes (e.g.
+    Hypercorn workers) can share the directory: readers see a whole entry or
+    none, and an entry that disappears under a reader is just a miss. An
+    entry's mtime is its last use; once the directory holds more than
+    max_bytes, the least recently used entries are removed. Hit and miss
+    counters are per process and safe to update from several threads.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, version=PIPELINE_VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source_text, variant=""):
+        # variant separates results of differently configured pipelines
+        digest = hashlib.sha256(f"{self.version}\0{variant}\0".encode("utf-8"))
+        digest.update(source_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, source_text, variant=""):
+        path = self.path(self.key(source_text, variant))
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            result = None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Unreadable entry, e.g. written by an older version of a class
+            self.discard(path)
+            result = None
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def put(self, source_text, result, variant=""):
+        path = self.path(self.key(source_text, variant))
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def variant(self, pipeline):
+        return (f"{pipeline.engine}:{int(pipeline.render)}:{pipeline.backend}:"
+                f"{pipeline.max_nodes}:{pipeline.max_depth}")
+
+    def run(self, pipeline, source_text):
+        # pipeline.run(source_text), unless the same source already went
+        # through an identically configured pipeline
+        variant = self.variant(pipeline)
+        result = self.get(source_text, variant)
+        if result is None:
+            result = pipeline.run(source_text)
+            self.put(source_text, result, variant)
+        return result
+
+    def entries(self):
+        # (mtime, size, path) of every entry, least recently used first
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.discard(path)
+
+    def stats(self):
+        entries = self.entries()
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
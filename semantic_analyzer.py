@@ -1,47 +1,174 @@
-class SemanticAnalyzer:
-    def __init__(self, ast):
-        self.ast = ast
-        self.symbol_table_stack = [set()]  # Stack for scopes
-        self.errors = []
-
-    def analyze(self):
-        self.visit(self.ast)
-        return self.errors
-
-    def current_scope(self):
-        return self.symbol_table_stack[-1]
-
-    def declare(self, var):
-        scope = self.current_scope()
-        if var in scope:
-            self.errors.append(f"Duplicate declaration: {var}")
-        scope.add(var)
-
-    def is_declared(self, var):
-        return any(var in scope for scope in reversed(self.symbol_table_stack))
-
-    def visit(self, node):
-        if isinstance(node, dict):
-            node_type = node.get("type")
-            if node_type == "Assignment":
-                var = node["name"]
-                self.declare(var)
-                self.visit(node["value"])
-            elif node_type == "Identifier":
-                if not self.is_declared(node["name"]):
-                    self.errors.append(f"Undeclared variable: {node['name']}")
-            elif node_type == "BinaryExpression":
-                self.visit(node["left"])
-                self.visit(node["right"])
-            elif node_type == "Block":
-                self.symbol_table_stack.append(set())
-                for stmt in node.get("body", []):
-                    self.visit(stmt)
-                self.symbol_table_stack.pop()
-            elif node_type == "Program":
-                for stmt in node.get("body", []):
-                    self.visit(stmt)
-            # Extend here for more node types (e.g., FunctionDeclaration)
-        elif isinstance(node, list):
-            for item in node:
-                self.visit(item)
\ No newline at end of file
+import builtins
+
+from ast_walker import walk
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+# Node types the resolver needs to see again once their children are done
+SCOPE_EXITS = frozenset({"Assignment", "FunctionDefinition", "ForStatement"})
+
+
+class Declaration:
+    """One binding of a name: a variable, parameter, function or loop variable."""
+
+    __slots__ = ("name", "kind", "node", "scope", "references")
+
+    def __init__(self, name, kind, node, scope):
+        self.name = name
+        self.kind = kind
+        # The statement that declares the name (None for builtins)
+        self.node = node
+        self.scope = scope
+        self.references = []
+
+    def __repr__(self):
+        return f"Declaration({self.name!r}, {self.kind!r})"
+
+
+class Scope:
+    __slots__ = ("kind", "parent", "function", "names")
+
+    def __init__(self, kind, parent=None):
+        self.kind = kind
+        self.parent = parent
+        # Assignments bind in the enclosing function (or module) scope, as in
+        # Python; loop scopes only hold their loop variable
+        self.function = self if kind != "loop" or parent is None else parent.function
+        self.names = {}
+
+
+class Resolver:
+    """Resolves every Identifier node of an AST to its Declaration in one walk.
+
+    Instead of searching a stack of scopes, the resolver keeps one dict from
+    each name to the stack of its visible declarations, innermost last, so a
+    lookup is a dict hit however deep the nesting is. Leaving a scope pops
+    the names it declared. Names a function body reads before the module
+    defines them (e.g. calls to functions defined further down) are looked
+    up in the module scope once the whole program has been seen.
+    """
+
+    def __init__(self, ast):
+        self.ast = ast
+        self.errors = []
+        self.declarations = []
+        # id(Identifier node) -> Declaration; the AST keeps the nodes alive
+        self.bindings = {}
+        self.visible = {}
+        self.module = Scope("module")
+        self.scope = self.module
+        self.builtins = {}
+        self.pending = []
+        # id(first body statement) -> ForStatement whose loop scope opens there
+        self.loop_bodies = {}
+
+    def analyze(self):
+        self.resolve()
+        return self.errors
+
+    def resolve(self):
+        walk(self.ast, self.enter, self.exit, SCOPE_EXITS)
+        return self.finish()
+
+    def finish(self):
+        # Settles the reads left pending by the walk; callers that drive
+        # enter() and exit() from their own walk call this at the end
+        for node in self.pending:
+            declaration = self.module.names.get(node["name"]) or self.builtin(node["name"])
+            if declaration is None:
+                self.errors.append(f"Undeclared variable: {node['name']}")
+            else:
+                self.bind(node, declaration)
+        self.pending = []
+        return self.bindings
+
+    def enter(self, node, parent):
+        node_type = node.get("type")
+        if node_type == "Identifier":
+            self.reference(node)
+            return
+        if self.loop_bodies and id(node) in self.loop_bodies:
+            # First statement of a for loop's body: the iterable is done, so
+            # the loop variable comes into scope now
+            loop = self.loop_bodies.pop(id(node))
+            scope = self.enter_scope("loop")
+            self.declare(loop["variable"], "loop_variable", loop, scope)
+        if node_type == "FunctionDefinition":
+            # Declared before its body is visited, so it can call itself
+            self.assign(node["name"], node, "function")
+            scope = self.enter_scope("function")
+            for parameter in node["parameters"]:
+                self.declare(parameter, "parameter", node, scope)
+        elif node_type == "ForStatement" and node["body"]:
+            self.loop_bodies[id(node["body"][0])] = node
+
+    def exit(self, node, parent):
+        node_type = node.get("type")
+        if node_type == "Assignment":
+            # After the value, so x = x + 1 reads the previous x
+            self.assign(node["name"], node, "variable")
+        elif node_type == "FunctionDefinition" or node["body"]:
+            self.exit_scope(self.scope)
+
+    def assign(self, name, node, kind):
+        declaration = self.lookup(name)
+        # Rebinding a name of the same function; otherwise, as in Python,
+        # assigning makes a new local that shadows any outer one
+        if declaration is None or declaration.scope.function is not self.scope.function:
+            self.declare(name, kind, node, self.scope.function)
+
+    def enter_scope(self, kind):
+        self.scope = Scope(kind, self.scope)
+        return self.scope
+
+    def exit_scope(self, scope):
+        for name in scope.names:
+            self.visible[name].pop()
+        self.scope = scope.parent
+
+    def declare(self, name, kind, node, scope):
+        if name in scope.names:
+            if kind == "parameter":
+                self.errors.append(f"Duplicate parameter: {name}")
+            return scope.names[name]
+        declaration = Declaration(name, kind, node, scope)
+        scope.names[name] = declaration
+        self.visible.setdefault(name, []).append(declaration)
+        self.declarations.append(declaration)
+        return declaration
+
+    def lookup(self, name):
+        declarations = self.visible.get(name)
+        return declarations[-1] if declarations else None
+
+    def builtin(self, name):
+        if name not in BUILTIN_NAMES:
+            return None
+        declaration = self.builtins.get(name)
+        if declaration is None:
+            declaration = self.builtins[name] = Declaration(name, "builtin", None, None)
+        return declaration
+
+    def reference(self, node):
+        declaration = self.lookup(node["name"])
+        if declaration is None and self.scope.function is not self.module:
+            # Possibly a module-level name defined later on; settled at the end
+            self.pending.append(node)
+            return
+        if declaration is None:
+            declaration = self.builtin(node["name"])
+        if declaration is None:
+            self.errors.append(f"Undeclared variable: {node['name']}")
+            return
+        self.bind(node, declaration)
+
+    def bind(self, node, declaration):
+        self.bindings[id(node)] = declaration
+        declaration.references.append(node)
+
+    def declaration(self, node):
+        # Declaration an Identifier node resolved to, or None if it did not resolve
+        return self.bindings.get(id(node))
+
+
+# Kept for callers of the old analyzer; Resolver.analyze() returns the errors
+SemanticAnalyzer = Resolver
@@ -0,0 +1,40 @@
+import unittest
+from ast_arena import NodeArena
+from bench_utils import generate_source, history_sources
+from lexer import Lexer
+from parser import Parser
+
+class TestNodeArena(unittest.TestCase):
+
+    def parse(self, source):
+        return Parser(Lexer(source_code=source).tokenize(), verbose=False)
+
+    def test_round_trip(self):
+        for source in history_sources() + [generate_source(5)]:
+            ast = self.parse(source).parse()
+            arena = NodeArena.from_dict(ast)
+            self.assertEqual(arena.to_dict(), ast)
+            self.assertEqual(self.parse(source).parse_arena().to_dict(), ast)
+
+    def test_views(self):
+        source = "if (a > 1):\n    x = f(a, -b)\nelif (a):\n    y = 2\nelse:\n    y = 3\n"
+        arena = self.parse(source).parse_arena()
+        statement = arena.root()["body"][0]
+        self.assertEqual(statement.type, "IfStatement")
+        self.assertEqual(statement["condition"]["operator"], ">")
+        self.assertEqual(statement["body"][0]["value"]["callee"], {"type": "Identifier", "name": "f"})
+        self.assertEqual(list(statement["elif_blocks"][0]), ["condition", "body"])
+        self.assertEqual(statement["else_block"][0].to_dict(), {"type": "Assignment", "name": "y", "value": {"type": "Number", "value": "3"}})
+        self.assertIsNone(statement.get("missing"))
+        self.assertEqual([child.type for child in statement.children()], ["BinaryExpression", "Assignment", None, "Assignment"])
+
+    def test_pre_order_subtrees(self):
+        arena = NodeArena.from_dict(self.parse(generate_source(3)).parse())
+        for index in arena.walk():
+            for child in arena.children(index):
+                self.assertTrue(index < child < arena.ends[index])
+                self.assertLessEqual(arena.ends[child], arena.ends[index])
+        self.assertEqual(arena.type_counts()["FunctionDefinition"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
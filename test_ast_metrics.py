@@ -0,0 +1,52 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from ast_metrics import compute_metrics
+from ast_walker import children, count_nodes, iter_preorder
+from bench_utils import generate_source
+from pipeline import METRICS_FILENAME, Pipeline
+from semantic_analyzer import Resolver
+
+def max_depth(node, depth=1):
+    # Typed nodes only, like compute_metrics
+    nested = [max_depth(child, depth + ("type" in child)) for child in children(node)]
+    return max(nested, default=depth)
+
+class TestASTMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.result = Pipeline(render=False).run(generate_source(4) + "y = -(x + 1)\n")
+        self.ast = self.result.ast
+
+    def test_matches_separate_passes(self):
+        metrics = compute_metrics(self.ast)
+        self.assertEqual(metrics.node_count, count_nodes(self.ast))
+        typed = [node["type"] for node in iter_preorder(self.ast) if "type" in node]
+        self.assertEqual(metrics.type_counts, Counter(typed))
+        self.assertEqual(metrics.max_depth, max_depth(self.ast))
+        self.assertEqual(sum(metrics.fanout.values()), metrics.node_count)
+        self.assertEqual(sum(children * count for children, count in metrics.fanout.items()), metrics.node_count - 1)
+        self.assertEqual(metrics.diagnostics, Resolver(self.ast).analyze())
+        self.assertEqual(metrics.diagnostics, ["Undeclared variable: x"])
+        entities = self.result.entities
+        self.assertEqual(set(metrics.defined_functions), set(entities["defined_functions"]))
+        self.assertEqual(set(metrics.called_functions), set(entities["called_functions"]))
+        self.assertEqual(metrics.operators["="], 4 * 3 + 2)
+        self.assertEqual(metrics.variables["total"], 4)
+
+    def test_saved_with_result(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.result.save(directory)
+            with open(os.path.join(directory, METRICS_FILENAME)) as f:
+                saved = json.load(f)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(saved, json.loads(json.dumps(compute_metrics(self.ast).to_dict())))
+        self.assertEqual(saved["node_count"], self.result.metrics.node_count)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from ast_utils import get_entities_from_tokens
+from lexer import Lexer
+from token_buffer import TokenBuffer
+
+class TestEntities(unittest.TestCase):
+
+    def setUp(self):
+        self.source = (
+            "def add(a, b):\n"
+            "    return a + b\n"
+            "x = add(1, 2)\n"
+            "y = add(x, 3) + add(x, x)\n"
+            "z = add\n"
+            "w = len(y)\n"
+        )
+
+    def test_counts_and_lines(self):
+        entities = get_entities_from_tokens(TokenBuffer.from_source(self.source))
+        self.assertEqual(entities["operators"], ["+", "="])
+        self.assertEqual(entities["functions"], ["add", "len"])
+        self.assertEqual(entities["operator_usage"]["+"], {"count": 2, "lines": [2, 4]})
+        self.assertEqual(entities["operator_usage"]["="], {"count": 4, "lines": [3, 4, 5, 6]})
+        self.assertEqual(entities["defined_functions"], {"add": {"count": 1, "lines": [1]}})
+        self.assertEqual(entities["called_functions"], {
+            "add": {"count": 3, "lines": [3, 4]},
+            "len": {"count": 1, "lines": [6]},
+        })
+
+    def test_repeated_identifiers(self):
+        # A name used as a plain identifier before its first call is still a function
+        tokens = Lexer(source_code="f = 1\nx = f(f)\n").tokenize()
+        entities = get_entities_from_tokens(tokens)
+        self.assertEqual(entities["functions"], ["f"])
+        self.assertEqual(entities["called_functions"], {"f": {"count": 1, "lines": []}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from ast_visualizer import (add_display_nodes, add_nodes_edges, build_graph, display_svg, display_tree, fragment_cache,
+                            new_graph, parse_path, render_ast_svg, render_subtree, summary_tree, visualize_ast)
+from bench_utils import generate_source, history_sources
+from pipeline import Pipeline
+
+class TestLevelOfDetail(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = Pipeline(render=False).run(generate_source(6)).ast
+        self.full = display_tree(self.ast)
+
+    def test_unlimited_matches_display_tree(self):
+        labels, types, parents, expansions = summary_tree(self.ast, max_nodes=None)
+        self.assertEqual((labels, types, parents), self.full)
+        self.assertEqual(expansions, {})
+
+    def test_budget_and_depth(self):
+        labels, types, parents, expansions = summary_tree(self.ast, max_nodes=25)
+        self.assertEqual(len(types) - types.count("Collapsed"), 25)
+        self.assertEqual(sorted(expansions), [i for i, node_type in enumerate(types) if node_type == "Collapsed"])
+        labels, types, parents, expansions = summary_tree(self.ast, max_depth=1)
+        self.assertEqual(types.count("FunctionDefinition"), 6)
+        self.assertEqual(len(expansions), 8)
+        self.assertTrue(all(parents[i] > 0 for i in expansions))
+
+    def test_expanding_every_collapsed_node_draws_the_whole_tree(self):
+        pending = [((), 0)]
+        renders = drawn = 0
+        while pending:
+            path, start = pending.pop()
+            labels, types, parents, expansions = summary_tree(self.ast, max_nodes=7, path=path, start=start)
+            real = len(types) - len(expansions)
+            self.assertLessEqual(real, 7)
+            # The expanded node itself was drawn before
+            drawn += real - (renders > 0)
+            renders += 1
+            for index in expansions:
+                hidden = int(labels[index].split("\n")[1].split()[0])
+                path, start = expansions[index]
+                below = summary_tree(self.ast, max_nodes=None, path=path, start=start)[2]
+                self.assertEqual(below.count(0), hidden)
+                pending.append(expansions[index])
+        self.assertEqual(drawn, len(self.full[0]))
+
+    def test_paths(self):
+        self.assertEqual(parse_path("0.3.1"), (0, 3, 1))
+        self.assertEqual(parse_path(""), ())
+        with self.assertRaises(ValueError):
+            parse_path("0.x")
+        with self.assertRaises(ValueError):
+            summary_tree(self.ast, path=(99,))
+        for max_nodes in (0, -3):
+            with self.assertRaises(ValueError):
+                summary_tree(self.ast, max_nodes=max_nodes)
+        self.assertEqual(summary_tree(self.ast, max_nodes=1)[0][0], "Program")
+        # A for loop's variable is its first drawn child
+        labels = summary_tree(self.ast, path=(0, 2, 0))[0]
+        self.assertEqual(labels, ["Identifier\ni"])
+
+    def test_collapsed_nodes_carry_expansion(self):
+        labels, types, parents, expansions = summary_tree(self.ast, max_depth=1)
+        svg = display_svg(labels, types, parents, expansions).decode()
+        self.assertEqual(svg.count('class="collapsed"'), len(expansions))
+        self.assertIn('data-path="0" data-start="0"', svg)
+        dot = new_graph()
+        add_display_nodes(dot, labels, types, parents, expansions=expansions)
+        self.assertIn('id="collapsed:0:0"', dot.source)
+
+class TestParallelRenders(unittest.TestCase):
+
+    def setUp(self):
+        sources = [generate_source(n) for n in (0, 1, 5, 20)] + history_sources()
+        self.asts = [Pipeline(render=False).run(source).ast for source in sources]
+
+    def renders(self, ast):
+        return (build_graph(ast).source, render_ast_svg(ast), render_subtree(ast, backend="svg", max_nodes=30))
+
+    def test_node_numbering_is_per_call(self):
+        ast = self.asts[1]
+        dot = new_graph()
+        count = len(display_tree(ast)[0])
+        self.assertEqual(add_nodes_edges(ast, dot), count)
+        self.assertEqual(add_nodes_edges(ast, dot, "0", count), 2 * count)
+        self.assertEqual(build_graph(ast).source, build_graph(ast).source)
+
+    def test_parallel_renders_are_deterministic(self):
+        expected = [self.renders(ast) for ast in self.asts]
+        jobs = list(range(len(self.asts))) * 6
+        random.Random(0).shuffle(jobs)
+        fragment_cache.clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda job: self.renders(self.asts[job]), jobs))
+        for job, result in zip(jobs, results):
+            self.assertEqual(result, expected[job])
+
+    def test_visualize_ast_to_chosen_paths(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(directory, f"tree_{i}.svg") for i in range(len(self.asts))]
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                written = list(pool.map(lambda i: visualize_ast(self.asts[i], paths[i], backend="svg"), range(len(paths))))
+            self.assertEqual(written, paths)
+            self.assertEqual(sorted(os.listdir(directory)), sorted(os.path.basename(path) for path in paths))
+            for ast, path in zip(self.asts, paths):
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), visualize_ast(ast, backend="svg"))
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from ast_visualizer import build_graph
+from ast_walker import children, count_nodes, iter_postorder, iter_preorder, walk
+from bench_utils import generate_source
+from pipeline import Pipeline
+
+class TestASTWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = Pipeline(render=False).run(
+            "if (x):\n    y = -x\nelif (y):\n    print(y, f(1))\nelse:\n    y += 2\n"
+        ).ast
+
+    def test_orders(self):
+        types = [node.get("type") for node in iter_preorder(self.ast)]
+        self.assertEqual(types, [
+            "Program", "IfStatement", "Identifier", "Assignment", "UnaryExpression", "Identifier",
+            None, "Identifier", "PrintStatement", "Identifier", "FunctionCall", "Identifier", "Number",
+            "AugmentedAssignment", "Identifier", "Number",
+        ])
+        post = [node.get("type") for node in iter_postorder(self.ast)]
+        self.assertEqual(post[:3], ["Identifier", "Identifier", "UnaryExpression"])
+        self.assertEqual(post[-2:], ["IfStatement", "Program"])
+        self.assertEqual(count_nodes(self.ast), len(types) - 1)
+
+    def test_enter_and_exit(self):
+        events = []
+        def enter(node, parent):
+            events.append(("enter", node.get("type")))
+            return node.get("type") != "PrintStatement"
+        def exit(node, parent):
+            events.append(("exit", node.get("type"), parent is None))
+        walk(self.ast, enter, exit, exit_types={"IfStatement", "Program"})
+        self.assertIn(("enter", "PrintStatement"), events)
+        self.assertNotIn(("enter", "FunctionCall"), events)
+        self.assertEqual(events[-2:], [("exit", "IfStatement", False), ("exit", "Program", True)])
+
+    def test_unknown_types_and_deep_nesting(self):
+        node = {"type": "Tuple", "items": [{"type": "Number", "value": "1"}, "x"], "kind": "tuple"}
+        self.assertEqual(children(node), [{"type": "Number", "value": "1"}])
+        deep = {"type": "Number", "value": "1"}
+        for _ in range(100000):
+            deep = {"type": "UnaryExpression", "operator": "-", "right": deep}
+        self.assertEqual(count_nodes(deep), 100001)
+        self.assertEqual(next(iter_postorder(deep))["type"], "Number")
+
+    def test_visualizer_draws_every_node(self):
+        ast = Pipeline(render=False).run(generate_source(3)).ast
+        source = build_graph(ast).source
+        loops = sum(1 for node in iter_preorder(ast) if node.get("type") == "ForStatement")
+        self.assertEqual(source.count("[label="), count_nodes(ast) + loops)
+        self.assertEqual(source.count(" -> "), count_nodes(ast) + loops - 1)
+
+if __name__ == '__main__':
+    unittest.main()
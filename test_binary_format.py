@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ast_utils import get_entities_from_token_file
+from bench_utils import generate_source
+from binary_format import ASTFile, OccurrenceFile, TokenFile, write_ast, write_occurrences, write_tokens
+from pipeline import Pipeline
+
+class TestBinaryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.result = Pipeline(render=False).run(generate_source(3) + "x = f(g(1))\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_token_round_trip(self):
+        path = os.path.join(self.directory, "tokens.bin")
+        write_tokens(path, self.result.tokens)
+        with TokenFile(path) as token_file:
+            self.assertEqual(list(token_file), self.result.tokens.to_list())
+            self.assertEqual(token_file.position(len(token_file) - 1), self.result.tokens.position(len(token_file) - 1))
+            entities = get_entities_from_token_file(token_file)
+            self.assertEqual(entities["operators"], ["%", "*", "+", "+=", "-", "//", "<", "=", "==", ">"])
+            self.assertEqual(entities["functions"], ["f", "func_0", "func_1", "func_2", "g", "range"])
+            self.assertEqual(entities, self.result.entities)
+
+    def test_ast_round_trip_is_lazy(self):
+        path = os.path.join(self.directory, "ast.bin")
+        write_ast(path, self.result.ast)
+        with ASTFile(path) as ast_file:
+            root = ast_file.root()
+            self.assertEqual(root["body"][0]["name"], "func_0")
+            self.assertEqual(root["body"][0]["parameters"][1], "b")
+            self.assertEqual(ast_file.to_python(), self.result.ast)
+        ints = {"type": "Ints", "values": [-2 ** 31, -1, 0, 2 ** 31 - 1]}
+        write_ast(path, ints)
+        with ASTFile(path) as ast_file:
+            self.assertEqual(ast_file.to_python(), ints)
+        for value in (2 ** 31, -2 ** 31 - 1, 2 ** 40):
+            with self.assertRaises(ValueError):
+                write_ast(path, {"type": "Number", "value": value})
+
+    def test_occurrence_round_trip(self):
+        path = os.path.join(self.directory, "occurrences.bin")
+        index = self.result.occurrences
+        write_occurrences(path, index)
+        with OccurrenceFile(path) as occurrence_file:
+            self.assertEqual(occurrence_file.occurrences("func_1"), index.occurrences("func_1"))
+            # Lookups decode nothing; only names() does
+            self.assertEqual(occurrence_file.string_cache, {})
+            self.assertEqual(sorted(occurrence_file.names()), sorted(index.names()))
+            for name in index.names():
+                self.assertEqual(occurrence_file.occurrences(name), index.occurrences(name))
+            self.assertEqual(occurrence_file.count("func_1"), index.count("func_1"))
+            self.assertEqual(occurrence_file.count("missing"), 0)
+            self.assertEqual(occurrence_file.count(""), 0)
+            self.assertEqual(occurrence_file.count("zzz"), 0)
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.directory, "tokens.json")
+        self.result.save(self.directory)
+        with self.assertRaises(ValueError):
+            ASTFile(os.path.join(self.directory, "tokens.bin"))
+        with self.assertRaises(ValueError):
+            TokenFile(path)
+
+if __name__ == '__main__':
+    unittest.main()
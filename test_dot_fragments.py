@@ -0,0 +1,62 @@
+import unittest
+from graphviz import Digraph
+from ast_visualizer import EDGE_ATTRIBUTES, build_graph, display_tree, get_node_color, node_attributes
+from bench_utils import generate_source
+from dot_fragments import MAX_FRAGMENT_NODES, FragmentCache, dot_statements, structural_hashes
+from pipeline import Pipeline
+
+def per_node_statements(labels, types, parents, first=0):
+    dot = Digraph()
+    for index, (label, node_type, parent) in enumerate(zip(labels, types, parents)):
+        dot.node(str(first + index), label, style="filled", fillcolor=get_node_color(node_type), fontcolor="white",
+                 shape="box", margin="0.2", fontname="Arial")
+        if parent >= 0:
+            dot.edge(str(first + parent), str(first + index), color="#666666")
+    return "".join(dot.body)
+
+class TestDotFragments(unittest.TestCase):
+
+    def statements(self, source, cache, first=0):
+        tree = display_tree(Pipeline(render=False).run(source).ast)
+        text = dot_statements(*tree, node_attributes, EDGE_ATTRIBUTES, cache, first)
+        self.assertEqual(text, per_node_statements(*tree, first))
+        return text
+
+    def test_same_as_node_by_node(self):
+        cache = FragmentCache()
+        source = generate_source(60) + "s = '{0} {L} }{'\nt = '{0} {L} }{'\n"
+        self.statements(source, cache, first=7)
+        self.assertGreater(cache.hits, 0)
+        # Deeper than a fragment may be: the top of the chain is written node by node
+        self.statements("x = " + "-" * (MAX_FRAGMENT_NODES + 50) + "1\n", cache)
+        self.statements(source, cache)
+
+    def test_edit_reuses_unchanged_subtrees(self):
+        cache = FragmentCache()
+        source = generate_source(10)
+        self.statements(source, cache)
+        entries = cache.stats()["entries"]
+        hits = cache.hits
+        self.statements(source.replace("b * 4", "b * 44", 1), cache)
+        # Only the edited function's spine is new
+        self.assertLess(cache.stats()["entries"] - entries, 10)
+        self.assertGreater(cache.hits, hits)
+
+    def test_hashes_and_eviction(self):
+        labels, types, parents = display_tree(Pipeline(render=False).run("x = 1\ny = 1\nx = 1\n").ast)
+        digests = structural_hashes(labels, types, parents)
+        self.assertEqual(digests[1], digests[5])
+        self.assertEqual(digests[2], digests[4])
+        self.assertNotEqual(digests[1], digests[3])
+        cache = FragmentCache(max_chars=1000)
+        dot_statements(labels, types, parents, node_attributes, EDGE_ATTRIBUTES, cache)
+        self.assertLessEqual(cache.stats()["chars"], 1000)
+        self.assertLess(len(cache.entries), len(set(digests)))
+
+    def test_build_graph_uses_fragments(self):
+        ast = Pipeline(render=False).run(generate_source(3)).ast
+        self.assertEqual(build_graph(ast).source, build_graph(ast).source)
+        self.assertIn(per_node_statements(*display_tree(ast)), build_graph(ast).source)
+
+if __name__ == '__main__':
+    unittest.main()
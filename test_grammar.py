@@ -0,0 +1,37 @@
+import unittest
+from grammar import GRAMMAR, dispatch_table, first_sets
+from parser import STATEMENT_DISPATCH, STATEMENT_HANDLERS, Parser
+
+class TestGrammar(unittest.TestCase):
+
+    def test_first_sets(self):
+        first = first_sets(GRAMMAR)
+        self.assertEqual(first["if_statement"], {("KEYWORD", "if")})
+        self.assertIn(None, first["else_block"])
+        self.assertIn(("SEPARATOR", "("), first["return_value"])
+        self.assertEqual(first["statements"] - {None}, first["statement"])
+
+    def test_dispatch_table(self):
+        self.assertEqual(STATEMENT_DISPATCH["IDENTIFIER"], "parse_assignment")
+        self.assertEqual(STATEMENT_DISPATCH[("KEYWORD", "def")], "parse_function_def")
+        self.assertEqual(set(STATEMENT_DISPATCH.values()), set(STATEMENT_HANDLERS.values()))
+
+    def test_rejects_bad_grammars(self):
+        ambiguous = dict(GRAMMAR, statement=GRAMMAR["statement"] + [["call"]], call=[[("IDENTIFIER", None), "arguments"]])
+        with self.assertRaises(ValueError):
+            dispatch_table(ambiguous, "statement", dict(STATEMENT_HANDLERS, call="parse_call"))
+        with self.assertRaises(ValueError):
+            first_sets(dict(GRAMMAR, block=[["missing_rule"]]))
+
+    def test_bare_return(self):
+        tokens = [("KEYWORD", "def"), ("IDENTIFIER", "f"), ("SEPARATOR", "("), ("SEPARATOR", ")"), ("SEPARATOR", ":"),
+                  ("INDENT", 4), ("KEYWORD", "return"), ("DEDENT", 0)]
+        function = Parser(tokens, verbose=False).parse()["body"][0]
+        self.assertEqual(function["body"], [{"type": "ReturnStatement", "value": None}])
+
+    def test_unknown_statement(self):
+        with self.assertRaisesRegex(Exception, "Invalid statement"):
+            Parser([("KEYWORD", "elif"), ("NUMBER", "1")], verbose=False).parse()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from bench_utils import generate_source
+from incremental_parser import IncrementalParser
+from lexer import Lexer
+from parser import Parser
+
+class TestIncrementalParser(unittest.TestCase):
+
+    def setUp(self):
+        self.source = generate_source(6)
+        self.lexer = Lexer(source_code=self.source, incremental=True)
+        self.parser = IncrementalParser()
+        self.parser.parse(self.lexer.tokenize())
+
+    def edit(self, start, end, text):
+        tokens, changed = self.lexer.relex(start, end, text)
+        ast, replaced = self.parser.reparse(tokens, changed)
+        self.assertEqual(ast, Parser(list(tokens), verbose=False).parse())
+        return ast, replaced
+
+    def test_reuses_unchanged_statements(self):
+        old_body = list(self.parser.ast["body"])
+        # Line 18 is the first line in the body of func_1, the second top-level statement
+        ast, replaced = self.edit(17, 18, "    total = a - b * 7\n")
+        self.assertEqual(replaced, [1])
+        for index, statement in enumerate(ast["body"]):
+            if index != 1:
+                self.assertIs(statement, old_body[index])
+        # Nested statements of func_1 that did not change are reused too
+        self.assertIs(ast["body"][1]["body"][1], old_body[1]["body"][1])
+
+    def test_inserted_and_deleted_statements(self):
+        ast, replaced = self.edit(0, 0, "x = 1\ny = x + 2\n")
+        self.assertEqual(replaced, [0, 1])
+        self.assertEqual(len(ast["body"]), 10)
+        ast, replaced = self.edit(2, 17, "")
+        # y is parsed again because its lookahead token was part of the deleted lines
+        self.assertEqual(replaced, [1])
+        self.assertEqual([statement.get("name") for statement in ast["body"][:4]], ["x", "y", "func_1", "func_2"])
+
+    def test_sequence_of_edits(self):
+        edits = [
+            (5, 5, "        if (total):\n            total = 1\n"),
+            # The elif and break of func_2, which starts two lines later after the first edit
+            (39, 41, ""),
+            (-1, None, "print(result, 0x10)"),
+            (2, 3, "    total = a\n"),
+        ]
+        for start, end, text in edits:
+            if end is None:
+                start, end = len(self.lexer.source_code) - 1, len(self.lexer.source_code)
+            self.edit(start, end, text)
+
+    def test_invalid_edit_raises(self):
+        # Removing the if of func_0 leaves its elif without one
+        tokens, changed = self.lexer.relex(5, 7, "")
+        with self.assertRaises(Exception):
+            self.parser.reparse(tokens, changed)
+
+    def test_error_position_after_reused_statement(self):
+        lines = len(self.lexer.source_code)
+        tokens, changed = self.lexer.relex(lines - 1, lines, "result = = 1\n")
+        with self.assertRaises(Exception) as expected:
+            Parser(list(tokens), verbose=False).parse()
+        with self.assertRaises(Exception) as raised:
+            self.parser.reparse(tokens, changed)
+        self.assertEqual(str(raised.exception), str(expected.exception))
+
+if __name__ == '__main__':
+    unittest.main()
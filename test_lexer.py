@@ -1,33 +1,156 @@
-import unittest
-from lexer import Lexer
-
-class TestLexer(unittest.TestCase):
-
-    def setUp(self):
-        # Dummy source code directly string ke roop mein dete hain
-        self.code = ["x = 10 + 2\n"]
-        
-        # Mock Lexer class to override file reading
-        class TestableLexer(Lexer):
-            def load_source_code(self_inner):
-                return self.code  # Use our test string instead of reading a file
-
-        self.lexer = TestableLexer("mock_file.py")  # Filename koi bhi ho sakta hai
-
-    def test_basic_expression(self):
-        expected_tokens = [
-            ('IDENTIFIER', 'x'),
-            ('OPERATOR', '='),
-            ('NUMBER', '10'),
-            ('OPERATOR', '+'),
-            ('NUMBER', '2')
-        ]
-        tokens = self.lexer.tokenize()
-        
-        # Sirf relevant tokens check kar rahe hain (INDENT/DEDENT ko ignore karke)
-        actual_tokens = [t for t in tokens if t[0] in {'IDENTIFIER', 'OPERATOR', 'NUMBER'}]
-
-        self.assertEqual(actual_tokens, expected_tokens)
-
-if __name__ == '__main__':
-    unittest.main()
+import io
+import json
+import unittest
+from lexer import Lexer, write_token_stream
+from bench_utils import generate_source, history_sources
+from occurrence_index import INDEXED_KINDS
+from token_buffer import TokenBuffer
+
+class TestLexer(unittest.TestCase):
+
+    def setUp(self):
+        # Dummy source code directly string ke roop mein dete hain
+        self.code = ["x = 10 + 2\n"]
+        
+        # Mock Lexer class to override file reading
+        class TestableLexer(Lexer):
+            def load_source_code(self_inner):
+                return self.code  # Use our test string instead of reading a file
+
+        self.lexer = TestableLexer("mock_file.py")  # Filename koi bhi ho sakta hai
+
+    def test_basic_expression(self):
+        expected_tokens = [
+            ('IDENTIFIER', 'x'),
+            ('OPERATOR', '='),
+            ('NUMBER', '10'),
+            ('OPERATOR', '+'),
+            ('NUMBER', '2')
+        ]
+        tokens = self.lexer.tokenize()
+        
+        # Sirf relevant tokens check kar rahe hain (INDENT/DEDENT ko ignore karke)
+        actual_tokens = [t for t in tokens if t[0] in {'IDENTIFIER', 'OPERATOR', 'NUMBER'}]
+
+        self.assertEqual(actual_tokens, expected_tokens)
+
+class TestStreaming(unittest.TestCase):
+
+    def test_iter_tokens_is_lazy(self):
+        def lines():
+            yield "if (a):\n"
+            yield "    b = 1\n"
+            raise AssertionError("read past the first statement")
+
+        stream = Lexer(source_code=[]).iter_tokens(lines())
+        first = [next(stream) for _ in range(5)]
+        self.assertEqual(first, [("KEYWORD", "if"), ("SEPARATOR", "("), ("IDENTIFIER", "a"),
+                                 ("SEPARATOR", ")"), ("SEPARATOR", ":")])
+
+    def test_save_token_matches_json_dump(self):
+        source = "".join(history_sources())
+        expected = json.dumps(Lexer(source_code=source).tokenize())
+        buffer = io.StringIO()
+        write_token_stream(Lexer(source_code=io.StringIO(source)).iter_tokens(), buffer)
+        self.assertEqual(buffer.getvalue(), expected)
+
+class TestIncremental(unittest.TestCase):
+
+    def test_relex_matches_full_lex(self):
+        source = generate_source(30)
+        lexer = Lexer(source_code=source, engine="regex", incremental=True)
+        lexer.tokenize()
+        lines = source.splitlines(keepends=True)
+        edits = [
+            (3, 4, "    total = a - b\n"),
+            (5, 5, "        if (total):\n            total = 1\n"),
+            (40, 52, ""),
+            (0, 0, "# header\n"),
+            (-1, None, "print(result, 0x10)"),
+        ]
+        for start, end, text in edits:
+            if end is None:
+                start, end = len(lines) - 1, len(lines)
+            previous = list(lexer.tokens)
+            tokens, (first, old_end, new_end) = lexer.relex(start, end, text)
+            lines[start:end] = text.splitlines(keepends=True)
+            expected = Lexer(source_code="".join(lines)).tokenize()
+            self.assertEqual(tokens, expected)
+            self.assertEqual(previous[:first] + tokens[first:new_end] + previous[old_end:], expected)
+
+    def test_relex_stops_at_resync_line(self):
+        lexer = Lexer(source_code="a = 1\nb = 2\nc = 3\n", incremental=True)
+        lexer.tokenize()
+        tokens, changed = lexer.relex(1, 2, "b = 20 + 1\n")
+        self.assertEqual(changed, (3, 6, 8))
+        self.assertEqual(tokens[3:8], [("IDENTIFIER", "b"), ("OPERATOR", "="), ("NUMBER", "20"),
+                                       ("OPERATOR", "+"), ("NUMBER", "1")])
+
+    def test_relex_after_unterminated_last_line(self):
+        lexer = Lexer(source_code="a = 1\nb = 2", incremental=True)
+        lexer.tokenize()
+        tokens, changed = lexer.relex(2, 2, "c = 3\n")
+        self.assertEqual("".join(lexer.source_code), "a = 1\nb = 2\nc = 3\n")
+        self.assertEqual(tokens, Lexer(source_code="a = 1\nb = 2\nc = 3\n").tokenize())
+        self.assertEqual(changed, (6, 6, 9))
+        self.assertEqual(TokenBuffer.from_lexer(lexer).offsets, TokenBuffer.from_source("a = 1\nb = 2\nc = 3\n").offsets)
+
+class TestOccurrenceIndex(unittest.TestCase):
+
+    def expected_occurrences(self, source):
+        tokens = TokenBuffer.from_source(source)
+        expected = {}
+        for index, (kind, value) in enumerate(tokens):
+            if kind in INDEXED_KINDS:
+                expected.setdefault(value, []).append((index, tokens.lines[index]))
+        return expected
+
+    def assert_index_matches(self, index, source):
+        expected = self.expected_occurrences(source)
+        self.assertEqual(sorted(index.names()), sorted(expected))
+        for name, occurrences in expected.items():
+            self.assertEqual(index.occurrences(name), occurrences)
+            self.assertEqual(index.count(name), len(occurrences))
+
+    def test_index_built_while_lexing(self):
+        source = generate_source(5) + "\nx = f(x)\n"
+        lexer = Lexer(source_code=source, engine="regex", index_occurrences=True)
+        lexer.tokenize()
+        self.assert_index_matches(lexer.occurrence_index, source)
+        self.assertEqual(lexer.occurrence_index.occurrences("x")[-1][1], source.count("\n"))
+        self.assertEqual(lexer.occurrence_index.count("missing"), 0)
+        self.assertEqual(lexer.occurrence_index.occurrences("missing"), [])
+
+    def test_index_follows_relex(self):
+        source = generate_source(5)
+        lexer = Lexer(source_code=source, incremental=True, index_occurrences=True)
+        lexer.tokenize()
+        self.assert_index_matches(lexer.occurrence_index, source)
+        lexer.relex(2, 3, "    total = a - b\n    extra = total\n")
+        self.assert_index_matches(lexer.occurrence_index, "".join(lexer.source_code))
+
+class TestRegexEngine(unittest.TestCase):
+
+    def assert_same_stream(self, source):
+        char_lexer = Lexer(source_code=source, engine="char")
+        regex_lexer = Lexer(source_code=source, engine="regex")
+        self.assertEqual(regex_lexer.tokenize(), char_lexer.tokenize())
+        self.assertEqual(list(regex_lexer.symbol_table.items()), list(char_lexer.symbol_table.items()))
+
+    def test_history_corpus_parity(self):
+        for source in history_sources() + [generate_source(20)]:
+            self.assert_same_stream(source)
+
+    def test_edge_case_parity(self):
+        # Word operators at the start of names, number prefixes, escapes and non-ASCII fallback
+        self.assert_same_stream("isdigit = 0X1F + 0b102 - 1.2.3 ** x_is\n")
+        self.assert_same_stream("s = 'it\\'s' # trailing \"comment\"\n")
+        self.assert_same_stream("caf\u00e9 = x\u00b2 ! $ ` ->\n")
+
+    def test_unterminated_string(self):
+        with self.assertRaises(Exception) as ctx:
+            Lexer(source_code='x = "open\n', engine="regex").tokenize()
+        self.assertIn("column 4", str(ctx.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from bench_utils import generate_source
+from lexer import Lexer
+from parallel_lexer import split_chunks, tokenize_parallel
+
+class TestParallelLexer(unittest.TestCase):
+
+    def test_matches_serial_stream(self):
+        # Column-0 comments inside blocks and deep nesting at chunk edges
+        source = generate_source(40) + "def f(a):\n    if (a):\n        while (a):\n# note\n            a = 1\n"
+        serial = Lexer(source_code=source, engine="regex")
+        expected = serial.tokenize()
+        tokens, symbol_table = tokenize_parallel(source, workers=2, chunks_per_worker=8)
+        self.assertEqual(tokens, expected)
+        self.assertEqual(list(symbol_table.items()), list(serial.symbol_table.items()))
+
+    def test_chunks_start_in_column_zero(self):
+        lines = generate_source(10).splitlines(keepends=True)
+        starts = split_chunks(lines, 7)
+        self.assertEqual(starts[0], 0)
+        self.assertGreater(len(starts), 1)
+        for start in starts[1:]:
+            self.assertFalse(lines[start][0].isspace())
+
+    def test_errors_report_source_line(self):
+        source = generate_source(10) + 'x = "open\n'
+        with self.assertRaises(Exception) as ctx:
+            tokenize_parallel(source, workers=2)
+        self.assertIn(f"line {source.count(chr(10))}", str(ctx.exception))
+
+if __name__ == '__main__':
+    unittest.main()
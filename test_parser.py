@@ -1,31 +1,70 @@
-import unittest
-from parser import Parser
-
-class TestParser(unittest.TestCase):
-    
-    def test_assignment_statement(self):
-        # Sample tokens for: x = 5
-        tokens = [
-            ["IDENTIFIER", "x"],
-            ["OPERATOR", "="],
-            ["NUMBER", "5"]
-        ]
-
-        parser = Parser(tokens)
-        ast = parser.parse()
-
-        expected_ast = {
-            "type": "Program",
-            "body": [
-                {
-                    "type": "Assignment",
-                    "name": "x",
-                    "value": {"type": "Number", "value": "5"}
-                }
-            ]
-        }
-
-        self.assertEqual(ast, expected_ast)
-
-if __name__ == '__main__':
-    unittest.main()
+import unittest
+from bench_utils import generate_source, history_sources
+from lexer import Lexer
+from parser import EXPRESSION_ENGINES, Parser
+
+class TestParser(unittest.TestCase):
+    
+    def test_assignment_statement(self):
+        # Sample tokens for: x = 5
+        tokens = [
+            ["IDENTIFIER", "x"],
+            ["OPERATOR", "="],
+            ["NUMBER", "5"]
+        ]
+
+        parser = Parser(tokens)
+        ast = parser.parse()
+
+        expected_ast = {
+            "type": "Program",
+            "body": [
+                {
+                    "type": "Assignment",
+                    "name": "x",
+                    "value": {"type": "Number", "value": "5"}
+                }
+            ]
+        }
+
+        self.assertEqual(ast, expected_ast)
+
+class TestExpressionEngines(unittest.TestCase):
+
+    def parse(self, source, engine):
+        return Parser(Lexer(source_code=source).tokenize(), verbose=False, expression_engine=engine).parse()
+
+    def test_engines_agree(self):
+        sources = history_sources() + [
+            generate_source(5),
+            "x = -a ** -b * (c + d) // 2 - f(g(1), h()) % 3\n",
+            "y = a or b and not_c == d < e + - - f\n",
+            "z = ((a)) - (b - c) - d ** e ** f\n",
+        ]
+        for source in sources:
+            self.assertEqual(self.parse(source, "precedence"), self.parse(source, "recursive"))
+
+    def test_precedence_and_associativity(self):
+        value = self.parse("x = -a ** b - c - d\n", "precedence")["body"][0]["value"]
+        self.assertEqual(value["operator"], "-")
+        self.assertEqual(value["left"]["operator"], "-")
+        self.assertEqual(value["left"]["left"]["operator"], "**")
+        self.assertEqual(value["left"]["left"]["left"], {
+            "type": "UnaryExpression", "operator": "-", "right": {"type": "Identifier", "name": "a"}
+        })
+
+    def test_deep_nesting(self):
+        depth = 5000
+        source = "x = " + "(" * depth + "1" + " + 1)" * depth + "\n"
+        value = self.parse(source, "precedence")["body"][0]["value"]
+        self.assertEqual(value["right"], {"type": "Number", "value": "1"})
+        with self.assertRaises(RecursionError):
+            self.parse(source, "recursive")
+
+    def test_missing_parenthesis(self):
+        for engine in EXPRESSION_ENGINES:
+            with self.assertRaises(Exception):
+                self.parse("x = (1 + 2\n", engine)
+
+if __name__ == '__main__':
+    unittest.main()
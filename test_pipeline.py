@@ -0,0 +1,34 @@
+import unittest
+from bench_utils import generate_source
+from pipeline import Pipeline
+
+class TestPipeline(unittest.TestCase):
+
+    def test_run_in_memory(self):
+        result = Pipeline(render=False).run("a = 10\nprint(a)\n")
+
+        self.assertEqual(result.tokens[:3], [('IDENTIFIER', 'a'), ('OPERATOR', '='), ('NUMBER', '10')])
+        self.assertEqual(result.ast["type"], "Program")
+        self.assertEqual([stmt["type"] for stmt in result.ast["body"]], ["Assignment", "PrintStatement"])
+        self.assertEqual(result.entities["operators"], ["="])
+        self.assertIsNone(result.image)
+
+    def test_iter_statements_is_lazy(self):
+        source = generate_source(20)
+        lines_read = []
+
+        def lines():
+            for line in source.splitlines(keepends=True):
+                lines_read.append(line)
+                yield line
+
+        statements = Pipeline(render=False).iter_statements(lines())
+        first = next(statements)
+        self.assertEqual(first["name"], "func_0")
+        # Only the first function and the lookahead line after it have been read
+        self.assertLess(len(lines_read), 20)
+        expected = Pipeline(render=False).run(source).ast["body"]
+        self.assertEqual([first] + list(statements), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import shutil
+import struct
+import unittest
+import zlib
+from graphviz import ExecutableNotFound
+from ast_visualizer import build_graph
+from bench_utils import generate_source, history_sources
+from pipeline import Pipeline
+from render_daemon import PNG_SIGNATURE, DotRenderService, png_end, svg_end
+
+def png_chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+def tiny_png(shade):
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    # Chunk data that looks like an IEND chunk must not end the image
+    data = png_chunk(b"tEXt", b"note\0IEND\xaeB`\x82")
+    return PNG_SIGNATURE + png_chunk(b"IHDR", header) + data + png_chunk(b"IDAT", zlib.compress(bytes([0, shade]))) \
+        + png_chunk(b"IEND", b"")
+
+class TestOutputSplitting(unittest.TestCase):
+
+    def test_png_end(self):
+        images = [tiny_png(shade) for shade in (0, 128, 255)]
+        stream = b"".join(images)
+        start = 0
+        for image in images:
+            end = png_end(stream, start)
+            self.assertEqual(stream[start:end], image)
+            start = end
+        for cut in range(len(images[0])):
+            self.assertEqual(png_end(images[0][:cut], 0), -1)
+
+    def test_svg_end(self):
+        first = b'<svg><text>&lt;/svg&gt;</text>\n</svg>\n'
+        stream = first + b"<svg></svg>\n"
+        self.assertEqual(svg_end(stream, 0), len(first))
+        self.assertEqual(svg_end(stream, len(first)), len(stream))
+        self.assertEqual(svg_end(first[:-1], 0), -1)
+
+class TestDotRenderService(unittest.TestCase):
+
+    def setUp(self):
+        sources = history_sources() + [generate_source(n) for n in (1, 5)]
+        self.graphs = [build_graph(Pipeline(render=False).run(source).ast).source for source in sources]
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            DotRenderService("gif")
+
+    @unittest.skipIf(shutil.which("dot"), "dot is installed")
+    def test_missing_dot_fails_each_render(self):
+        with DotRenderService(workers=2, batch_size=2, max_queue=2) as service:
+            futures = [service.submit(graph) for graph in self.graphs]
+            for future in futures:
+                self.assertIsInstance(future.exception(), ExecutableNotFound)
+            self.assertEqual(service.stats()["graphs"], 0)
+
+    @unittest.skipUnless(shutil.which("dot"), "dot is not installed")
+    def test_batches_match_one_process_per_render(self):
+        expected = [build_graph(Pipeline(render=False).run(source).ast).pipe(format="svg")
+                    for source in history_sources()]
+        with DotRenderService("svg", workers=2, batch_size=3, max_queue=2) as service:
+            for _ in range(2):
+                self.assertEqual(service.render_many(self.graphs[:len(expected)]), expected)
+            stats = service.stats()
+        self.assertEqual(stats["graphs"], 2 * len(expected))
+        self.assertLessEqual(stats["processes"], 2)
+        with DotRenderService("png", workers=1) as service:
+            for image in service.render_many(self.graphs):
+                self.assertEqual(png_end(image, 0), len(image))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from bench_utils import generate_source
+from pipeline import Pipeline
+from render_profiles import RENDER_PROFILES, Renders
+
+class TestRenderProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.result = Pipeline().run(generate_source(3))
+        self.renders = self.result.renders
+        self.calls = 0
+
+    def slow_profile(self, renders):
+        self.calls += 1
+        time.sleep(0.05)
+        if self.calls == 1 and getattr(self, "fail_first", False):
+            raise RuntimeError("render failed")
+        return b"slow"
+
+    def with_slow_profile(self):
+        RENDER_PROFILES["slow"] = (self.slow_profile, "slow.bin", "application/octet-stream")
+        self.addCleanup(RENDER_PROFILES.pop, "slow")
+
+    def test_pipeline_renders_only_the_cheap_profile(self):
+        self.assertEqual(self.result.image_filename, RENDER_PROFILES["dot"][1])
+        self.assertTrue(self.result.image.startswith(b"// Abstract Syntax Tree"))
+        self.assertTrue(self.renders.ready("dot"))
+        self.assertFalse(self.renders.ready("png"))
+        self.assertFalse(self.renders.ready("thumbnail"))
+        svg = self.renders.get("svg")
+        self.assertIs(self.renders.get("svg"), svg)
+        with self.assertRaises(ValueError):
+            self.renders.get("gif")
+
+    def test_concurrent_requests_render_once(self):
+        self.with_slow_profile()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.renders.get("slow"))) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        results.append(self.renders.request("slow").result())
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [b"slow"] * 7)
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_render_can_be_retried(self):
+        self.with_slow_profile()
+        self.fail_first = True
+        with self.assertRaises(RuntimeError):
+            self.renders.request("slow").result()
+        self.assertEqual(self.renders.pending, {})
+        self.assertEqual(self.renders.get("slow"), b"slow")
+
+    def test_save_and_pickle(self):
+        directory = tempfile.mkdtemp()
+        try:
+            stale = os.path.join(directory, RENDER_PROFILES["png"][1])
+            with open(stale, "wb") as f:
+                f.write(b"old image")
+            self.result.save(directory)
+            self.assertFalse(os.path.exists(stale))
+            with open(os.path.join(directory, RENDER_PROFILES["dot"][1]), "rb") as f:
+                self.assertEqual(f.read(), self.result.image)
+        finally:
+            shutil.rmtree(directory)
+        self.renders.get("svg")
+        copy = pickle.loads(pickle.dumps(self.result)).renders
+        self.assertEqual(copy.images.keys(), {"dot", "svg"})
+        self.assertEqual(copy.ast, self.result.ast)
+        self.assertEqual(copy.pending, {})
+
+    def test_level_of_detail_profiles(self):
+        renders = Renders(Pipeline(render=False).run(generate_source(50)).ast, max_nodes=40)
+        self.assertEqual(renders.get("dot").count(b"[label="), 40 + renders.get("dot").count(b"collapsed:"))
+        self.assertIn(b'class="collapsed"', renders.get("svg"))
+
+if __name__ == '__main__':
+    unittest.main()
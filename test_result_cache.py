@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from bench_utils import generate_source
+from pipeline import Pipeline
+from result_cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pipeline = Pipeline(render=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit_returns_same_result(self):
+        cache = ResultCache(self.directory)
+        source = generate_source(3)
+        first = cache.run(self.pipeline, source)
+        second = cache.run(self.pipeline, source)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIsNot(second, first)
+        self.assertEqual(second.ast, first.ast)
+        self.assertEqual(second.entities, first.entities)
+        self.assertEqual(list(second.tokens), list(first.tokens))
+        self.assertEqual(second.occurrences.occurrences("total"), first.occurrences.occurrences("total"))
+        # Another process sees the entry, another pipeline version does not
+        variant = cache.variant(self.pipeline)
+        self.assertIsNotNone(ResultCache(self.directory).get(source, variant))
+        self.assertIsNone(ResultCache(self.directory, version="other").get(source, variant))
+        self.assertIsNone(cache.get(source, cache.variant(Pipeline(render=False, backend="svg"))))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResultCache(self.directory)
+        sources = [generate_source(n) for n in (1, 2, 3)]
+        for source in sources:
+            cache.run(self.pipeline, source)
+        sizes = [size for _, size, _ in cache.entries()]
+        variant = cache.variant(self.pipeline)
+        cache.get(sources[0], variant)
+        # Keep room for two entries: the oldest one that was not used again goes
+        cache.max_bytes = sum(sizes) - min(sizes)
+        cache.run(self.pipeline, sources[2])
+        cache.evict()
+        self.assertIsNotNone(cache.get(sources[0], variant))
+        self.assertIsNone(cache.get(sources[1], variant))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_concurrent_writers(self):
+        source = generate_source(5)
+        result = self.pipeline.run(source)
+        caches = [ResultCache(self.directory) for _ in range(8)]
+        threads = [threading.Thread(target=cache.put, args=(source, result)) for cache in caches for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(caches[0].get(source).ast, result.ast)
+
+    def test_concurrent_readers_are_counted(self):
+        cache = ResultCache(self.directory)
+        cache.put("x = 1\n", self.pipeline.run("x = 1\n"))
+        def read():
+            for _ in range(20):
+                cache.get("x = 1\n")
+                cache.get("x = 2\n")
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (160, 160))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ResultCache(self.directory)
+        with open(cache.path(cache.key("x = 1\n")), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.get("x = 1\n"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
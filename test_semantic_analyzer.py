@@ -0,0 +1,70 @@
+import unittest
+from bench_utils import generate_source
+from pipeline import Pipeline
+from semantic_analyzer import Resolver
+
+def parse(source):
+    return Pipeline(render=False).run(source).ast
+
+def identifiers(node, found=None):
+    found = [] if found is None else found
+    if isinstance(node, dict):
+        if node.get("type") == "Identifier":
+            found.append(node)
+        for value in node.values():
+            identifiers(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            identifiers(item, found)
+    return found
+
+class TestResolver(unittest.TestCase):
+
+    def test_every_identifier_is_bound(self):
+        ast = parse(generate_source(4))
+        resolver = Resolver(ast)
+        self.assertEqual(resolver.analyze(), [])
+        nodes = identifiers(ast)
+        self.assertEqual(len(resolver.bindings), len(nodes))
+        func_1 = ast["body"][1]
+        total = resolver.declaration(func_1["body"][1]["condition"]["left"])
+        self.assertEqual((total.name, total.kind, total.node), ("total", "variable", func_1["body"][0]))
+        call = func_1["body"][2]["body"][0]["value"]["left"]
+        self.assertIs(resolver.declaration(call["callee"]).node, ast["body"][0])
+        self.assertIs(resolver.declaration(call["arguments"][1]).node, func_1["body"][2])
+        self.assertEqual(resolver.declaration(func_1["body"][2]["iterable"]["callee"]).kind, "builtin")
+
+    def test_scopes(self):
+        source = (
+            "x = 1\n"
+            "def f(x):\n"
+            "    y = x + later()\n"
+            "    return y\n"
+            "def later():\n"
+            "    return x\n"
+            "for i in range(x):\n"
+            "    x = i\n"
+            "z = i + y\n"
+        )
+        ast = parse(source)
+        resolver = Resolver(ast)
+        self.assertEqual(resolver.analyze(), ["Undeclared variable: i", "Undeclared variable: y"])
+        f, later, loop = ast["body"][1], ast["body"][2], ast["body"][3]
+        self.assertEqual(resolver.declaration(f["body"][0]["value"]["left"]).kind, "parameter")
+        self.assertIs(resolver.declaration(f["body"][0]["value"]["right"]["callee"]).node, later)
+        self.assertIs(resolver.declaration(later["body"][0]["value"]).node, ast["body"][0])
+        self.assertEqual(resolver.declaration(loop["body"][0]["value"]).kind, "loop_variable")
+        # Assigning x inside the loop rebinds the module's x
+        self.assertEqual([d.name for d in resolver.declarations if d.name == "x"], ["x", "x"])
+
+    def test_duplicate_parameter_and_deep_nesting(self):
+        ast = parse("def f(a, a):\n    return a\n")
+        self.assertEqual(Resolver(ast).analyze(), ["Duplicate parameter: a"])
+        depth = 5000
+        ast = parse("x = 1\ny = " + "(" * depth + "x" + " + 1)" * depth + "\n")
+        resolver = Resolver(ast)
+        self.assertEqual(resolver.analyze(), [])
+        self.assertEqual(len(resolver.declarations[0].references), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from ast_utils import get_entities_from_tokens
+from bench_utils import generate_source, history_sources
+from lexer import Lexer
+from parser import Parser
+from token_buffer import TokenBuffer
+
+class TestTokenBuffer(unittest.TestCase):
+
+    def test_same_tokens_as_lexer(self):
+        for engine in ("char", "regex"):
+            for source in history_sources() + [generate_source(5), "n = 0XfF + 0B1\n"]:
+                buffer = TokenBuffer.from_source(source, engine=engine)
+                self.assertEqual(buffer.to_list(), Lexer(source_code=source).tokenize())
+
+    def test_positions(self):
+        buffer = TokenBuffer.from_source("a = 1\nif (a):\n    print('x')\n")
+        self.assertEqual(buffer[-5:-3], [("INDENT", 4), ("KEYWORD", "print")])
+        self.assertEqual(buffer.position(len(buffer) - 4), (3, 4))
+        string_index = len(buffer) - 2
+        offset = buffer.offsets[string_index]
+        self.assertEqual(buffer.source[offset - 1:offset + 2], "'x'")
+        self.assertEqual(buffer[-len(buffer)], buffer[0])
+        for index in (len(buffer), -len(buffer) - 1):
+            with self.assertRaises(IndexError):
+                buffer[index]
+
+    def test_parser_and_entities_accept_buffer(self):
+        source = generate_source(3)
+        buffer = TokenBuffer.from_source(source)
+        tokens = Lexer(source_code=source).tokenize()
+        self.assertEqual(Parser(buffer, verbose=False).parse(), Parser(tokens, verbose=False).parse())
+        from_buffer = get_entities_from_tokens(buffer)
+        from_list = get_entities_from_tokens(tokens)
+        # Only the buffer knows line numbers, everything else must agree
+        for key in ("operator_usage", "called_functions", "defined_functions"):
+            for entry in from_buffer[key].values():
+                entry["lines"] = []
+        self.assertEqual(from_buffer, from_list)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import random
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from ast_visualizer import display_tree, layout_ast, render_ast, render_ast_svg
+from bench_utils import generate_source
+from pipeline import SVG_FILENAME, Pipeline
+from tree_layout import tidy_layout
+
+def random_parents(n, seed):
+    # Pre-order parent list: each node hangs off the previous node or one of its ancestors
+    rng = random.Random(seed)
+    parents = [-1]
+    for node in range(1, n):
+        chain = []
+        ancestor = node - 1
+        while ancestor >= 0:
+            chain.append(ancestor)
+            ancestor = parents[ancestor]
+        parents.append(rng.choice(chain))
+    return parents
+
+class TestTreeLayout(unittest.TestCase):
+
+    def assertTidy(self, layout, parents, h_gap):
+        for row in np.unique(layout.y):
+            nodes = np.flatnonzero(layout.y == row)
+            nodes = nodes[np.argsort(layout.x[nodes])]
+            lefts = layout.x[nodes] - layout.widths[nodes] / 2
+            rights = layout.x[nodes] + layout.widths[nodes] / 2
+            self.assertTrue((lefts[1:] >= rights[:-1] + h_gap - 1e-6).all())
+        children = {}
+        for node, parent in enumerate(parents):
+            if parent >= 0:
+                children.setdefault(parent, []).append(node)
+                self.assertGreater(layout.y[node], layout.y[parent])
+        for parent, kids in children.items():
+            self.assertAlmostEqual(layout.x[parent], (layout.x[kids[0]] + layout.x[kids[-1]]) / 2)
+            self.assertTrue(all(layout.x[a] < layout.x[b] for a, b in zip(kids, kids[1:])))
+
+    def test_random_trees(self):
+        rng = random.Random(0)
+        for seed in range(50):
+            parents = random_parents(rng.randint(1, 150), seed)
+            widths = [rng.randint(10, 90) for _ in parents]
+            heights = [rng.randint(20, 50) for _ in parents]
+            self.assertTidy(tidy_layout(parents, widths, heights, h_gap=5), parents, 5)
+
+    def test_deep_chain(self):
+        parents = list(range(-1, 19999))
+        layout = tidy_layout(parents, [30] * 20000, [20] * 20000)
+        self.assertTrue((layout.x == layout.x[0]).all())
+        self.assertEqual(layout.height, 20000 * 20 + 19999 * 40 + 10)
+
+    def test_ast_layout_and_svg(self):
+        ast = Pipeline(render=False).run(generate_source(3) + "s = '<a & b>'\n").ast
+        layout, lines, types = layout_ast(ast)
+        self.assertTidy(layout, display_tree(ast)[2], 12)
+        svg = ET.fromstring(render_ast_svg(ast))
+        namespace = "{http://www.w3.org/2000/svg}"
+        self.assertEqual(len(svg.findall(f"{namespace}text")), len(types))
+        self.assertEqual(svg.find(f"{namespace}path").get("d").count("M"), len(types) - 1)
+        self.assertIn("'<a & b>'", ["".join(text.itertext()).replace("String", "") for text in svg.iter(f"{namespace}text")])
+        self.assertEqual(render_ast(ast, "svg"), render_ast_svg(ast))
+        with self.assertRaises(ValueError):
+            render_ast(ast, "ascii")
+
+    def test_pipeline_backend(self):
+        result = Pipeline(backend="svg").run("x = 1\n")
+        self.assertEqual(result.image_filename, SVG_FILENAME)
+        self.assertTrue(result.image.startswith(b"<svg"))
+        with self.assertRaises(ValueError):
+            Pipeline(backend="ascii")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import xml.etree.ElementTree as ET
+from bench_utils import generate_source
+from pipeline import Pipeline
+from tree_tiles import TilePyramid
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+class TestTreeTiles(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = Pipeline(render=False).run(generate_source(8)).ast
+        self.pyramid = TilePyramid(self.ast, tile_size=128, max_tiles=4)
+
+    def test_levels(self):
+        pyramid = self.pyramid
+        self.assertEqual(pyramid.grid(0), (1, 1))
+        self.assertEqual(pyramid.scale(pyramid.max_zoom), 1.0)
+        columns, rows = pyramid.grid(pyramid.max_zoom)
+        self.assertGreaterEqual(columns * 128, pyramid.width)
+        self.assertLess((columns - 1) * 128, pyramid.width)
+        self.assertEqual(len(pyramid.info()["levels"]), pyramid.max_zoom + 1)
+        for z, x, y in [(-1, 0, 0), (pyramid.max_zoom + 1, 0, 0), (0, 1, 0), (pyramid.max_zoom, columns, 0)]:
+            with self.assertRaises(ValueError):
+                pyramid.tile(z, x, y)
+
+    def test_full_size_tiles_hold_every_node(self):
+        pyramid = self.pyramid
+        z = pyramid.max_zoom
+        columns, rows = pyramid.grid(z)
+        labels = set()
+        for x in range(columns):
+            for y in range(rows):
+                tile = ET.fromstring(pyramid.tile(z, x, y))
+                self.assertEqual(tile.get("width"), "128")
+                for text in tile.iter(f"{SVG}text"):
+                    labels.add((text[0].get("x"), text[0].get("y")))
+        # Every node is drawn in a tile it crosses, labels included
+        self.assertEqual(len(labels), len(pyramid.types))
+
+    def test_tiles_are_cached(self):
+        first = self.pyramid.tile(1, 0, 0)
+        self.assertIs(self.pyramid.tile(1, 0, 0), first)
+        for x in range(self.pyramid.grid(3)[0])[:5]:
+            self.pyramid.tile(3, x, 0)
+        self.assertEqual(len(self.pyramid.tiles), 4)
+        self.assertNotIn((1, 0, 0), self.pyramid.tiles)
+
+    def test_coarse_levels_draw_rows(self):
+        pyramid = TilePyramid(Pipeline(render=False).run(generate_source(300)).ast)
+        tile = ET.fromstring(pyramid.tile(0, 0, 0))
+        self.assertEqual(len(list(tile.iter(f"{SVG}text"))), 0)
+        bands = tile.findall(f"{SVG}rect")[1:]
+        self.assertGreater(len(bands), 0)
+        self.assertLess(len(bands), 256 * len(pyramid.row_tops))
+        self.assertLess(len(pyramid.tile(0, 0, 0)), 20000)
+
+if __name__ == '__main__':
+    unittest.main()
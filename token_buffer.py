@@ -0,0 +1,86 @@
+from array import array
+from collections.abc import Sequence
+
+from lexer import KIND_CODES, TOKEN_KINDS, Lexer
+
+INDENT_CODES = (KIND_CODES["INDENT"], KIND_CODES["DEDENT"])
+
+
+class TokenBuffer(Sequence):
+    """Token stream stored as parallel typed arrays over the original source.
+
+    Each token costs one uint8 kind code plus four uint32 fields (offset and
+    length into ``source``, line and column). Indexing returns the same
+    ``(kind, value)`` tuples the Lexer produces, sliced from the source on
+    demand, so a TokenBuffer can be handed to Parser and
+    get_entities_from_tokens in place of the token list.
+    """
+
+    def __init__(self, source=""):
+        self.source = source
+        self.kinds = array("B")
+        self.offsets = array("I")
+        self.lengths = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+        # Values that are not a plain slice of the source, e.g. "0x1f" lexed from "0X1f"
+        self.overrides = {}
+
+    @classmethod
+    def from_source(cls, source_text, engine="regex"):
+        return cls.from_lexer(Lexer(source_code=source_text, engine=engine))
+
+    @classmethod
+    def from_lexer(cls, lexer):
+        # The lexer's source_code must be a list of lines: tokens point into their concatenation
+        buffer = cls("".join(lexer.source_code))
+        for kind, value, offset, length, line, column in lexer.iter_token_spans():
+            buffer.append(kind, value, offset, length, line, column)
+        return buffer
+
+    def append(self, kind, value, offset, length, line, column):
+        code = KIND_CODES[kind]
+        if code not in INDENT_CODES and self.source[offset:offset + length] != value:
+            self.overrides[len(self.kinds)] = value
+        self.kinds.append(code)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.lines.append(line)
+        self.columns.append(column)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return TOKEN_KINDS[self.kinds[index]], self.value_at(index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TOKEN_KINDS[self.kinds[index]], self.value_at(index)
+
+    def kind_at(self, index):
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def value_at(self, index):
+        if self.kinds[index] in INDENT_CODES:
+            return self.lengths[index]
+        if index in self.overrides:
+            return self.overrides[index]
+        offset = self.offsets[index]
+        return self.source[offset:offset + self.lengths[index]]
+
+    def position(self, index):
+        return self.lines[index], self.columns[index]
+
+    def to_list(self):
+        return list(self)
+
+    def nbytes(self):
+        # Size of the token arrays, not counting the shared source text
+        return sum(a.itemsize * len(a) for a in (self.kinds, self.offsets, self.lengths, self.lines, self.columns))
@@ -0,0 +1,167 @@
+import numpy as np
+
+
+class TreeLayout:
+    """Node boxes of a tidy tree drawing: centre x, top y, width and height
+    per node (NumPy arrays, pre-order), plus the size of the whole drawing."""
+
+    def __init__(self, x, y, widths, heights, parents):
+        self.x = x
+        self.y = y
+        self.widths = widths
+        self.heights = heights
+        self.parents = parents
+        self.width = float((x + widths / 2).max()) if len(x) else 0.0
+        self.height = float((y + heights).max()) if len(y) else 0.0
+
+
+def tidy_layout(parents, widths, heights, h_gap=12.0, v_gap=40.0, margin=10.0):
+    """Reingold-Tilford tidy tree layout in the linear-time form of Buchheim,
+    Juenger and Leipert, for n-ary trees with nodes of different widths.
+
+    parents lists each node's parent index in pre-order (-1 for the root).
+    The first walk, which places every subtree as close to its left sibling
+    as its contours allow, is iterative and scalar; the passes that turn
+    relative offsets into absolute coordinates work a tree level at a time
+    on NumPy arrays.
+    """
+    n = len(parents)
+    parents = np.asarray(parents, dtype=np.int64)
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    if n == 0:
+        return TreeLayout(np.zeros(0), np.zeros(0), widths, heights, parents)
+
+    parent = parents.tolist()
+    children = [[] for _ in range(n)]
+    depth = [0] * n
+    for node in range(1, n):
+        children[parent[node]].append(node)
+        depth[node] = depth[parent[node]] + 1
+    number = [0] * n
+    for kids in children:
+        for position, child in enumerate(kids):
+            number[child] = position
+    half = (widths / 2).tolist()
+
+    x = [0.0] * n
+    mod = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+    change = [0.0] * n
+    shift = [0.0] * n
+    default_ancestor = [0] * n
+
+    def separation(left, right):
+        return half[left] + half[right] + h_gap
+
+    def next_left(v):
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v):
+        return children[v][-1] if children[v] else thread[v]
+
+    def apportion(v):
+        # Pushes v's subtree right until it clears the subtrees of its left
+        # siblings, following the facing contours level by level
+        p = parent[v]
+        default = default_ancestor[p]
+        w = children[p][number[v] - 1]
+        vir = vor = v
+        vil = w
+        vol = children[p][0]
+        sir = sor = mod[v]
+        sil = mod[vil]
+        sol = mod[vol]
+        while True:
+            right_of_left = next_right(vil)
+            left_of_right = next_left(vir)
+            if right_of_left < 0 or left_of_right < 0:
+                break
+            vil = right_of_left
+            vir = left_of_right
+            vol = next_left(vol)
+            vor = next_right(vor)
+            ancestor[vor] = v
+            distance = (x[vil] + sil) - (x[vir] + sir) + separation(vil, vir)
+            if distance > 0:
+                a = ancestor[vil] if parent[ancestor[vil]] == p else default
+                subtrees = number[v] - number[a]
+                change[v] -= distance / subtrees
+                shift[v] += distance
+                change[a] += distance / subtrees
+                x[v] += distance
+                mod[v] += distance
+                sir += distance
+                sor += distance
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        else:
+            if next_left(vir) >= 0 and next_left(vol) < 0:
+                thread[vol] = next_left(vir)
+                mod[vol] += sir - sol
+            default_ancestor[p] = v
+
+    # Every subtree is placed before its parent, siblings left to right
+    for v in postorder(children):
+        kids = children[v]
+        left_sibling = children[parent[v]][number[v] - 1] if v and number[v] else -1
+        if not kids:
+            x[v] = x[left_sibling] + separation(left_sibling, v) if left_sibling >= 0 else 0.0
+        else:
+            # Execute the shifts apportion() recorded for the children
+            moved = accumulated = 0.0
+            for child in reversed(kids):
+                x[child] += moved
+                mod[child] += moved
+                accumulated += change[child]
+                moved += shift[child] + accumulated
+            midpoint = (x[kids[0]] + x[kids[-1]]) / 2
+            if left_sibling >= 0:
+                x[v] = x[left_sibling] + separation(left_sibling, v)
+                mod[v] = x[v] - midpoint
+            else:
+                x[v] = midpoint
+        if v:
+            if number[v] == 0:
+                default_ancestor[parent[v]] = v
+            else:
+                apportion(v)
+
+    # Absolute x: each node's preliminary x plus the modifiers of all its
+    # ancestors, accumulated one level at a time
+    x = np.array(x)
+    mod = np.array(mod)
+    depth = np.array(depth, dtype=np.int64)
+    by_depth = np.argsort(depth, kind="stable")
+    level_starts = np.searchsorted(depth[by_depth], np.arange(depth.max() + 2))
+    offsets = np.zeros(n)
+    for start, end in zip(level_starts[1:-1], level_starts[2:]):
+        level = by_depth[start:end]
+        offsets[level] = offsets[parents[level]] + mod[parents[level]]
+    x = x + offsets
+
+    # Rows are as tall as their tallest node
+    row_heights = np.zeros(depth.max() + 1)
+    np.maximum.at(row_heights, depth, heights)
+    row_tops = np.concatenate(([0.0], np.cumsum(row_heights + v_gap)[:-1]))
+    y = row_tops[depth] + margin
+    x = x - (x - widths / 2).min() + margin
+    return TreeLayout(x, y, widths, heights, parents)
+
+
+def postorder(children):
+    # Left-to-right post-order of the tree rooted at node 0, iteratively
+    order = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(children[node])
+    order.reverse()
+    return order
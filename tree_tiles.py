@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ast_visualizer import display_tree, layout_display, svg_document, svg_edges, svg_nodes
+
+TILE_SIZE = 256
+DEFAULT_MAX_TILES = 1024
+# Labels are left out of tiles drawn smaller than this; they could not be read
+MIN_TEXT_SCALE = 0.4
+# Once the average node is narrower than this many pixels, tiles draw each
+# row of nodes as the runs of pixel columns it covers instead of node by node
+MIN_NODE_PIXELS = 3.0
+
+
+class TilePyramid:
+    """Deep-zoom tile pyramid of one AST, drawn with the tidy tree layout.
+
+    Zoom level 0 fits the whole drawing in one tile_size square; every level
+    doubles the scale, up to max_zoom where the drawing is at full size. Tile
+    (z, x, y) is column x, row y of level z, an SVG document holding only the
+    nodes and edges that cross it; once nodes shrink to a few pixels, each
+    row of the tree is drawn as gray bands where it has nodes. The layout is
+    computed once; tiles are made on first request and the last max_tiles
+    are kept. Safe to share between threads.
+    """
+
+    def __init__(self, ast, tile_size=TILE_SIZE, max_tiles=DEFAULT_MAX_TILES):
+        labels, types, parents = display_tree(ast)
+        self.layout, self.lines = layout_display(labels, parents)
+        self.types = types
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.width = self.layout.width + 10
+        self.height = self.layout.height + 10
+        self.max_zoom = max(0, math.ceil(math.log2(max(self.width, self.height) / tile_size)))
+        self.tiles = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Bounding boxes of node boxes and of the edge into each node
+        layout = self.layout
+        self.left = layout.x - layout.widths / 2
+        self.right = layout.x + layout.widths / 2
+        self.top = layout.y
+        self.bottom = layout.y + layout.heights
+        parent = np.maximum(layout.parents, 0)
+        self.has_parent = layout.parents >= 0
+        self.edge_left = np.minimum(layout.x[parent], layout.x)
+        self.edge_right = np.maximum(layout.x[parent], layout.x)
+        self.edge_top = self.bottom[parent]
+        # Rows of the drawing (tree levels) and the height of each
+        self.row_tops, self.rows = np.unique(self.top, return_inverse=True)
+        self.row_heights = np.zeros(len(self.row_tops))
+        np.maximum.at(self.row_heights, self.rows, layout.heights)
+        self.mean_width = float(layout.widths.mean()) if len(layout.widths) else 0.0
+
+    def scale(self, z):
+        return 2.0 ** (z - self.max_zoom)
+
+    def grid(self, z):
+        # (columns, rows) of tiles at level z
+        span = self.tile_size / self.scale(z)
+        return math.ceil(self.width / span), math.ceil(self.height / span)
+
+    def tile(self, z, x, y):
+        if not 0 <= z <= self.max_zoom:
+            raise ValueError(f"No zoom level {z}")
+        columns, rows = self.grid(z)
+        if not (0 <= x < columns and 0 <= y < rows):
+            raise ValueError(f"No tile {z}/{x}/{y}")
+        key = (z, x, y)
+        with self.lock:
+            if key in self.tiles:
+                self.tiles.move_to_end(key)
+                return self.tiles[key]
+        data = self.render_tile(z, x, y)
+        with self.lock:
+            self.tiles[key] = data
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+        return data
+
+    def render_tile(self, z, x, y):
+        scale = self.scale(z)
+        span = self.tile_size / scale
+        x0, y0 = x * span, y * span
+        x1, y1 = x0 + span, y0 + span
+        nodes = np.flatnonzero((self.right >= x0) & (self.left <= x1) & (self.bottom >= y0) & (self.top <= y1))
+        if self.mean_width * scale < MIN_NODE_PIXELS:
+            return svg_document(self.tile_size, self.tile_size, (x0, y0, span, span), self.bands(nodes, x0, scale))
+        edges = np.flatnonzero(self.has_parent & (self.edge_right >= x0) & (self.edge_left <= x1)
+                               & (self.top >= y0) & (self.edge_top <= y1))
+        elements = svg_edges(self.layout, edges)
+        elements += svg_nodes(self.layout, self.lines, self.types, nodes, text=scale >= MIN_TEXT_SCALE)
+        return svg_document(self.tile_size, self.tile_size, (x0, y0, span, span), elements)
+
+    def bands(self, nodes, x0, scale):
+        # One gray rect per run of pixel columns covered by a row's nodes
+        columns = []
+        for edge in (self.left[nodes], self.layout.x[nodes], self.right[nodes]):
+            columns.append(np.clip(np.floor((edge - x0) * scale), 0, self.tile_size - 1).astype(np.int64))
+        rows = np.tile(self.rows[nodes], 3)
+        keys = np.unique(rows * self.tile_size + np.concatenate(columns))
+        if not len(keys):
+            return []
+        # A run ends where the next key is not the next column of the same row
+        breaks = np.flatnonzero((np.diff(keys) != 1) | (keys[1:] % self.tile_size == 0)) + 1
+        starts = keys[np.concatenate(([0], breaks))]
+        lengths = np.diff(np.concatenate(([0], breaks, [len(keys)])))
+        out = []
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            row, column = divmod(start, self.tile_size)
+            out.append(
+                f'<rect x="{x0 + column / scale:.1f}" y="{self.row_tops[row]:.1f}" width="{length / scale:.1f}" '
+                f'height="{self.row_heights[row]:.1f}" fill="#9B9B9B"/>'
+            )
+        return out
+
+    def info(self):
+        return {
+            "tile_size": self.tile_size,
+            "max_zoom": self.max_zoom,
+            "width": self.width,
+            "height": self.height,
+            "levels": [list(self.grid(z)) for z in range(self.max_zoom + 1)],
+        }